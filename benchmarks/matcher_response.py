@@ -0,0 +1,67 @@
+"""
+Validation benchmark of large matcher responses.
+
+Times the ingestion of a synthetic response with many groups: validating the
+raw JSON bytes in one pass, parsing to a dict before validating, and
+flattening the groups into the scheduler's user views:
+
+    python -m benchmarks.matcher_response [--groups 10000] [--group-size 2] [--repeat 5]
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+from coordination_agent.shared_libraries.types import MatcherResponse, group_views, parse_matcher_response
+
+
+def synthetic_response(groups: int, group_size: int) -> bytes:
+    """JSON of a matcher response with `groups` groups of `group_size` users, as an LLM would return it."""
+    return json.dumps({
+        "matched_groups": {
+            f"group_{index}": {
+                "user_ids": [f"user{index * group_size + member}" for member in range(group_size)],
+                "group_rationale": "Complementary decision-making styles and shared work preferences.",
+                "complementary_traits": ["INTJ (Ni-Te)", "ENFP (Ne-Fi)"][:group_size],
+            }
+            for index in range(groups)
+        },
+        "matching_strategy": "Synthetic benchmark response.",
+    }).encode("utf-8")
+
+
+def best_time(function: Callable[[], Any], repeat: int) -> float:
+    """Fastest of `repeat` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=10000, help="Number of groups in the response")
+    parser.add_argument("--group-size", type=int, default=2, help="Users per group")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    raw = synthetic_response(args.groups, args.group_size)
+    response = parse_matcher_response(raw)
+    stored = response.model_dump(exclude_none=True)
+    timings = {
+        "model_validate_json(bytes)": best_time(lambda: parse_matcher_response(raw), args.repeat),
+        "json.loads + model_validate": best_time(lambda: MatcherResponse.model_validate(json.loads(raw)), args.repeat),
+        "model_dump (state)": best_time(lambda: response.model_dump(exclude_none=True), args.repeat),
+        "group_views(model)": best_time(lambda: group_views(response), args.repeat),
+        "group_views(state dict)": best_time(lambda: group_views(stored), args.repeat),
+    }
+    print(f"{args.groups} groups of {args.group_size}, {len(raw) / 1e6:.1f} MB of JSON")
+    for name, milliseconds in timings.items():
+        print(f"{name:>28}: {milliseconds:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Matching quality and latency benchmark over synthetic populations.
+
+Runs the code matching paths on synthetic MBTI populations (see
+`benchmarks.population`) and reports, per path and population size, the wall
+time, the peak memory traced by `tracemalloc` and the objective: the mean
+compatibility score of the pairs of users that share a group. The LLM matcher
+is replaced by `OfflineMatcher`, an offline stand-in that groups its users in
+code after a configurable simulated latency, so the chunked path measures the
+orchestration around the model.
+
+    python -m benchmarks.matching [--sizes 100 1000] [--paths greedy chunked] [--json]
+
+Paths:
+    random   random groups, a baseline for the objective
+    greedy   `form_groups` with greedy formation and local search
+    auto     `form_groups` with CP-SAT for pairs when OR-Tools is installed
+    chunked  `match_in_chunks` with the offline matcher
+    repair   `repair_groups` after 5% of the pool joined or left
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+import tracemalloc
+from typing import Any, AsyncGenerator, Callable, Optional
+
+import numpy as np
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.genai import types
+
+from coordination_agent.shared_libraries.constants import USER_PROFILES
+from coordination_agent.shared_libraries.types import MatcherResponse, UserGroup
+from coordination_agent.sub_agents.matcher import grouping
+from coordination_agent.sub_agents.matcher.chunking import PARTITION_METHODS, match_in_chunks
+from coordination_agent.sub_agents.matcher.compatibility import (
+    PairScoreCache,
+    ProfileFeatures,
+    compatibility_matrix,
+    pair_scores,
+)
+from .population import synthetic_population
+
+PATHS = ("random", "greedy", "auto", "chunked", "repair")
+
+# Paths that build the full compatibility matrix
+MATRIX_PATHS = ("greedy", "auto", "repair")
+
+
+class OfflineMatcher(BaseAgent):
+    """Stand-in for the LLM matcher: groups the users of its session greedily in code after a simulated latency."""
+
+    group_size: int = 2
+    latency_seconds: float = 0.0
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        await asyncio.sleep(self.latency_seconds)
+        features = ProfileFeatures.from_profiles(ctx.session.state[USER_PROFILES])
+        groups = grouping.form_groups(compatibility_matrix(features), self.group_size, method="greedy")
+        response = MatcherResponse.from_list(
+            [UserGroup(user_ids=[features.user_ids[row] for row in group]) for group in groups],
+            matching_strategy="Offline greedy stand-in for the LLM matcher.",
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            content=types.Content(role="model", parts=[types.Part.from_text(text=response.model_dump_json(exclude_none=True))]),
+        )
+
+
+def objective(features: ProfileFeatures, groups: list[list[str]]) -> float:
+    """Mean compatibility of the pairs of users that share a group, 0 without such pairs."""
+    rows = {user_id: row for row, user_id in enumerate(features.user_ids)}
+    pairs = [
+        (rows[left], rows[right])
+        for group in groups
+        for left, right in itertools.combinations(group, 2)
+    ]
+    if not pairs:
+        return 0.0
+    left, right = zip(*pairs)
+    return float(pair_scores(features, list(left), list(right)).mean())
+
+
+def prepare(
+    path: str,
+    profiles: dict[str, dict[str, Any]],
+    features: ProfileFeatures,
+    args: argparse.Namespace,
+) -> tuple[Callable[[], list[list[str]]], int]:
+    """Untimed setup of a path; returns the timed run, which returns groups of user IDs, and the pool size."""
+    user_ids = list(features.user_ids)
+
+    def to_ids(groups: list[list[int]], ids: list[str]) -> list[list[str]]:
+        return [[ids[row] for row in group] for group in groups]
+
+    if path == "random":
+        def run() -> list[list[str]]:
+            order = np.random.default_rng(args.seed).permutation(len(user_ids)).tolist()
+            return [
+                [user_ids[row] for row in order[start:start + args.group_size]]
+                for start in range(0, len(order), args.group_size)
+            ]
+        return run, len(user_ids)
+
+    if path in ("greedy", "auto"):
+        def run() -> list[list[str]]:
+            groups = grouping.form_groups(
+                compatibility_matrix(features), args.group_size, method=path, time_limit_seconds=args.time_limit
+            )
+            return to_ids(groups, user_ids)
+        return run, len(user_ids)
+
+    if path == "chunked":
+        agent = OfflineMatcher(name="matcher", group_size=args.group_size, latency_seconds=args.latency)
+
+        def run() -> list[list[str]]:
+            merged, _, _ = asyncio.run(match_in_chunks(
+                agent, "Match everyone.", profiles, args.chunk_size, args.chunk_method, args.concurrency
+            ))
+            return [group.user_ids for group in merged.matched_groups.values()]
+        return run, len(user_ids)
+
+    if path == "repair":
+        # 5% churn: the last 2.5% of users join, 2.5% of the existing users leave
+        churn = max(1, len(user_ids) // 40)
+        existing, added = user_ids[:-churn], user_ids[-churn:]
+        base = to_ids(
+            grouping.form_groups(
+                compatibility_matrix(features.subset(np.arange(len(existing)))), args.group_size, method="greedy"
+            ),
+            existing,
+        )
+        rng = np.random.default_rng(args.seed)
+        removed = rng.choice(existing, size=min(churn, len(existing)), replace=False).tolist()
+
+        def run() -> list[list[str]]:
+            cache = PairScoreCache()
+            groups, _ = grouping.repair_groups(
+                base, added, removed, lambda left, right: cache.matrix(profiles, left, right), args.group_size
+            )
+            return [group for group in groups if group]
+        return run, len(user_ids) - len(removed)
+
+    raise ValueError(f"Unknown path: {path}")
+
+
+def measure(run: Callable[[], list[list[str]]], memory: bool) -> tuple[list[list[str]], float, Optional[float]]:
+    """Groups, wall time (s) and, if `memory`, peak traced memory (MiB) of a second, traced run."""
+    start = time.perf_counter()
+    groups = run()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return groups, seconds, peak
+
+
+def benchmark(size: int, path: str, args: argparse.Namespace) -> dict[str, Any]:
+    """Run one path on a population of `size` users and collect its metrics."""
+    profiles = synthetic_population(size, seed=args.seed)
+    features = ProfileFeatures.from_profiles(profiles)
+    result: dict[str, Any] = {"path": path, "users": size, "group_size": args.group_size}
+    if path in MATRIX_PATHS and size > args.max_matrix_users:
+        return result | {"skipped": f"more than {args.max_matrix_users} users for a full matrix"}
+
+    run, pool = prepare(path, profiles, features, args)
+    groups, seconds, peak = measure(run, memory=not args.no_memory)
+    grouped = {user_id for group in groups for user_id in group}
+    return result | {
+        "seconds": round(seconds, 4),
+        "peak_mib": round(peak, 2) if peak is not None else None,
+        "objective": round(objective(features, groups), 4),
+        "groups": len(groups),
+        "grouped": round(len(grouped) / pool, 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="Population sizes")
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=list(PATHS), help="Matching paths to run")
+    parser.add_argument("--group-size", type=int, default=2, help="Users per group")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the populations")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="Solver budget (s) of `form_groups`")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Users per offline matcher call")
+    parser.add_argument("--chunk-method", choices=PARTITION_METHODS, default="temperament", help="Chunk partition")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent offline matcher calls")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated latency (s) of each matcher call")
+    parser.add_argument("--max-matrix-users", type=int, default=5000, help="Largest pool for full-matrix paths")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced run measuring peak memory")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per result")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"{'path':>8} {'users':>7} {'seconds':>9} {'peak MiB':>9} {'objective':>9} {'grouped':>8}")
+    for size, path in itertools.product(args.sizes, args.paths):
+        result = benchmark(size, path, args)
+        if args.json:
+            print(json.dumps(result))
+        elif "skipped" in result:
+            print(f"{path:>8} {size:>7}   skipped: {result['skipped']}")
+        else:
+            peak = f"{result['peak_mib']:>9.1f}" if result["peak_mib"] is not None else f"{'-':>9}"
+            print(
+                f"{path:>8} {size:>7} {result['seconds']:>9.3f} {peak} "
+                f"{result['objective']:>9.4f} {result['grouped']:>8.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Synthetic MBTI user populations following the schema of the profile seed file."""
+
+import json
+import os
+from collections import Counter
+from typing import Any, Optional
+
+import numpy as np
+
+from coordination_agent.sub_agents.matcher.projection import FUNCTION_STACKS, SCORE_FIELDS, derived_fields
+
+# Free-text fields sampled from seed profiles of the same type
+STYLE_FIELDS = ("stress_response", "communication_style", "leadership_style", "work_preference")
+
+
+def load_seed_profiles(path: Optional[str] = None) -> dict[str, dict[str, Any]]:
+    """Profiles of the seed file, `USER_PROFILES_SEED` by default."""
+    with open(path or os.getenv("USER_PROFILES_SEED", "user_profiles_mbti_seed.json"), "r") as file:
+        return json.load(file)
+
+
+def synthetic_population(
+    size: int,
+    seed: int = 0,
+    seed_profiles: Optional[dict[str, dict[str, Any]]] = None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Generate a reproducible population of profiles shaped like the seed profiles.
+
+    Types follow the type frequencies of the seed (every type is possible).
+    Each preference score lies on the side of 50 given by the type letter, in
+    steps of 5 like the seed. Preference labels and functions follow from the
+    type, and the style fields are drawn independently from seed profiles of
+    the same type.
+
+    Args:
+        size: Number of users.
+        seed: Random seed; the same seed gives the same population.
+        seed_profiles: Profiles to imitate, defaults to `load_seed_profiles()`.
+
+    Returns:
+        dict: Profiles keyed by random 24-character hex user IDs.
+    """
+    seed_profiles = seed_profiles if seed_profiles is not None else load_seed_profiles()
+    rng = np.random.default_rng(seed)
+
+    counts = Counter(profile["mbti_type"] for profile in seed_profiles.values())
+    types = sorted(FUNCTION_STACKS)
+    weights = np.array([counts[mbti_type] + 1 for mbti_type in types], dtype=np.float64)
+    styles = {
+        mbti_type: {
+            field: [profile[field] for profile in seed_profiles.values() if profile["mbti_type"] == mbti_type]
+            or [profile[field] for profile in seed_profiles.values()]
+            for field in STYLE_FIELDS
+        }
+        for mbti_type in types
+    }
+
+    population = {}
+    for mbti_type in rng.choice(types, size=size, p=weights / weights.sum()).tolist():
+        profile: dict[str, Any] = {"mbti_type": mbti_type}
+        for field, letter, pole in zip(SCORE_FIELDS, mbti_type, "ESTJ"):
+            steps = rng.integers(12, 20) if letter == pole else rng.integers(2, 9)
+            profile[field] = int(steps) * 5
+        profile.update(derived_fields(mbti_type))
+        for field in STYLE_FIELDS:
+            values = styles[mbti_type][field]
+            profile[field] = values[rng.integers(len(values))]
+        population[rng.bytes(12).hex()] = profile
+    return population
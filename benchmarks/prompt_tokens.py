@@ -0,0 +1,48 @@
+"""
+Token-count benchmark of the profiles section of the matcher prompt.
+
+Compares the JSON and compact (`projection.encode_profiles`) renderings of the
+seed profiles and reports the tokens per 100 users:
+
+    python -m benchmarks.prompt_tokens [--model gpt-4o] [--users 100]
+"""
+
+import argparse
+import json
+import os
+from itertools import cycle, islice
+
+from litellm import token_counter
+
+from coordination_agent.sub_agents.matcher.prompt import format_profiles
+
+
+def load_profiles(users: int) -> dict[str, dict]:
+    """Seed profiles, repeated under fresh user IDs until there are `users` of them."""
+    with open(os.getenv("USER_PROFILES_SEED", "user_profiles_mbti_seed.json"), "r") as file:
+        seed = json.load(file)
+    return {f"user{index:05d}": profile for index, profile in enumerate(islice(cycle(seed.values()), users))}
+
+
+def count_tokens(text: str, model: str) -> int:
+    return token_counter(model=model, text=text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="gpt-4o", help="Model whose tokenizer is used")
+    parser.add_argument("--users", type=int, default=100, help="Number of users in the prompt")
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.users)
+    tokens = {
+        profile_format: count_tokens(format_profiles(profiles, profile_format), args.model)
+        for profile_format in ("json", "compact")
+    }
+    for profile_format, count in tokens.items():
+        print(f"{profile_format:>8}: {count:>7} tokens, {count * 100 / args.users:>8.1f} per 100 users")
+    print(f"reduction: {tokens['json'] / tokens['compact']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Agent module for the root manager agent."""
 
 import logging
+import os
 import warnings
 from datetime import datetime
 from pathlib import Path
@@ -13,7 +14,9 @@ from coordination_agent.sub_agents.scheduler.agent import scheduler
 from coordination_agent.sub_agents.writer.agent import writer
 from coordination_agent.shared_libraries.callbacks import (
     after_agent_trace,
+    after_model_trace,
     before_agent_trace,
+    before_model_trace,
 )
 
 from .prompts import ROOT_AGENT_INSTRUCTION
@@ -61,8 +64,10 @@ except Exception as e:
     logger.error(f"Failed to initialize file logging: {e}")
     logger.info("Falling back to console logging only")
 
-import litellm
-litellm._turn_on_debug()
+# Verbose LiteLLM request/response logging, e.g. to debug a provider; off by default
+if os.getenv("LITELLM_DEBUG", "false").lower() == "true":
+    import litellm
+    litellm._turn_on_debug()
 
 def before_agent_callback(callback_context: CallbackContext):
     load_initial_state(callback_context)
@@ -84,4 +89,6 @@ root_agent = Agent(
     ],
     after_agent_callback=after_agent_trace,
     before_agent_callback=before_agent_callback,
+    after_model_callback=after_model_trace,
+    before_model_callback=before_model_trace,
 )
@@ -1,8 +1,16 @@
+import hashlib
+import json
 import logging
+import threading
+from collections import OrderedDict
 from typing import Any
 
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
 from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from .tracing import AGENT, LLM, TOOL, payload_size, tracer
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +28,59 @@ def _lowercase_value(value):
         return value
 
 
+# Longest value representation in state summaries and tool argument logs
+TRACE_VALUE_CHARS = 80
+
+# Agent runs whose entry state summary is kept for the diff logged on exit
+_MAX_OPEN_TRACES = 1024
+_entry_summaries: OrderedDict[tuple[str, str], dict[str, tuple[str, str]]] = OrderedDict()
+_entry_lock = threading.Lock()
+
+
+def describe_value(value: Any) -> str:
+    """
+    Short, size-bounded description of a value: type and length for containers, a truncated repr otherwise.
+    Costs O(1) for containers, whatever their size.
+    """
+    if isinstance(value, (dict, list, tuple, set)):
+        return f"{type(value).__name__}[{len(value)}]"
+    text = repr(value)
+    return text if len(text) <= TRACE_VALUE_CHARS else f"{text[:TRACE_VALUE_CHARS]}... ({len(text)} chars)"
+
+
+def fingerprint_value(value: Any) -> str:
+    """
+    Digest of the JSON content of a value; equal content gives the same digest, whatever the object identity.
+    Keys are hashed in insertion order, which deep copies and JSON round trips keep.
+    """
+    content = json.dumps(value, default=repr)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def summarize_state(state: dict[str, Any]) -> dict[str, tuple[str, str]]:
+    """Key-level summary of a state: the content fingerprint and description of every value."""
+    return {key: (fingerprint_value(value), describe_value(value)) for key, value in state.items()}
+
+
+def diff_state(before: dict[str, tuple[str, str]], after: dict[str, tuple[str, str]]) -> dict[str, str]:
+    """
+    Keys added, removed or changed between two state summaries, with their new description.
+
+    Values count as changed when their content changed, including in-place
+    edits; a copy with the same content counts as unchanged.
+    """
+    changes = {key: f"+{summary[1]}" for key, summary in after.items() if key not in before}
+    changes.update({key: "-" for key in before if key not in after})
+    changes.update({
+        key: f"~{summary[1]}" for key, summary in after.items() if key in before and before[key] != summary
+    })
+    return changes
+
+
+def _summary_text(summary: dict[str, tuple[str, str]]) -> str:
+    return ", ".join(f"{key}={description}" for key, (_, description) in summary.items())
+
+
 # Callback logging methods
 def before_tool_trace(
     tool: BaseTool, args: dict[str, Any], tool_context: ToolContext
@@ -29,26 +90,125 @@ def before_tool_trace(
     _lowercase_value(args)
 
     tool_name = tool.name
+    if tracer.enabled:
+        tracer.start_span(tool_context.invocation_id, TOOL, tool_name, args_chars=payload_size(args))
     logger.info(f"[before_tool_trace] Running tool '{tool_name}'")
-    logger.info(f"[before_tool_trace] With args: {args}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"[before_tool_trace] With args: {args}")
+    elif logger.isEnabledFor(logging.INFO):
+        summary = ", ".join(f"{key}={describe_value(value)}" for key, value in args.items())
+        logger.info(f"[before_tool_trace] With args: {summary}")
 
     return None
 
 
+def after_tool_trace(
+    tool: BaseTool, args: dict[str, Any], tool_context: ToolContext, tool_response: Any
+):
+    """End the span of a tool run with the size and status of its response."""
+    if tracer.enabled:
+        status = tool_response.get("status", "ok") if isinstance(tool_response, dict) else "ok"
+        tracer.end_span(
+            tool_context.invocation_id,
+            TOOL,
+            tool.name,
+            status="ok" if status in ("ok", "success") else str(status),
+            response_chars=payload_size(tool_response),
+        )
+    return None
+
+
+def _content_chars(contents: list[types.Content]) -> int:
+    """Characters of text and function call payloads in model contents."""
+    chars = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += payload_size(part.function_call.args)
+            elif part.function_response:
+                chars += payload_size(part.function_response.response)
+    return chars
+
+
+def before_model_trace(callback_context: CallbackContext, llm_request: LlmRequest):
+    """Open the span of an LLM call with the size of its prompt."""
+    if tracer.enabled:
+        system_instruction = llm_request.config.system_instruction if llm_request.config else None
+        tracer.start_span(
+            callback_context.invocation_id,
+            LLM,
+            llm_request.model or "llm",
+            request_chars=_content_chars(llm_request.contents),
+            system_chars=len(system_instruction) if isinstance(system_instruction, str) else 0,
+        )
+    return None
+
+
+def after_model_trace(callback_context: CallbackContext, llm_response: LlmResponse):
+    """End the span of an LLM call with its token counts and response size."""
+    if not tracer.enabled or llm_response.partial:
+        return None
+    usage = llm_response.usage_metadata
+    tokens = {
+        "prompt_tokens": usage.prompt_token_count or 0,
+        "completion_tokens": usage.candidates_token_count or 0,
+        "total_tokens": usage.total_token_count or 0,
+    } if usage else {}
+    tracer.end_span(
+        callback_context.invocation_id,
+        LLM,
+        status=llm_response.error_code or "ok",
+        response_chars=_content_chars([llm_response.content]) if llm_response.content else 0,
+        **tokens,
+    )
+    return None
+
+
 def before_agent_trace(callback_context: CallbackContext):
+    """Log the agent entry with a key-level state summary; the full state is only logged at DEBUG."""
     agent_name = callback_context.agent_name
     invocation_id = callback_context.invocation_id
+    tracer.start_span(invocation_id, AGENT, agent_name)
+    if not logger.isEnabledFor(logging.INFO):
+        return None
+
     current_state = callback_context.state.to_dict()
+    summary = summarize_state(current_state)
+    with _entry_lock:
+        _entry_summaries[(invocation_id, agent_name)] = summary
+        while len(_entry_summaries) > _MAX_OPEN_TRACES:
+            _entry_summaries.popitem(last=False)
+
     logger.info(f"[before_agent_trace] Agent '{agent_name}' running with invocation_id '{invocation_id}'")
-    logger.info(f"[before_agent_trace] With state: {current_state}")
-    
+    logger.info(f"[before_agent_trace] With state: {_summary_text(summary)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"[before_agent_trace] Full state: {current_state}")
+
     return None
 
 def after_agent_trace(callback_context: CallbackContext):
+    """Log the agent exit with the state keys it changed; the full state is only logged at DEBUG."""
     agent_name = callback_context.agent_name
     invocation_id = callback_context.invocation_id
+    tracer.end_span(invocation_id, AGENT, agent_name)
+    if not logger.isEnabledFor(logging.INFO):
+        return None
+
     current_state = callback_context.state.to_dict()
+    summary = summarize_state(current_state)
+    with _entry_lock:
+        entry = _entry_summaries.pop((invocation_id, agent_name), None)
+
     logger.info(f"[after_agent_trace] Agent '{agent_name}' running with invocation_id '{invocation_id}'")
-    logger.info(f"[after_agent_trace] With state: {current_state}")
-    
-    return None
\ No newline at end of file
+    if entry is None:
+        logger.info(f"[after_agent_trace] With state: {_summary_text(summary)}")
+    else:
+        changes = diff_state(entry, summary)
+        changed = ", ".join(f"{key}{description}" for key, description in changes.items()) or "none"
+        logger.info(f"[after_agent_trace] State changes: {changed}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"[after_agent_trace] Full state: {current_state}")
+
+    return None
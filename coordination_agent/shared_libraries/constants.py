@@ -2,13 +2,18 @@
 State Keys
 """
 STATE = "state"
+STATE_INITIALIZED = "state_initialized"
 MATCHED_GROUPS = "matched_groups"
+MATCHED_USERS = "matched_users"
+MATCHED_USER_GROUPS = "matched_user_groups"
 MEETING_TIMES = "meeting_times"
 USER_AVAILABILITIES = "user_availabilities"
 USER_PROFILES = "user_profiles"
+USER_PROFILES_VERSION = "user_profiles_version"
 
 """
 Tool names
 """
 FETCH_TIME_AVAILABILITIES = "fetch_time_availabilities"
 GET_MEET_TIMES = "get_meet_times"
+ASSIGN_MEET_TIMES = "assign_meet_times"
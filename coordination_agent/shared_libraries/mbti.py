@@ -0,0 +1,12 @@
+"""MBTI vocabulary shared by the profile stores and the matcher."""
+
+# "ST" follows the instruction file's naming of the Sentinels (the S_J types)
+TEMPERAMENTS = ("NT", "NF", "ST", "SP")
+
+
+def temperament(mbti_type: str) -> str:
+    """Keirsey temperament of an MBTI type: NT, NF, ST (S_J types) or SP."""
+    mbti_type = mbti_type.upper()
+    if mbti_type[1] == "N":
+        return "N" + mbti_type[2]
+    return "S" + ("T" if mbti_type[3] == "J" else "P")
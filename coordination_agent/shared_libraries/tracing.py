@@ -0,0 +1,359 @@
+"""
+Span-based latency tracing of agents, tools and LLM calls.
+
+Each invocation is one trace. Spans nest by invocation ID: an agent span holds
+the LLM and tool spans started while it is open. A helper agent run by a tool
+(`AgentTool`, matcher chunks) gets its own invocation ID; its spans join the
+trace of that tool, found through a context variable. Finished spans carry
+their duration, token counts and payload sizes, and go to the exporters of the
+shared `tracer`:
+
+    JsonlSpanExporter     appends one JSON object per span to a local file
+                          (`TRACE_SPANS_FILE`)
+    InMemorySpanCollector keeps spans in process and renders them as OTLP/JSON
+                          for any OpenTelemetry collector
+
+Tracing costs nothing until an exporter is added. Summarize a span file per
+invocation with:
+
+    python -m coordination_agent.shared_libraries.tracing logs/spans.jsonl
+"""
+
+import argparse
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Span kinds, outermost first
+AGENT = "agent"
+TOOL = "tool"
+LLM = "llm"
+
+# OTLP span kinds: LLM calls leave the process, agents and tools do not
+_OTLP_KINDS = {AGENT: 1, TOOL: 1, LLM: 3}
+
+# Invocations whose open spans are kept; older ones are dropped with their unfinished spans
+_MAX_OPEN_INVOCATIONS = 1024
+
+SpanExporter = Callable[["Span"], None]
+
+# Innermost open tool span of the running task; the parent of the first span of an invocation it starts
+_current_tool_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_tool_span", default=None)
+
+
+@dataclass
+class Span:
+    """A timed operation of one invocation."""
+    invocation_id: str
+    kind: str
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: Optional[int] = None
+    status: str = "ok"
+    attributes: dict[str, Any] = field(default_factory=dict)
+    trace_id: str = ""
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        """Wall time in milliseconds, None while the span is open."""
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serializable view of the span, with its duration."""
+        return asdict(self) | {"duration_ms": self.duration_ms}
+
+    def to_otlp(self) -> dict[str, Any]:
+        """The span in OTLP/JSON form."""
+        attributes = {"invocation_id": self.invocation_id, "span.kind": self.kind, **self.attributes}
+        span = {
+            "traceId": self.trace_id or _trace_id(self.invocation_id),
+            "spanId": self.span_id,
+            "name": f"{self.kind} {self.name}",
+            "kind": _OTLP_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns if self.end_ns is not None else self.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+            "status": {"code": 1 if self.status == "ok" else 2, "message": "" if self.status == "ok" else self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _trace_id(invocation_id: str) -> str:
+    """Trace ID of an invocation that was not started by a traced tool."""
+    return hashlib.md5(invocation_id.encode("utf-8")).hexdigest()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """OTLP/JSON `AnyValue` of an attribute value."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Tracer:
+    """
+    Records nested spans per invocation and hands finished spans to its exporters.
+
+    The parent of a new span is the innermost open span of its invocation. The
+    first span of an invocation started while a tool span of another one is
+    open, in the same task or a task created from it, gets that tool span as
+    parent and joins its trace. Ending a span also ends the spans still open
+    inside it (e.g. a tool that raised), with status "unfinished".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open: OrderedDict[str, list[Span]] = OrderedDict()
+        # Open tool span of the outer invocation each nested invocation was started by
+        self._outer: dict[str, Span] = {}
+        self._exporters: list[SpanExporter] = []
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any exporter receives spans; hooks skip all work otherwise."""
+        return bool(self._exporters)
+
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        """Send every finished span to `exporter`."""
+        with self._lock:
+            self._exporters = [*self._exporters, exporter]
+
+    def remove_exporter(self, exporter: SpanExporter) -> None:
+        """Stop sending spans to `exporter`."""
+        with self._lock:
+            self._exporters = [existing for existing in self._exporters if existing is not exporter]
+
+    def start_span(self, invocation_id: str, kind: str, name: str, **attributes: Any) -> Optional[Span]:
+        """
+        Open a span inside the innermost open span of the invocation, or of the tool that started it.
+
+        Args:
+            invocation_id: ID of the invocation the span belongs to.
+            kind: One of `AGENT`, `TOOL` and `LLM`.
+            name: Name of the agent, tool or model.
+            **attributes: Attributes known at the start, e.g. payload sizes.
+
+        Returns:
+            Span: The open span, or None when tracing is disabled.
+        """
+        if not self.enabled:
+            return None
+        current = _current_tool_span.get()
+        with self._lock:
+            stack = self._open.setdefault(invocation_id, [])
+            self._open.move_to_end(invocation_id)
+            if stack:
+                parent = stack[-1]
+            elif current is not None and current.end_ns is None:
+                parent = self._outer[invocation_id] = current
+            else:
+                parent = None
+            span = Span(
+                invocation_id=invocation_id,
+                kind=kind,
+                name=name,
+                span_id=uuid4().hex[:16],
+                parent_id=parent.span_id if parent else None,
+                start_ns=time.time_ns(),
+                attributes=attributes,
+                trace_id=parent.trace_id if parent else _trace_id(invocation_id),
+            )
+            stack.append(span)
+            while len(self._open) > _MAX_OPEN_INVOCATIONS:
+                evicted, _ = self._open.popitem(last=False)
+                self._outer.pop(evicted, None)
+        if kind == TOOL:
+            _current_tool_span.set(span)
+        return span
+
+    def end_span(
+        self, invocation_id: str, kind: str, name: Optional[str] = None, status: str = "ok", **attributes: Any
+    ) -> Optional[Span]:
+        """
+        End the innermost open span of the invocation with this kind and name.
+
+        Args:
+            invocation_id: ID of the invocation the span belongs to.
+            kind: Kind of the span.
+            name: Name of the span, None for any name.
+            status: "ok", or a short description of what went wrong.
+            **attributes: Attributes known at the end, e.g. token counts.
+
+        Returns:
+            Span: The finished span, or None when no such span is open.
+        """
+        if not self.enabled:
+            return None
+        end_ns = time.time_ns()
+        with self._lock:
+            stack = self._open.get(invocation_id, [])
+            position = next(
+                (
+                    index for index in range(len(stack) - 1, -1, -1)
+                    if stack[index].kind == kind and name in (None, stack[index].name)
+                ),
+                None,
+            )
+            if position is None:
+                return None
+            finished = stack[position:]
+            del stack[position:]
+            outer = self._outer.get(invocation_id) if stack else self._outer.pop(invocation_id, None)
+            if not stack:
+                self._open.pop(invocation_id, None)
+            exporters = self._exporters
+        current = _current_tool_span.get()
+        if any(finished_span is current for finished_span in finished):
+            _current_tool_span.set(next((open_span for open_span in reversed(stack) if open_span.kind == TOOL), outer))
+
+        span = finished[0]
+        span.end_ns, span.status = end_ns, status
+        span.attributes.update(attributes)
+        for inner in finished[1:]:
+            inner.end_ns, inner.status = end_ns, "unfinished"
+        # Export innermost first, like spans that end in order
+        for finished_span in reversed(finished):
+            for exporter in exporters:
+                try:
+                    exporter(finished_span)
+                except Exception as e:
+                    logger.warning(f"Span exporter failed: {e}")
+        return span
+
+
+class JsonlSpanExporter:
+    """Appends finished spans to a JSON Lines file, one object per span."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(line + "\n")
+
+
+class InMemorySpanCollector:
+    """Keeps the latest finished spans in process, e.g. for tests or to forward them to an OpenTelemetry collector."""
+
+    def __init__(self, max_spans: int = 10000):
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+
+    def __call__(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) > self.max_spans:
+                del self._spans[:len(self._spans) - self.max_spans]
+
+    @property
+    def spans(self) -> list[Span]:
+        """Finished spans, in the order they ended."""
+        with self._lock:
+            return list(self._spans)
+
+    def trace(self, invocation_id: str) -> list[Span]:
+        """Finished spans of one invocation, in the order they started."""
+        return sorted((span for span in self.spans if span.invocation_id == invocation_id), key=lambda span: span.start_ns)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def to_otlp(self, service_name: str = "coordination_agent") -> dict[str, Any]:
+        """
+        The collected spans as an OTLP/JSON `ExportTraceServiceRequest`.
+
+        The result can be posted as is to the `/v1/traces` endpoint of an
+        OpenTelemetry collector.
+        """
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in self.spans],
+                }],
+            }]
+        }
+
+
+def payload_size(value: Any) -> int:
+    """Size in characters of a value serialized as JSON, the payload exchanged with a tool or model."""
+    if isinstance(value, str):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def summarize_spans(spans: Iterable[dict[str, Any]]) -> dict[str, dict[str, dict[str, float]]]:
+    """
+    Time spent per invocation, by span kind and name.
+
+    Args:
+        spans: Spans as exported by `JsonlSpanExporter` (`Span.to_dict()`).
+
+    Returns:
+        dict: `{invocation_id: {"kind name": {"count", "total_ms", "max_ms"}}}`.
+    """
+    summary: dict[str, dict[str, dict[str, float]]] = defaultdict(dict)
+    for span in spans:
+        if span.get("duration_ms") is None:
+            continue
+        stats = summary[span["invocation_id"]].setdefault(
+            f"{span['kind']} {span['name']}", {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        stats["count"] += 1
+        stats["total_ms"] += span["duration_ms"]
+        stats["max_ms"] = max(stats["max_ms"], span["duration_ms"])
+    return dict(summary)
+
+
+# Shared tracer of the agent callbacks
+tracer = Tracer()
+
+# JSON Lines file receiving every span; tracing stays off when unset
+TRACE_SPANS_FILE = os.getenv("TRACE_SPANS_FILE")
+if TRACE_SPANS_FILE:
+    tracer.add_exporter(JsonlSpanExporter(TRACE_SPANS_FILE))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarize where each invocation of a span file spends its time.")
+    parser.add_argument("spans", help="JSON Lines file written by `JsonlSpanExporter`")
+    args = parser.parse_args()
+    with open(args.spans, "r", encoding="utf-8") as file:
+        summary = summarize_spans(json.loads(line) for line in file if line.strip())
+    for invocation_id, operations in summary.items():
+        print(invocation_id)
+        for operation, stats in sorted(operations.items(), key=lambda item: -item[1]["total_ms"]):
+            print(f"  {operation:<40} {stats['count']:>5} {stats['total_ms']:>12.1f} ms {stats['max_ms']:>10.1f} ms max")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
-from typing import Optional
+from typing import Any, Optional
 from pydantic import BaseModel, Field
 from uuid import uuid4
 
+from .constants import MATCHED_GROUPS, MATCHED_USER_GROUPS, MATCHED_USERS
+
 
 class UserGroup(BaseModel):
     """Represents a group of matched users."""
@@ -44,3 +46,50 @@ class MatcherResponse(BaseModel):
             matched_groups={str(uuid4()): group for group in groups},
             **data
         )
+
+
+def parse_matcher_response(data: "MatcherResponse | str | bytes | dict[str, Any]") -> MatcherResponse:
+    """
+    Validate a matcher response, parsing raw JSON text or bytes (e.g. LLM output) directly without an intermediate dict.
+
+    Raises:
+        pydantic.ValidationError: If the data is not a valid matcher response.
+    """
+    if isinstance(data, MatcherResponse):
+        return data
+    if isinstance(data, (str, bytes, bytearray)):
+        return MatcherResponse.model_validate_json(data)
+    return MatcherResponse.model_validate(data)
+
+
+def group_views(matched_groups: MatcherResponse | dict[str, Any]) -> dict[str, list]:
+    """
+    Flattened views of matched groups for scheduling.
+
+    Args:
+        matched_groups: A validated matcher response, or its `model_dump` as stored in the `matched_groups` state.
+
+    Returns:
+        dict: "groups" (group IDs), "users" (every grouped user once, in order of first appearance) and
+        "user_groups" (the user IDs of each group, in group order).
+    """
+    if isinstance(matched_groups, MatcherResponse):
+        groups = {group_id: group.user_ids for group_id, group in matched_groups.matched_groups.items()}
+    else:
+        groups = {group_id: group["user_ids"] for group_id, group in matched_groups.get("matched_groups", {}).items()}
+    user_groups = list(groups.values())
+    return {
+        "groups": list(groups),
+        "users": list(dict.fromkeys(user_id for user_ids in user_groups for user_id in user_ids)),
+        "user_groups": user_groups,
+    }
+
+
+def matched_groups_state(response: MatcherResponse) -> dict[str, Any]:
+    """State update storing a matcher response in `matched_groups` with its flattened user views next to it."""
+    views = group_views(response)
+    return {
+        MATCHED_GROUPS: response.model_dump(exclude_none=True),
+        MATCHED_USERS: views["users"],
+        MATCHED_USER_GROUPS: views["user_groups"],
+    }
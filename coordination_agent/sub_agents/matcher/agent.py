@@ -1,20 +1,45 @@
 """Agent module for the matcher agent."""
 
-import litellm
 from google.adk import Agent
+from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools.agent_tool import AgentTool
 
-from .prompt import INSTRUCTION, PRESENTER_INSTRUCTION
+from .cache import match_cache, match_cache_callbacks
+from .chunking import chunked_matcher_tool, parallel_matcher_tool
+from .prompt import INSTRUCTION, PRESENTER_INSTRUCTION, matcher_instruction
+from .tools import (
+    CHUNK_CONCURRENCY,
+    CHUNK_SIZE,
+    find_users,
+    form_groups,
+    score_compatibility,
+    update_groups,
+)
 from coordination_agent.shared_libraries.callbacks import (
     before_agent_trace,
     after_agent_trace,
+    before_model_trace,
+    after_model_trace,
+    before_tool_trace,
+    after_tool_trace,
 )
-from coordination_agent.shared_libraries.constants import MATCHED_GROUPS
-from coordination_agent.shared_libraries.types import MatcherResponse
+from coordination_agent.shared_libraries.constants import MATCHED_GROUPS, MATCHED_USER_GROUPS, MATCHED_USERS
+from coordination_agent.shared_libraries.types import MatcherResponse, group_views
+
+
+def store_group_views(callback_context: CallbackContext):
+    """Store the flattened user views of the groups the matcher saved in `matched_groups`."""
+    matched_groups = callback_context.state.get(MATCHED_GROUPS)
+    if matched_groups:
+        views = group_views(matched_groups)
+        callback_context.state[MATCHED_USERS] = views["users"]
+        callback_context.state[MATCHED_USER_GROUPS] = views["user_groups"]
+    return None
 
-litellm._turn_on_debug()
 
+# Identical requests over the same profiles and instruction are answered from the match cache
+before_match_cache, after_match_cache = match_cache_callbacks(match_cache, INSTRUCTION)
 
 matcher = Agent(
     # model=LiteLlm(model="ollama_chat/llama3.1"),
@@ -22,9 +47,11 @@ matcher = Agent(
     model=LiteLlm(model="openrouter/google/gemini-2.5-flash"),
     name="matcher",
     description="Core specialized agent for participant matching and grouping.",
-    instruction=INSTRUCTION,
-    before_agent_callback=before_agent_trace,
-    after_agent_callback=after_agent_trace,
+    instruction=matcher_instruction,
+    before_agent_callback=[before_agent_trace, *before_match_cache],
+    after_agent_callback=[after_agent_trace, store_group_views, *after_match_cache],
+    before_model_callback=before_model_trace,
+    after_model_callback=after_model_trace,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
     output_key=MATCHED_GROUPS,
@@ -38,7 +65,17 @@ matcher_presenter = Agent(
     instruction=PRESENTER_INSTRUCTION,
     before_agent_callback=before_agent_trace,
     after_agent_callback=after_agent_trace,
+    before_model_callback=before_model_trace,
+    after_model_callback=after_model_trace,
+    before_tool_callback=before_tool_trace,
+    after_tool_callback=after_tool_trace,
     tools=[
         AgentTool(matcher),
+        chunked_matcher_tool(matcher, max_chunk_size=CHUNK_SIZE, max_concurrency=CHUNK_CONCURRENCY),
+        parallel_matcher_tool(matcher, max_concurrency=CHUNK_CONCURRENCY),
+        find_users,
+        form_groups,
+        score_compatibility,
+        update_groups,
     ],
 )
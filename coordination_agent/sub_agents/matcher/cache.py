@@ -0,0 +1,213 @@
+"""Persistent cache of matcher responses, keyed by the request, the profiles and the matcher prompt."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from coordination_agent.shared_libraries.tracing import AGENT, tracer
+from coordination_agent.shared_libraries.constants import USER_PROFILES
+from coordination_agent.shared_libraries.types import MatcherResponse, matched_groups_state
+from coordination_agent.tools.profiles import profiles_version
+from . import prompt
+from .index import profile_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+def match_fingerprint(
+    request: str,
+    profiles_key: str,
+    instruction: str,
+    model: str = "",
+    profile_format: str = "",
+) -> str:
+    """
+    Stable cache key of a matching request.
+
+    Args:
+        request: The request text sent to the matcher.
+        profiles_key: Identifier of the profiles the matcher sees (see `_profiles_key`).
+        instruction: The matcher instruction (the contents of `MATCHER_INSTRUCTION_FILE`).
+        model: Name of the matcher's model.
+        profile_format: How the profiles are rendered in the prompt (`MATCHER_PROFILE_FORMAT`).
+
+    Returns:
+        str: Hex digest identifying the request.
+    """
+    digest = hashlib.sha256()
+    instruction_hash = hashlib.sha256(instruction.encode("utf-8")).hexdigest()
+    for part in (model, instruction_hash, profile_format, profiles_key, request):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _profiles_key(state: Any) -> str:
+    """
+    Identifier of the profiles a session shows the matcher, without hashing the shared pool.
+
+    Sessions on the shared profiles are keyed by the current profile version; only
+    session-local `user_profiles` (e.g. one matching chunk) are hashed.
+    """
+    version = profiles_version(state)
+    if version is not None:
+        return f"version:{version}"
+    local = state.get(USER_PROFILES)
+    return f"content:{profile_fingerprint(local)}" if local else ""
+
+
+class MatchCache:
+    """
+    SQLite store of validated matcher responses with least-recently-used eviction.
+
+    Connections are opened per operation so the cache can be shared across threads and processes.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 1000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection in a transaction, creating the database on first use."""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+                if not self._initialized:
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS matches (key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                        "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                    )
+                    connection.execute("CREATE INDEX IF NOT EXISTS matches_accessed_at ON matches (accessed_at)")
+                    self._initialized = True
+                yield connection
+
+    def get(self, key: str) -> Optional[MatcherResponse]:
+        """Cached response for `key`, or None on a miss or an entry that no longer validates."""
+        with self._connect() as connection:
+            row = connection.execute("SELECT response FROM matches WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            try:
+                response = MatcherResponse.model_validate_json(row[0])
+            except ValueError:
+                connection.execute("DELETE FROM matches WHERE key = ?", (key,))
+                return None
+            connection.execute("UPDATE matches SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return response
+
+    def put(self, key: str, response: MatcherResponse) -> None:
+        """Store a response, evicting the least recently used entries beyond `max_entries`."""
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO matches (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, response.model_dump_json(exclude_none=True), now, now),
+            )
+            connection.execute(
+                "DELETE FROM matches WHERE key NOT IN (SELECT key FROM matches ORDER BY accessed_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM matches")
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+
+
+def _request_key(callback_context: CallbackContext, instruction: str) -> Optional[str]:
+    """Cache key of the matcher invocation behind `callback_context`, None if it has no request text."""
+    content = callback_context.user_content
+    request = "\n".join(part.text for part in content.parts if part.text) if content and content.parts else ""
+    if not request:
+        return None
+    model = getattr(callback_context._invocation_context.agent, "model", "")
+    return match_fingerprint(
+        request,
+        _profiles_key(callback_context.state),
+        instruction,
+        str(getattr(model, "model", model)),
+        prompt.PROFILE_FORMAT,
+    )
+
+
+def match_cache_callbacks(cache: Optional[MatchCache], instruction: str) -> tuple[list, list]:
+    """
+    Before and after agent callbacks that serve a matcher's responses from `cache`.
+
+    On a hit the before callback answers with the cached response and stores it in
+    `matched_groups` without calling the model. After a model call, the
+    response of the invocation is validated and stored.
+
+    Args:
+        cache: The cache, or None to disable caching.
+        instruction: The matcher instruction, part of the cache key.
+
+    Returns:
+        tuple[list, list]: The before and after agent callbacks (empty when caching is disabled).
+    """
+    if cache is None:
+        return [], []
+
+    def before_agent_cache(callback_context: CallbackContext) -> Optional[types.Content]:
+        key = _request_key(callback_context, instruction)
+        response = cache.get(key) if key else None
+        if response is None:
+            return None
+        logger.info(f"[before_agent_cache] Serving '{callback_context.agent_name}' response from the match cache")
+        callback_context.state.update(matched_groups_state(response))
+        # The after agent callbacks are skipped when a before callback answers, so end the agent span here
+        tracer.end_span(callback_context.invocation_id, AGENT, callback_context.agent_name, cache_hit=True)
+        return types.Content(role="model", parts=[types.Part.from_text(text=response.model_dump_json(exclude_none=True))])
+
+    def after_agent_cache(callback_context: CallbackContext) -> None:
+        key = _request_key(callback_context, instruction)
+        if not key:
+            return None
+        invocation = callback_context._invocation_context
+        events = [
+            event for event in invocation.session.events
+            if event.invocation_id == invocation.invocation_id and event.author == callback_context.agent_name
+            and event.content and event.content.parts
+        ]
+        if not events:
+            return None
+        try:
+            response = MatcherResponse.model_validate_json(
+                "\n".join(part.text for part in events[-1].content.parts if part.text)
+            )
+        except ValueError as e:
+            logger.warning(f"[after_agent_cache] Not caching an invalid matcher response: {e}")
+            return None
+        cache.put(key, response)
+        return None
+
+    return [before_agent_cache], [after_agent_cache]
+
+
+def _cache_path(path: str) -> Path:
+    """Resolve relative cache paths against the project root, like the instruction file."""
+    return Path(path) if Path(path).is_absolute() else Path(__file__).parent.parent.parent.parent / path
+
+
+# Shared match cache; a size of 0 disables it
+MATCH_CACHE_SIZE = int(os.getenv("MATCHER_CACHE_SIZE", "1000"))
+match_cache = (
+    MatchCache(_cache_path(os.getenv("MATCHER_CACHE_PATH", ".cache/matcher.sqlite3")), MATCH_CACHE_SIZE)
+    if MATCH_CACHE_SIZE > 0 else None
+)
@@ -0,0 +1,416 @@
+"""Concurrent matcher calls: split a pool into chunks or match independent batches in parallel and merge the results."""
+
+import asyncio
+import logging
+import math
+from collections import Counter
+from typing import Any, Callable, Optional
+
+import numpy as np
+from google.adk.agents import BaseAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from coordination_agent.shared_libraries.constants import MATCHED_GROUPS, USER_PROFILES
+from coordination_agent.shared_libraries.types import MatcherResponse, UserGroup, matched_groups_state, parse_matcher_response
+from coordination_agent.tools.profiles import load_profiles
+from .compatibility import ProfileFeatures
+
+logger = logging.getLogger(__name__)
+
+# Supported values of `method` in `partition_profiles`
+PARTITION_METHODS = ("temperament", "kmeans")
+
+def _partition_by_temperament(features: ProfileFeatures, chunks: int) -> list[list[int]]:
+    """Deal users into chunks round-robin by temperament so every chunk mixes temperaments like the pool."""
+    temperaments = np.argmax(features.temperaments, axis=1)
+    order = np.lexsort((np.arange(len(temperaments)), temperaments))
+    return [sorted(order[chunk::chunks].tolist()) for chunk in range(chunks)]
+
+
+def _partition_by_kmeans(features: ProfileFeatures, chunks: int, iterations: int = 25) -> list[list[int]]:
+    """
+    Balanced k-means over the preference scores, folded so complementary users land together.
+
+    Energy, decision and lifestyle scores are folded to their strength (absolute
+    value), since the best partners are opposite on those axes: a strong
+    extravert and a strong introvert fold to the same point. The information
+    score is kept as is since partners should share it.
+    """
+    points = features.scores.copy()
+    points[:, [0, 2, 3]] = np.abs(points[:, [0, 2, 3]])
+    size = len(points)
+    rng = np.random.default_rng(0)
+
+    # k-means++ initialization
+    centroids = [points[rng.integers(size)]]
+    for _ in range(1, chunks):
+        distances = np.min([np.sum((points - centroid) ** 2, axis=1) for centroid in centroids], axis=0)
+        total = distances.sum()
+        centroids.append(points[rng.choice(size, p=distances / total)] if total > 0 else points[rng.integers(size)])
+    centroids = np.array(centroids)
+
+    capacity = math.ceil(size / chunks)
+    labels = np.zeros(size, dtype=np.int64)
+    for _ in range(iterations):
+        distances = np.sum((points[:, None, :] - centroids[None, :, :]) ** 2, axis=2)
+        # Assign the most clear-cut users first, each to its nearest chunk with room left
+        ranked = np.sort(distances, axis=1)
+        margin = ranked[:, 1] - ranked[:, 0] if chunks > 1 else np.zeros(size)
+        load = np.zeros(chunks, dtype=np.int64)
+        new_labels = np.empty(size, dtype=np.int64)
+        for row in np.argsort(-margin, kind="stable").tolist():
+            for chunk in np.argsort(distances[row], kind="stable").tolist():
+                if load[chunk] < capacity:
+                    new_labels[row] = chunk
+                    load[chunk] += 1
+                    break
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for chunk in range(chunks):
+            if (labels == chunk).any():
+                centroids[chunk] = points[labels == chunk].mean(axis=0)
+    return [np.flatnonzero(labels == chunk).tolist() for chunk in range(chunks)]
+
+
+def partition_profiles(
+    profiles: dict[str, dict[str, Any]],
+    max_chunk_size: int,
+    method: str = "temperament",
+) -> list[list[str]]:
+    """
+    Split a pool of profiles into chunks of at most `max_chunk_size` users.
+
+    Args:
+        profiles: Profiles keyed by user ID.
+        max_chunk_size: Maximum number of users per chunk.
+        method: `temperament` (every chunk gets a proportional mix of the
+            temperaments, which the matching principles pair across) or `kmeans`
+            (clusters of users with complementary preference scores).
+
+    Returns:
+        list[list[str]]: Non-empty chunks of user IDs.
+
+    Raises:
+        ValueError: If `method` is unknown or `max_chunk_size` is below 2.
+    """
+    if method not in PARTITION_METHODS:
+        raise ValueError(f"Unknown partition method: {method}")
+    if max_chunk_size < 2:
+        raise ValueError("Chunks must hold at least two users")
+    if not profiles:
+        return []
+
+    features = ProfileFeatures.from_profiles(profiles)
+    chunks = math.ceil(len(profiles) / max_chunk_size)
+    if chunks == 1:
+        return [list(features.user_ids)]
+    if method == "temperament":
+        rows = _partition_by_temperament(features, chunks)
+    else:
+        rows = _partition_by_kmeans(features, chunks)
+    return [[features.user_ids[row] for row in chunk] for chunk in rows if chunk]
+
+
+def chunk_request(request: str, profiles: dict[str, dict[str, Any]]) -> str:
+    """Matcher request for one chunk; the chunk's profiles reach the matcher through its `user_profiles` state."""
+    return f"{request}\n\nOnly match the {len(profiles)} users whose profiles you were given."
+
+
+async def run_matcher_on_chunk(
+    agent: BaseAgent,
+    request: str,
+    profiles: dict[str, dict[str, Any]],
+    state: Optional[dict[str, Any]] = None,
+) -> MatcherResponse:
+    """
+    Run the matcher agent on one chunk in its own in-memory session, like `AgentTool` does.
+
+    Args:
+        agent: The matcher agent.
+        request: The matching request.
+        profiles: Profiles of the chunk.
+        state: Parent session state to start from; `user_profiles` is replaced by the chunk's profiles.
+
+    Returns:
+        MatcherResponse: The matcher's response for the chunk.
+
+    Raises:
+        ValueError: If the matcher returns no or an invalid response.
+    """
+    runner = Runner(app_name=agent.name, agent=agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(
+        app_name=agent.name,
+        user_id="tmp_user",
+        state={**(state or {}), USER_PROFILES: profiles},
+    )
+    content = types.Content(role="user", parts=[types.Part.from_text(text=chunk_request(request, profiles))])
+
+    last_event = None
+    async for event in runner.run_async(user_id=session.user_id, session_id=session.id, new_message=content):
+        last_event = event
+    if not last_event or not last_event.content or not last_event.content.parts:
+        raise ValueError("The matcher returned no response")
+    return parse_matcher_response("\n".join(part.text for part in last_event.content.parts if part.text))
+
+
+def filter_groups(response: MatcherResponse, user_ids: set[str], grouped: set[str]) -> tuple[list[UserGroup], list[str]]:
+    """
+    Keep the users of a batch response that belong to the batch and are not grouped yet.
+
+    Args:
+        response: The matcher's response for one batch.
+        user_ids: User IDs of the batch.
+        grouped: User IDs grouped so far; the users kept are added to it.
+
+    Returns:
+        tuple[list[UserGroup], list[str]]: The filtered groups, without the ones
+        that lost all but one member, and the user IDs that were dropped.
+    """
+    groups, dropped = [], []
+    for group in response.matched_groups.values():
+        members = [user_id for user_id in dict.fromkeys(group.user_ids) if user_id in user_ids and user_id not in grouped]
+        dropped.extend(user_id for user_id in group.user_ids if user_id not in members)
+        if len(members) < min(2, len(group.user_ids)):
+            continue
+        grouped.update(members)
+        groups.append(group if members == group.user_ids else group.model_copy(update={"user_ids": members}))
+    return groups, dropped
+
+
+def merge_responses(responses: list[MatcherResponse]) -> MatcherResponse:
+    """Merge per-chunk responses into one, with freshly generated (globally unique) group IDs."""
+    strategies = list(dict.fromkeys(response.matching_strategy for response in responses if response.matching_strategy))
+    return MatcherResponse.from_list(
+        [group for response in responses for group in response.matched_groups.values()],
+        matching_strategy=" ".join(strategies) or None,
+    )
+
+
+async def match_batches(
+    agent: BaseAgent,
+    request: str,
+    batches: list[dict[str, dict[str, Any]]],
+    max_concurrency: int = 8,
+    state: Optional[dict[str, Any]] = None,
+) -> tuple[MatcherResponse, dict[int, str], list[str]]:
+    """
+    Run the matcher on independent batches of profiles concurrently and merge the responses.
+
+    The groups of every response are checked against its batch: user IDs from
+    outside the batch or already grouped by an earlier batch are dropped, so
+    every user is in at most one group.
+
+    Args:
+        agent: The matcher agent.
+        request: The matching request.
+        batches: Profiles of each batch, keyed by user ID.
+        max_concurrency: Maximum number of concurrent matcher calls.
+        state: Parent session state passed to every batch.
+
+    Returns:
+        tuple[MatcherResponse, dict[int, str], list[str]]: The merged response
+        of the successful batches, the error message of each failed batch by
+        index and the user IDs left without a group (in failed batches or left
+        out by the matcher).
+
+    Raises:
+        ValueError: If every batch failed or no batch returned a valid group.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(batch: dict[str, dict[str, Any]]) -> MatcherResponse:
+        async with semaphore:
+            return await run_matcher_on_chunk(agent, request, batch, state)
+
+    results = await asyncio.gather(*(run(batch) for batch in batches), return_exceptions=True)
+    errors = {index: str(result) for index, result in enumerate(results) if isinstance(result, BaseException)}
+    for index, error in errors.items():
+        logger.error(f"Matching batch {index} of {len(batches)} failed: {error}")
+    if len(errors) == len(batches):
+        raise ValueError(f"All {len(batches)} matcher calls failed")
+
+    grouped: set[str] = set()
+    responses = []
+    for index, (batch, result) in enumerate(zip(batches, results)):
+        if isinstance(result, MatcherResponse):
+            groups, dropped = filter_groups(result, set(batch), grouped)
+            if dropped:
+                logger.warning(f"Dropped users from the groups of batch {index}: {', '.join(dropped)}")
+            if groups:
+                responses.append(result.model_copy(update={"matched_groups": {str(position): group for position, group in enumerate(groups)}}))
+    if not responses:
+        raise ValueError(f"No valid groups in the responses of {len(batches)} matcher calls")
+
+    unassigned = [user_id for batch in batches for user_id in batch if user_id not in grouped]
+    logger.info(
+        f"Matched {len(grouped)} users in {len(batches)} batches ({len(errors)} failed, {len(unassigned)} users unassigned)"
+    )
+    return merge_responses(responses), errors, unassigned
+
+
+async def match_in_chunks(
+    agent: BaseAgent,
+    request: str,
+    profiles: dict[str, dict[str, Any]],
+    max_chunk_size: int = 50,
+    method: str = "temperament",
+    max_concurrency: int = 8,
+    state: Optional[dict[str, Any]] = None,
+) -> tuple[MatcherResponse, dict[int, str], list[str]]:
+    """
+    Match a large pool by running the matcher on chunks in parallel and merging the responses.
+
+    Args:
+        agent: The matcher agent.
+        request: The matching request.
+        profiles: Profiles keyed by user ID.
+        max_chunk_size: Maximum number of users per matcher call.
+        method: Partition method, see `partition_profiles`.
+        max_concurrency: Maximum number of concurrent matcher calls.
+        state: Parent session state passed to every chunk.
+
+    Returns:
+        tuple[MatcherResponse, dict[int, str], list[str]]: The merged response
+        of the successful chunks, the error message of each failed chunk by
+        index and the user IDs left without a group, see `match_batches`.
+
+    Raises:
+        ValueError: If every chunk failed or no chunk returned a valid group.
+    """
+    chunks = partition_profiles(profiles, max_chunk_size, method)
+    batches = [{user_id: profiles[user_id] for user_id in chunk} for chunk in chunks]
+    return await match_batches(agent, request, batches, max_concurrency, state)
+
+
+def _parent_state(tool_context: ToolContext) -> dict[str, Any]:
+    """State handed to the matcher sessions; `user_profiles` is set per batch."""
+    return {key: value for key, value in tool_context.state.to_dict().items() if key != USER_PROFILES}
+
+
+def _store_response(
+    tool_context: ToolContext, merged: MatcherResponse, errors: dict[int, str], unassigned: list[str], label: str
+) -> dict[str, Any]:
+    """
+    Save the merged groups to the state and build the tool response, listing failed batches under "errors" and
+    the users without a group under "unassigned_user_ids".
+    """
+    state = matched_groups_state(merged)
+    tool_context.state.update(state)
+    response = {"status": "success", "result": state[MATCHED_GROUPS]}
+    if errors:
+        response["errors"] = [f"{label} {index}: {error}" for index, error in errors.items()]
+    if unassigned:
+        response["unassigned_user_ids"] = unassigned
+    return response
+
+
+def chunked_matcher_tool(
+    agent: BaseAgent,
+    max_chunk_size: int = 50,
+    max_concurrency: int = 8,
+) -> Callable[..., Any]:
+    """Build the `match_in_chunks` tool function for a matcher agent."""
+
+    async def match_in_chunks_tool(
+        request: str,
+        user_ids: list[str],
+        tool_context: ToolContext,
+        method: str = "temperament",
+    ) -> dict[str, Any]:
+        """
+        Match a large pool of users by running the `matcher` on smaller chunks of the pool in parallel and merging
+        the groups. Use this instead of the `matcher` tool when there are more users than fit in one request.
+
+        Args:
+            request (str): The matching request, as it would be sent to the `matcher` tool.
+            user_ids (list[str]): The user IDs to match. Use an empty list to match every user with a profile.
+            tool_context (ToolContext): The ADK tool context.
+            method (str): How the pool is split: "temperament" (every chunk mixes all temperaments) or
+                "kmeans" (chunks of users with complementary preference scores).
+
+        Returns:
+            dict: Response dictionary containing:
+                - "status" (str): Either "success" or "error"
+                - "result" (dict): When status is "success", the merged matcher response
+                - "errors" (list[str]): Only present when some chunks failed; their users are not grouped
+                - "unassigned_user_ids" (list[str]): Only present when some users are in no group, because their
+                  chunk failed or the matcher left them out
+        """
+        profiles, missing = load_profiles(tool_context.state, user_ids)
+        if missing:
+            return {"status": "error", "result": f"No profile found for users: {', '.join(missing)}"}
+
+        try:
+            merged, errors, unassigned = await match_in_chunks(
+                agent,
+                request,
+                profiles,
+                max_chunk_size=max_chunk_size,
+                method=method,
+                max_concurrency=max_concurrency,
+                state=_parent_state(tool_context),
+            )
+        except Exception as e:
+            logger.error(f"Error matching in chunks: {e}")
+            return {"status": "error", "result": str(e)}
+        return _store_response(tool_context, merged, errors, unassigned, "Chunk")
+
+    match_in_chunks_tool.__name__ = "match_in_chunks"
+    return match_in_chunks_tool
+
+
+def parallel_matcher_tool(agent: BaseAgent, max_concurrency: int = 8) -> Callable[..., Any]:
+    """Build the `match_in_parallel` tool function for a matcher agent."""
+
+    async def match_in_parallel_tool(
+        request: str,
+        user_id_batches: list[list[str]],
+        tool_context: ToolContext,
+    ) -> dict[str, Any]:
+        """
+        Match several independent groups of users (e.g. separate departments or teams) with concurrent `matcher`
+        calls and merge the groups. Users are only ever grouped with users of their own batch.
+
+        Args:
+            request (str): The matching request applied to every batch, as it would be sent to the `matcher` tool.
+            user_id_batches (list[list[str]]): The user IDs of each batch. A user may only appear in one batch.
+            tool_context (ToolContext): The ADK tool context.
+
+        Returns:
+            dict: Response dictionary containing:
+                - "status" (str): Either "success" or "error"
+                - "result" (dict): When status is "success", the merged matcher response
+                - "errors" (list[str]): Only present when some batches failed; their users are not grouped
+                - "unassigned_user_ids" (list[str]): Only present when some users are in no group, because their
+                  batch failed or the matcher left them out
+        """
+        batches = [list(dict.fromkeys(batch)) for batch in user_id_batches if batch]
+        if not batches:
+            return {"status": "error", "result": "No user IDs given"}
+        user_ids = [user_id for batch in batches for user_id in batch]
+        all_profiles, missing = load_profiles(tool_context.state, user_ids)
+        if missing:
+            return {"status": "error", "result": f"No profile found for users: {', '.join(missing)}"}
+        repeated = sorted({user_id for user_id, count in Counter(user_ids).items() if count > 1})
+        if repeated:
+            return {"status": "error", "result": f"Users in more than one batch: {', '.join(repeated)}"}
+
+        try:
+            merged, errors, unassigned = await match_batches(
+                agent,
+                request,
+                [{user_id: all_profiles[user_id] for user_id in batch} for batch in batches],
+                max_concurrency=max_concurrency,
+                state=_parent_state(tool_context),
+            )
+        except Exception as e:
+            logger.error(f"Error matching in parallel: {e}")
+            return {"status": "error", "result": str(e)}
+        return _store_response(tool_context, merged, errors, unassigned, "Batch")
+
+    match_in_parallel_tool.__name__ = "match_in_parallel"
+    return match_in_parallel_tool
@@ -0,0 +1,296 @@
+"""
+Deterministic MBTI compatibility scoring.
+
+Profiles are encoded into numeric features and scored pairwise with NumPy,
+following the matching principles in `instruction_mbti.txt`: balance energy,
+decision and lifestyle preferences, share an information preference while
+mixing temperaments (NT+NF, ST+SP), pair complementary dominant functions,
+match communication styles and mix leadership styles and stress responses.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+import numpy as np
+
+from coordination_agent.shared_libraries.mbti import TEMPERAMENTS, temperament
+
+SCORE_FIELDS = ("extraversion", "sensing", "thinking", "judging")
+FUNCTIONS = ("Ne", "Ni", "Se", "Si", "Te", "Ti", "Fe", "Fi")
+
+# Relative weight of each principle in the final score
+WEIGHTS = {
+    "energy_balance": 1.0,
+    "decision_blend": 1.0,
+    "structure_flexibility": 1.0,
+    "information_alignment": 0.5,
+    "temperament_dynamics": 1.0,
+    "complementary_functions": 1.0,
+    "communication_match": 0.75,
+    "leadership_synergy": 0.5,
+    "stress_balance": 0.5,
+}
+
+# Temperament pairing bonus: NT+NF and ST+SP work best, any mix beats a single temperament
+_TEMPERAMENT_BONUS = np.array([
+    # NT    NF    ST    SP
+    [0.25, 1.00, 0.60, 0.60],  # NT
+    [1.00, 0.25, 0.60, 0.60],  # NF
+    [0.60, 0.60, 0.25, 1.00],  # ST
+    [0.60, 0.60, 1.00, 0.25],  # SP
+], dtype=np.float32)
+
+# Dominant functions complement each other when they share a function but differ in attitude (Ni-Ne, Te-Ti)
+_FUNCTION_COMPLEMENT = np.array([
+    [float(a[0] == b[0] and a[1] != b[1]) for b in FUNCTIONS] for a in FUNCTIONS
+], dtype=np.float32)
+
+
+def _one_hot(values: list[str], vocabulary: tuple[str, ...]) -> np.ndarray:
+    """Encode categorical values as rows of a one-hot matrix; unknown values stay all-zero."""
+    index = {value: position for position, value in enumerate(vocabulary)}
+    encoded = np.zeros((len(values), len(vocabulary)), dtype=np.float32)
+    for row, value in enumerate(values):
+        if value in index:
+            encoded[row, index[value]] = 1.0
+    return encoded
+
+
+class ProfileFeatures(NamedTuple):
+    """Numeric encoding of a set of profiles, one row per user."""
+    user_ids: list[str]
+    scores: np.ndarray  # (n, 4) preference scores scaled to [-1, 1]
+    temperaments: np.ndarray  # (n, 4) one-hot over TEMPERAMENTS
+    dominant: np.ndarray  # (n, 8) one-hot over FUNCTIONS
+    auxiliary: np.ndarray  # (n, 8) one-hot over FUNCTIONS
+    communication: np.ndarray  # (n, styles) one-hot
+    leadership: np.ndarray  # (n, styles) one-hot
+    stress: np.ndarray  # (n, responses) one-hot
+
+    @classmethod
+    def from_profiles(cls, profiles: dict[str, dict[str, Any]]) -> 'ProfileFeatures':
+        """Encode profiles keyed by user ID, as stored in the `user_profiles` state."""
+        user_ids = list(profiles)
+        rows = [profiles[user_id] for user_id in user_ids]
+
+        def categorical(field: str) -> np.ndarray:
+            values = [str(row.get(field, "")) for row in rows]
+            return _one_hot(values, tuple(sorted(set(values) - {""})))
+
+        return cls(
+            user_ids=user_ids,
+            scores=(np.array(
+                [[float(row.get(field, 50)) for field in SCORE_FIELDS] for row in rows],
+                dtype=np.float32,
+            ).reshape(len(rows), len(SCORE_FIELDS)) - 50.0) / 50.0,
+            temperaments=_one_hot([temperament(row["mbti_type"]) for row in rows], TEMPERAMENTS),
+            dominant=_one_hot([row.get("dominant_function", "") for row in rows], FUNCTIONS),
+            auxiliary=_one_hot([row.get("auxiliary_function", "") for row in rows], FUNCTIONS),
+            communication=categorical("communication_style"),
+            leadership=categorical("leadership_style"),
+            stress=categorical("stress_response"),
+        )
+
+    def subset(self, rows: np.ndarray | list[int]) -> 'ProfileFeatures':
+        """Features of the given rows, in that order."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return ProfileFeatures(
+            [self.user_ids[row] for row in rows],
+            *(matrix[rows] for matrix in self[1:]),
+        )
+
+
+def _terms(left: ProfileFeatures, right: ProfileFeatures, pairwise: bool) -> dict[str, np.ndarray]:
+    """
+    Every principle's score in [0, 1], either for all (left, right) pairs or for
+    the aligned pairs (left[i], right[i]).
+    """
+    if pairwise:
+        def difference(column: int) -> np.ndarray:
+            return np.abs(left.scores[:, column, None] - right.scores[None, :, column]) / 2.0
+
+        def match(a: np.ndarray, b: np.ndarray, mixing: Optional[np.ndarray] = None) -> np.ndarray:
+            return (a if mixing is None else a @ mixing) @ b.T
+    else:
+        def difference(column: int) -> np.ndarray:
+            return np.abs(left.scores[:, column] - right.scores[:, column]) / 2.0
+
+        def match(a: np.ndarray, b: np.ndarray, mixing: Optional[np.ndarray] = None) -> np.ndarray:
+            return np.einsum("ij,ij->i", a if mixing is None else a @ mixing, b)
+
+    return {
+        "energy_balance": difference(0),
+        "information_alignment": 1.0 - difference(1),
+        "decision_blend": difference(2),
+        "structure_flexibility": difference(3),
+        "temperament_dynamics": match(left.temperaments, right.temperaments, _TEMPERAMENT_BONUS),
+        "complementary_functions": (
+            match(left.dominant, right.dominant, _FUNCTION_COMPLEMENT)
+            + match(left.auxiliary, right.auxiliary, _FUNCTION_COMPLEMENT)
+        ) / 2.0,
+        "communication_match": match(left.communication, right.communication),
+        "leadership_synergy": 1.0 - match(left.leadership, right.leadership),
+        "stress_balance": 1.0 - match(left.stress, right.stress),
+    }
+
+
+def _weighted(terms: dict[str, np.ndarray], weights: Optional[dict[str, float]]) -> np.ndarray:
+    """Combine principle scores into one weighted score in [0, 1]."""
+    weights = weights or WEIGHTS
+    total = sum(weights.values())
+    return (sum(weights[name] * terms[name] for name in weights) / total).astype(np.float32)
+
+
+def compatibility_matrix(
+    features: ProfileFeatures,
+    other: Optional[ProfileFeatures] = None,
+    weights: Optional[dict[str, float]] = None,
+) -> np.ndarray:
+    """
+    Weighted pairwise compatibility scores in [0, 1].
+
+    Args:
+        features: Encoded profiles for the rows.
+        other: Encoded profiles for the columns, taken from the same encoding as
+            `features` (see `ProfileFeatures.subset`) so categorical columns line
+            up. Defaults to `features` itself, in which case the diagonal
+            (self-pairs) is set to 0.
+        weights: Per-principle weights, defaults to `WEIGHTS`.
+
+    Returns:
+        np.ndarray: float32 matrix of shape (rows, columns).
+    """
+    scores = _weighted(_terms(features, features if other is None else other, pairwise=True), weights)
+    if other is None:
+        np.fill_diagonal(scores, 0.0)
+    return scores
+
+
+def pair_scores(
+    features: ProfileFeatures,
+    left_rows: np.ndarray | list[int],
+    right_rows: np.ndarray | list[int],
+    weights: Optional[dict[str, float]] = None,
+) -> np.ndarray:
+    """
+    Compatibility of the pairs (left_rows[i], right_rows[i]) without building the full matrix.
+    Self-pairs score 0.
+    """
+    left_rows = np.asarray(left_rows, dtype=np.int64)
+    right_rows = np.asarray(right_rows, dtype=np.int64)
+    # Only the feature matrices are needed, skip gathering the user IDs
+    left = ProfileFeatures([], *(matrix[left_rows] for matrix in features[1:]))
+    right = ProfileFeatures([], *(matrix[right_rows] for matrix in features[1:]))
+    scores = _weighted(_terms(left, right, pairwise=False), weights)
+    scores[left_rows == right_rows] = 0.0
+    return scores
+
+
+def top_partners(
+    scores: np.ndarray,
+    user_ids: list[str],
+    top_n: int = 3,
+) -> dict[str, list[dict[str, Any]]]:
+    """Best `top_n` partners per user from a square compatibility matrix, best first."""
+    top_n = max(0, min(top_n, len(user_ids) - 1))
+    if top_n == 0:
+        return {user_id: [] for user_id in user_ids}
+
+    masked = scores.copy()
+    np.fill_diagonal(masked, -np.inf)
+    candidates = np.argpartition(-masked, top_n - 1, axis=1)[:, :top_n]
+    partners = {}
+    for row, user_id in enumerate(user_ids):
+        ranked = sorted(candidates[row], key=lambda column: (-scores[row, column], column))
+        partners[user_id] = [
+            {"user_id": user_ids[column], "score": round(float(scores[row, column]), 3)}
+            for column in ranked
+        ]
+    return partners
+
+
+class PairScoreCache:
+    """
+    In-process LRU cache of pairwise compatibility scores keyed by user ID pair.
+
+    Scores do not depend on which other users are encoded alongside a pair, so a
+    score computed for one matching run stays valid for the next one as long as
+    both profiles are unchanged. Entries belong to one profile version: scores
+    requested for another version replace all cached ones. Call `invalidate`
+    when profiles are edited without a new version. An entry takes about 170
+    bytes, so the default 100k entries stay below 20 MB.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def matrix(
+        self,
+        profiles: dict[str, dict[str, Any]],
+        left: list[str],
+        right: list[str],
+        version: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Scores of every (left, right) user pair, computing only the uncached ones.
+
+        Args:
+            profiles: Profiles keyed by user ID, covering `left` and `right`.
+            left: User IDs of the rows.
+            right: User IDs of the columns.
+            version: Version of the profiles; cached scores of other versions are dropped.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(left), len(right)), 0 for self-pairs.
+        """
+        scores = np.zeros((len(left), len(right)), dtype=np.float32)
+        missing: dict[tuple[str, str], list[tuple[int, int]]] = {}
+        with self._lock:
+            if version is not None and version != self._version:
+                self._entries.clear()
+                self._version = version
+            for row, left_id in enumerate(left):
+                for column, right_id in enumerate(right):
+                    if left_id == right_id:
+                        continue
+                    key = (left_id, right_id) if left_id < right_id else (right_id, left_id)
+                    cached = self._entries.get(key)
+                    if cached is None:
+                        missing.setdefault(key, []).append((row, column))
+                    else:
+                        self._entries.move_to_end(key)
+                        scores[row, column] = cached
+
+        if missing:
+            user_ids = list(dict.fromkeys(user_id for key in missing for user_id in key))
+            rows = {user_id: row for row, user_id in enumerate(user_ids)}
+            features = ProfileFeatures.from_profiles({user_id: profiles[user_id] for user_id in user_ids})
+            computed = pair_scores(
+                features,
+                [rows[left_id] for left_id, _ in missing],
+                [rows[right_id] for _, right_id in missing],
+            ).tolist()
+            with self._lock:
+                for (key, cells), score in zip(missing.items(), computed):
+                    # Scores of a version replaced in the meantime are returned but not cached
+                    if version is None or version == self._version:
+                        self._entries[key] = score
+                    for row, column in cells:
+                        scores[row, column] = score
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return scores
+
+    def invalidate(self, user_ids: Optional[list[str]] = None):
+        """Drop the cached scores of the given users, or everything if `user_ids` is None."""
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+                return
+            stale = set(user_ids)
+            for key in [key for key in self._entries if key[0] in stale or key[1] in stale]:
+                del self._entries[key]
@@ -0,0 +1,530 @@
+"""Group formation over a compatibility matrix."""
+
+import heapq
+import logging
+import math
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # Without OR-Tools pairs are formed with the greedy heuristic only
+    cp_model = None
+
+logger = logging.getLogger(__name__)
+
+# Supported values of `method` in `form_groups`
+METHODS = ("auto", "greedy", "cpsat")
+
+# Number of best partners per user considered as CP-SAT pairing candidates
+PAIR_CANDIDATES = 16
+
+# Largest pool `auto` pairs with CP-SAT; beyond it CP-SAT rarely proves more than the local search within seconds
+CPSAT_MAX_USERS = 1000
+
+# Full passes over all users of the swap local search
+MAX_IMPROVE_PASSES = 50
+
+# Users left by `form_groups_sparse` that are grouped over a full matrix instead of candidate pairs
+SPARSE_DENSE_USERS = 256
+
+
+def groups_score(scores: np.ndarray, groups: list[list[int]]) -> float:
+    """Total compatibility of every pair of users that share a group."""
+    return float(sum(scores[np.ix_(group, group)].sum() / 2.0 for group in groups))
+
+
+def form_groups_greedy(scores: np.ndarray, group_size: int) -> list[list[int]]:
+    """
+    Grow groups one member at a time, adding the user with the highest total score
+    to the members chosen so far.
+
+    Groups are seeded with the users whose best partner scores lowest first, so
+    hard-to-place users are handled while they still have options.
+    Leftover users (when the population is not a multiple of `group_size`) join
+    the group they score highest with.
+
+    Args:
+        scores: Square, symmetric compatibility matrix.
+        group_size: Target number of users per group.
+
+    Returns:
+        list[list[int]]: Groups of row indices.
+    """
+    size = scores.shape[0]
+    unassigned = np.ones(size, dtype=bool)
+    groups: list[list[int]] = []
+    masked = scores.copy()
+    np.fill_diagonal(masked, -np.inf)
+    seeds = iter(np.argsort(masked.max(axis=1), kind="stable").tolist())
+
+    for _ in range(max(1, size // group_size)):
+        seed = next(user for user in seeds if unassigned[user])
+        group = [seed]
+        unassigned[seed] = False
+        gain = scores[seed].astype(np.float64)
+        while len(group) < group_size and unassigned.any():
+            member = int(np.argmax(np.where(unassigned, gain, -np.inf)))
+            group.append(member)
+            unassigned[member] = False
+            gain += scores[member]
+        groups.append(group)
+
+    for user in np.flatnonzero(unassigned).tolist():
+        best = max(range(len(groups)), key=lambda index: (scores[user, groups[index]].sum(), -index))
+        groups[best].append(user)
+    return groups
+
+
+def improve_groups(
+    scores: np.ndarray,
+    groups: list[list[int]],
+    time_limit_seconds: float = 1.0,
+    max_passes: int = MAX_IMPROVE_PASSES,
+) -> list[list[int]]:
+    """
+    Improve a grouping with pairwise member swaps until no swap helps, `max_passes`
+    passes over all users are done or time runs out.
+
+    The gain of swapping user `i` with every other user is evaluated in one
+    vectorized pass from `contribution[user, group]`, the total score of a user
+    with the members of a group, which is updated incrementally after each swap.
+    Group sizes are preserved. The result is reproducible unless the wall time
+    budget ends the search first.
+
+    Args:
+        scores: Square, symmetric compatibility matrix.
+        groups: Initial groups of row indices, covering every row once.
+        time_limit_seconds: Wall time budget, a safety limit.
+        max_passes: Maximum number of passes over all users.
+
+    Returns:
+        list[list[int]]: The improved groups.
+    """
+    deadline = time.monotonic() + time_limit_seconds
+    scores = scores.astype(np.float64)
+    size = scores.shape[0]
+
+    group_of = np.empty(size, dtype=np.int64)
+    for index, group in enumerate(groups):
+        group_of[group] = index
+    membership = np.zeros((size, len(groups)))
+    membership[np.arange(size), group_of] = 1.0
+    contribution = scores @ membership
+
+    improved = True
+    passes = 0
+    while improved and passes < max_passes and time.monotonic() < deadline:
+        improved = False
+        passes += 1
+        for user in range(size):
+            own = group_of[user]
+            # Gain of moving `user` to each other user's group and that user to `own`
+            gain = (
+                contribution[user, group_of] - scores[user]
+                + contribution[:, own] - scores[user]
+                - contribution[user, own]
+                - contribution[np.arange(size), group_of]
+            )
+            gain[group_of == own] = 0.0
+            other = int(np.argmax(gain))
+            if gain[other] <= 1e-9:
+                continue
+
+            theirs = group_of[other]
+            contribution[:, own] += scores[:, other] - scores[:, user]
+            contribution[:, theirs] += scores[:, user] - scores[:, other]
+            group_of[user], group_of[other] = theirs, own
+            improved = True
+            if time.monotonic() >= deadline:
+                break
+
+    improved_groups: list[list[int]] = [[] for _ in groups]
+    for user, index in enumerate(group_of.tolist()):
+        improved_groups[index].append(user)
+    return improved_groups
+
+
+def form_pairs_cpsat(
+    scores: np.ndarray,
+    time_limit_seconds: float = 10.0,
+    num_workers: int = 1,
+    hint: Optional[list[list[int]]] = None,
+    candidates: int = PAIR_CANDIDATES,
+) -> Optional[list[list[int]]]:
+    """
+    Maximum-weight pairing with Google OR-Tools CP-SAT.
+
+    Only the `candidates` best partners of each user (plus the pairs of `hint`)
+    are modeled, which keeps the model linear in the population size. With an
+    even population every user is paired; with an odd one a single user is left
+    out and joins the pair they score highest with.
+
+    The solver runs with a fixed seed and a deterministic time limit, so with a
+    single worker results are reproducible unless the wall time budget, which
+    includes building the model, is reached first. More workers search in
+    parallel threads, which is not reproducible.
+
+    Args:
+        scores: Square, symmetric compatibility matrix.
+        time_limit_seconds: Wall time budget for building the model and solving it.
+        num_workers: Number of search workers; 1 for reproducible results.
+        hint: Optional feasible pairing (e.g. from `form_groups_greedy`) used as a
+            warm start.
+        candidates: Number of best partners per user to consider.
+
+    Returns:
+        Optional[list[list[int]]]: Pairs of row indices, or None if the solver
+        found no solution within the time limit.
+    """
+    if cp_model is None:
+        raise ImportError("The CP-SAT pairing requires the `ortools` package")
+
+    deadline = time.monotonic() + time_limit_seconds
+    size = scores.shape[0]
+    if size < 2:
+        return None
+    candidates = min(candidates, size - 1)
+    masked = scores.copy()
+    np.fill_diagonal(masked, -np.inf)
+    best = np.argpartition(-masked, candidates - 1, axis=1)[:, :candidates]
+    edges = {(min(left, right), max(left, right)) for left, row in enumerate(best.tolist()) for right in row}
+    hinted = {
+        (min(group), max(group)) for group in hint or [] if len(group) == 2
+    }
+    edges |= hinted
+
+    model = cp_model.CpModel()
+    chosen = {edge: model.NewBoolVar(f"pair_{edge[0]}_{edge[1]}") for edge in sorted(edges)}
+    by_user: dict[int, list[cp_model.IntVar]] = {}
+    for (left, right), variable in chosen.items():
+        by_user.setdefault(left, []).append(variable)
+        by_user.setdefault(right, []).append(variable)
+        if hint is not None:
+            model.AddHint(variable, (left, right) in hinted)
+    for variables in by_user.values():
+        model.AddAtMostOne(variables)
+
+    weights = np.rint(scores[tuple(np.array(list(chosen)).T)] * 1000).astype(np.int64).tolist()
+    model.Maximize(cp_model.LinearExpr.WeightedSum(list(chosen.values()), weights))
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        logger.info("CP-SAT pairing skipped: building the model used up the time limit")
+        return None
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = remaining
+    solver.parameters.max_deterministic_time = remaining
+    solver.parameters.num_workers = num_workers
+    solver.parameters.random_seed = 0
+    status = solver.Solve(model)
+    logger.info(f"CP-SAT pairing finished with status {solver.StatusName(status)} in {solver.WallTime():.3f}s")
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+
+    pairs = [list(edge) for edge, variable in chosen.items() if solver.BooleanValue(variable)]
+    paired = {user for pair in pairs for user in pair}
+    unpaired = [user for user in range(size) if user not in paired]
+    if len(unpaired) > 1:  # Only the candidate edges were modeled, pair the rest greedily
+        pairs.extend([unpaired[index] for index in group] for group in form_groups_greedy(scores[np.ix_(unpaired, unpaired)], 2))
+    elif unpaired:
+        best_pair = max(range(len(pairs)), key=lambda index: (scores[unpaired[0], pairs[index]].sum(), -index))
+        pairs[best_pair].append(unpaired[0])
+    return pairs
+
+
+def form_groups_sparse(
+    size: int,
+    candidate_pairs: Callable[[np.ndarray], tuple[np.ndarray, np.ndarray, np.ndarray]],
+    score: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    group_size: int = 2,
+    time_limit_seconds: float = 10.0,
+    max_dense_users: int = SPARSE_DENSE_USERS,
+) -> list[list[int]]:
+    """
+    Partition users into groups of `group_size` from scored candidate pairs, for
+    pools too large for a full compatibility matrix.
+
+    In each round, candidate pairs among the users still free are taken best
+    first: a pair of two free users starts a group, which grows with the free
+    candidate partner of its members that scores highest with all of them.
+    Rounds repeat until at most `max_dense_users` users are left, which are
+    grouped with `form_groups_greedy` over their own matrix, so memory and time
+    stay linear in the number of candidate pairs. When time runs out first, the
+    users still free are grouped in blocks of `max_dense_users`; the result is
+    reproducible otherwise.
+
+    Args:
+        size: Number of users.
+        candidate_pairs: Left rows, right rows and scores of the candidate pairs
+            among the given rows.
+        score: Compatibility matrix of two arrays of rows, 0 for self-pairs.
+        group_size: Target number of users per group; leftover users join an
+            existing group.
+        time_limit_seconds: Wall time budget of the rounds over candidate pairs.
+        max_dense_users: Largest number of users grouped over a full matrix.
+
+    Returns:
+        list[list[int]]: Groups of row indices.
+    """
+    if group_size < 2:
+        raise ValueError("Groups must have at least two users")
+    deadline = time.monotonic() + time_limit_seconds
+    free = np.ones(size, dtype=bool)
+    groups: list[list[int]] = []
+    rounds = 0
+    while free.sum() > max_dense_users and time.monotonic() < deadline:
+        formed = _group_candidate_pairs(free, candidate_pairs(np.flatnonzero(free)), score, group_size)
+        if not formed:
+            break
+        groups.extend(formed)
+        rounds += 1
+
+    leftovers = np.flatnonzero(free)
+    if len(leftovers) >= group_size or not groups:
+        # Blocks of at most `max_dense_users`, in case the rounds ran out of time or candidates
+        blocks = max(1, math.ceil(len(leftovers) / max(max_dense_users, group_size)))
+        for block in np.array_split(leftovers, blocks):
+            groups.extend(
+                [int(block[row]) for row in group] for group in form_groups_greedy(score(block, block), group_size)
+            )
+    elif len(leftovers):
+        group_of = np.full(size, len(groups), dtype=np.int64)
+        for index, group in enumerate(groups):
+            group_of[group] = index
+        for user in leftovers.tolist():
+            totals = np.bincount(group_of, weights=score(np.array([user]), np.arange(size))[0], minlength=len(groups) + 1)
+            best = int(np.argmax(totals[:len(groups)]))
+            groups[best].append(user)
+            group_of[user] = best
+
+    logger.info(f"Formed {len(groups)} groups in {rounds} rounds over candidate pairs ({len(leftovers)} leftover users)")
+    return sorted(sorted(group) for group in groups)
+
+
+def _group_candidate_pairs(
+    free: np.ndarray,
+    edges: tuple[np.ndarray, np.ndarray, np.ndarray],
+    score: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    group_size: int,
+) -> list[list[int]]:
+    """One round of `form_groups_sparse`: groups of free users grown from the best candidate pairs, marked as taken in `free`."""
+    left, right, edge_scores = (np.asarray(array) for array in edges)
+    # Candidate partners of each row, both directions, as slices of `neighbors`
+    both = np.concatenate([left, right])
+    by_row = np.argsort(both, kind="stable")
+    neighbors = np.concatenate([right, left])[by_row]
+    offsets = np.searchsorted(both[by_row], np.arange(len(free) + 1))
+
+    best_first = np.lexsort((right, left, -edge_scores))
+    groups: list[list[int]] = []
+    for first, second in zip(left[best_first].tolist(), right[best_first].tolist()):
+        if not (free[first] and free[second]):
+            continue
+        group = [first, second]
+        free[group] = False
+        while len(group) < group_size:
+            candidates = np.unique(np.concatenate([neighbors[offsets[member]:offsets[member + 1]] for member in group]))
+            candidates = candidates[free[candidates]]
+            if not len(candidates):
+                break
+            member = int(candidates[np.argmax(score(candidates, np.array(group)).sum(axis=1))])
+            group.append(member)
+            free[member] = False
+        if len(group) < group_size:
+            free[group] = True
+            continue
+        groups.append(group)
+    return groups
+
+
+def sparse_groups_score(groups: list[list[int]], score: Callable[[np.ndarray, np.ndarray], np.ndarray]) -> float:
+    """Total compatibility of every pair of users that share a group, scoring only those pairs."""
+    return float(sum(score(np.array(group), np.array(group)).sum() / 2.0 for group in groups))
+
+
+def form_groups(
+    scores: np.ndarray,
+    group_size: int = 2,
+    method: str = "auto",
+    time_limit_seconds: float = 10.0,
+    num_workers: int = 1,
+    max_cpsat_users: int = CPSAT_MAX_USERS,
+) -> list[list[int]]:
+    """
+    Partition users into groups of `group_size` that maximize total compatibility.
+
+    Groups are built greedily and improved with member swaps. Pairs are then
+    optimized with CP-SAT (`cpsat`, or `auto` for pools of at most
+    `max_cpsat_users` when OR-Tools is installed), with the greedy result as
+    warm start and fallback. Every step counts against `time_limit_seconds`.
+    With a single CP-SAT worker, results are reproducible as long as no step is
+    cut short by the wall time budget (see `improve_groups` and `form_pairs_cpsat`).
+
+    Args:
+        scores: Square, symmetric compatibility matrix.
+        group_size: Target number of users per group; leftover users join an
+            existing group.
+        method: `auto`, `greedy` (greedy and local search only) or `cpsat`.
+        time_limit_seconds: Overall wall time budget.
+        num_workers: Number of CP-SAT search workers; 1 for reproducible results.
+        max_cpsat_users: Largest pool paired with CP-SAT by `auto`.
+
+    Returns:
+        list[list[int]]: Groups of row indices.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown grouping method: {method}")
+    if group_size < 2:
+        raise ValueError("Groups must have at least two users")
+    if scores.shape[0] == 0:
+        return []
+
+    start = time.monotonic()
+    groups = form_groups_greedy(scores, group_size)
+    groups = improve_groups(scores, groups, time_limit_seconds / 4)
+
+    use_cpsat = method == "cpsat" or (
+        method == "auto" and cp_model is not None and scores.shape[0] <= max_cpsat_users
+    )
+    remaining = time_limit_seconds - (time.monotonic() - start)
+    if use_cpsat and group_size == 2 and scores.shape[0] > 3 and remaining > 0:
+        pairs = form_pairs_cpsat(scores, remaining, num_workers, hint=groups)
+        if pairs is not None and groups_score(scores, pairs) >= groups_score(scores, groups):
+            groups = pairs
+
+    logger.info(
+        f"Formed {len(groups)} groups with score {groups_score(scores, groups):.3f} "
+        f"in {time.monotonic() - start:.3f}s"
+    )
+    return sorted(sorted(group) for group in groups)
+
+
+def _fill_open_groups(
+    groups: list[list[str]],
+    open_groups: list[int],
+    pool: list[str],
+    score: Callable[[list[str], list[str]], np.ndarray],
+    group_size: int,
+    partners: Optional[Callable[[list[str]], dict[str, list[str]]]],
+) -> dict[str, int]:
+    """
+    Add newcomers to the open groups of `repair_groups` in place, best fitting (user, group) first.
+
+    Returns:
+        dict[str, int]: The index of the group each placed user joined.
+    """
+    rows = {user_id: row for row, user_id in enumerate(pool)}
+    if partners is None:
+        candidates = {index: list(pool) for index in open_groups}
+    else:
+        group_of = {member: index for index in open_groups for member in groups[index]}
+        members = list(group_of)
+        linked: dict[int, set[str]] = {index: set() for index in open_groups}
+        for user_id, found in partners(pool).items():
+            for partner in found:
+                if partner in group_of:
+                    linked[group_of[partner]].add(user_id)
+        for member, found in partners(members).items():
+            linked[group_of[member]].update(user_id for user_id in found if user_id in rows)
+        candidates = {index: sorted(users, key=rows.__getitem__) for index, users in linked.items() if users}
+
+    # Heap of (-fit, group, row, user, version): an entry is stale once its group gained a member since
+    heap: list[tuple[float, int, int, str, int]] = []
+    versions = dict.fromkeys(candidates, 0)
+    placed: dict[str, int] = {}
+
+    def push(index: int) -> None:
+        users = [user_id for user_id in candidates[index] if user_id not in placed]
+        if users and len(groups[index]) < group_size:
+            fits = score(users, groups[index]).sum(axis=1).tolist()
+            for user_id, fit in zip(users, fits):
+                heapq.heappush(heap, (-fit, index, rows[user_id], user_id, versions[index]))
+
+    for index in candidates:
+        push(index)
+    while heap:
+        _, index, _, user_id, version = heapq.heappop(heap)
+        if user_id in placed or version != versions[index] or len(groups[index]) >= group_size:
+            continue
+        groups[index].append(user_id)
+        placed[user_id] = index
+        versions[index] += 1
+        push(index)
+    return placed
+
+
+def repair_groups(
+    groups: list[list[str]],
+    added: list[str],
+    removed: list[str],
+    score: Callable[[list[str], list[str]], np.ndarray],
+    group_size: int,
+    partners: Optional[Callable[[list[str]], dict[str, list[str]]]] = None,
+) -> tuple[list[list[str]], set[int]]:
+    """
+    Update existing groups for users who joined or left, touching as few groups as possible.
+
+    Removed users leave their groups. Newcomers first fill the groups that are
+    below `group_size`, best fitting user and group first. Groups still left with
+    a single member are then dissolved. The users left over form new groups among
+    themselves, or join their best existing group when there is only one of them.
+
+    Every newcomer is scored against the open groups it may join once, and again
+    only when one of those groups gains a member, so filling costs time in the
+    number of (newcomer, open group) candidates rather than rescanning the pool
+    for every placement. With `partners`, a newcomer may only join the open
+    groups holding one of its candidate partners, or a member that has the
+    newcomer as candidate.
+
+    Args:
+        groups: Existing groups of user IDs.
+        added: User IDs joining the pool; users already grouped are ignored.
+        removed: User IDs leaving the pool.
+        score: Compatibility scores of two lists of user IDs, as a (left, right) matrix.
+        group_size: Target number of users per group.
+        partners: Candidate partner user IDs of the given users, e.g. from
+            `ProfileIndex.candidate_rows`; every open group is a candidate when None.
+
+    Returns:
+        tuple[list[list[str]], set[int]]: The groups, where existing groups keep
+        their index (dissolved groups become empty) and new groups are appended,
+        and the indices of the groups that changed.
+    """
+    leaving = set(removed)
+    grouped = {user_id for group in groups for user_id in group}
+    repaired = [[user_id for user_id in group if user_id not in leaving] for group in groups]
+    changed = {index for index, group in enumerate(groups) if len(repaired[index]) != len(group)}
+
+    pool = [user_id for user_id in dict.fromkeys(added) if user_id not in grouped and user_id not in leaving]
+    open_groups = [index for index, group in enumerate(repaired) if 0 < len(group) < group_size]
+    if pool and open_groups:
+        placed = _fill_open_groups(repaired, open_groups, pool, score, group_size, partners)
+        changed.update(placed.values())
+        pool = [user_id for user_id in pool if user_id not in placed]
+
+    for index in sorted(changed):
+        if len(repaired[index]) == 1:
+            pool.extend(repaired[index])
+            repaired[index] = []
+
+    if len(pool) == 1:
+        existing = [index for index, group in enumerate(repaired) if group]
+        if existing:
+            members = [user_id for index in existing for user_id in repaired[index]]
+            scores = score(pool, members)[0]
+            columns = {user_id: column for column, user_id in enumerate(members)}
+            best = max(existing, key=lambda index: (scores[[columns[member] for member in repaired[index]]].sum(), -index))
+            repaired[best].append(pool[0])
+            changed.add(best)
+            return repaired, changed
+
+    if pool:
+        new_groups = form_groups_greedy(score(pool, pool), group_size) if len(pool) >= group_size else [list(range(len(pool)))]
+        for group in new_groups:
+            changed.add(len(repaired))
+            repaired.append([pool[row] for row in group])
+    return repaired, changed
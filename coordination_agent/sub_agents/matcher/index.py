@@ -0,0 +1,380 @@
+"""Profile index for candidate partner generation in large pools."""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from coordination_agent.tools.repository import FILTER_FIELDS
+from .compatibility import (
+    FUNCTIONS,
+    TEMPERAMENTS,
+    ProfileFeatures,
+    _TEMPERAMENT_BONUS,
+    pair_scores,
+    temperament,
+)
+
+# Categorical profile fields with an inverted index, the filter fields of the profile repositories
+INDEXED_FIELDS = FILTER_FIELDS
+
+# Best partner temperament and dominant function, following the compatibility weights
+_PARTNER_TEMPERAMENT = {
+    name: TEMPERAMENTS[int(np.argmax(_TEMPERAMENT_BONUS[position]))] for position, name in enumerate(TEMPERAMENTS)
+}
+_PARTNER_FUNCTION = {
+    function: next(other for other in FUNCTIONS if other[0] == function[0] and other != function)
+    for function in FUNCTIONS
+}
+
+# Score axes where partners should be opposite (energy, decision, lifestyle) rather than alike (information)
+_BALANCED_AXES = np.array([True, False, True, True])
+
+
+def _unique(keys: np.ndarray) -> np.ndarray:
+    """Sorted unique values of an integer array; sorting is much faster than `np.unique` on large key arrays."""
+    keys = np.sort(keys)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+def ideal_partner(scores: np.ndarray) -> np.ndarray:
+    """
+    Scaled scores of the best possible partner: the opposite extreme on every
+    balanced axis and the same information preference.
+    """
+    return np.where(_BALANCED_AXES, np.where(scores >= 0, -1.0, 1.0), scores).astype(np.float32)
+
+
+class ScoreGrid:
+    """
+    Uniform grid over the scaled preference scores for exact k-nearest-neighbor queries.
+
+    Points are bucketed into cells and stored contiguously per cell, so a query
+    only scans the cells in a cube around the query point that grows until the
+    k-th neighbor is provably found. With the grid sized to a few points per
+    cell, a query touches O(k) points instead of the whole population.
+    """
+
+    def __init__(self, points: np.ndarray, points_per_cell: int = 8):
+        self.points = points
+        self._points64 = points.astype(np.float64)
+        dimensions = points.shape[1]
+        self.cells_per_axis = int(np.clip(round((len(points) / points_per_cell) ** (1 / dimensions)), 1, 16))
+        self.width = 2.0 / self.cells_per_axis
+        self._shape = (self.cells_per_axis,) * dimensions
+        self._cube_offsets: dict[int, np.ndarray] = {}
+
+        cell_ids = np.ravel_multi_index(self._cells(points).T, self._shape)
+        self._rows = np.argsort(cell_ids, kind="stable")
+        counts = np.bincount(cell_ids, minlength=int(np.prod(self._shape)))
+        self._offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def _cells(self, points: np.ndarray) -> np.ndarray:
+        """Grid coordinates of points scaled to [-1, 1]."""
+        return np.clip(((points + 1.0) / self.width).astype(np.int64), 0, self.cells_per_axis - 1)
+
+    def _rows_in_cube(self, center: np.ndarray, radius: int) -> np.ndarray:
+        """Rows of all points in the cells at most `radius` cells away from `center`."""
+        if radius not in self._cube_offsets:
+            axis = np.arange(-radius, radius + 1)
+            self._cube_offsets[radius] = np.stack(
+                np.meshgrid(*([axis] * len(self._shape)), indexing="ij"), axis=-1,
+            ).reshape(-1, len(self._shape))
+        cells = center + self._cube_offsets[radius]
+        cells = cells[((cells >= 0) & (cells < self.cells_per_axis)).all(axis=1)]
+        cell_ids = np.ravel_multi_index(cells.T, self._shape)
+        starts = self._offsets[cell_ids]
+        lengths = self._offsets[cell_ids + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.int64)
+        # Concatenate the per-cell slices of `_rows` without a Python loop
+        shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+        return self._rows[shifts + np.arange(total)]
+
+    def nearest(self, points: np.ndarray, k: int, exclude: Optional[np.ndarray] = None) -> list[np.ndarray]:
+        """
+        Rows of the `k` points closest to each query point, nearest first.
+
+        Queries are answered in batches of those falling into the same cell,
+        which share the scanned cube, so the cost is driven by the number of
+        distinct query cells rather than the number of queries.
+
+        Args:
+            points: Query points in the scaled score space, shape (queries, dimensions).
+            k: Number of neighbors.
+            exclude: Optional row to skip per query, e.g. the querying user itself, or -1.
+
+        Returns:
+            list[np.ndarray]: Up to `k` row indices per query.
+        """
+        points = points.astype(np.float64)
+        centers = self._cells(points)
+        cell_keys = np.ravel_multi_index(centers.T, self._shape)
+        last = self.cells_per_axis - 1
+        neighbors: list[np.ndarray] = [np.zeros(0, dtype=np.int64)] * len(points)
+
+        for key in np.unique(cell_keys).tolist():
+            pending = np.flatnonzero(cell_keys == key)
+            center = centers[pending[0]]
+            for radius in range(self.cells_per_axis + 1):
+                covers_all = bool((center - radius <= 0).all() and (center + radius >= last).all())
+                rows = np.sort(self._rows_in_cube(center, radius))
+                if len(rows) < k + (exclude is not None) and not covers_all:
+                    continue
+
+                # Squared distances as |p|^2 + |q|^2 - 2 p.q, a matrix product instead of a (queries, rows, dimensions) array
+                candidates = self._points64[rows]
+                distances = (
+                    np.square(points[pending]).sum(axis=1)[:, None]
+                    + np.square(candidates).sum(axis=1)[None, :]
+                    - 2.0 * points[pending] @ candidates.T
+                )
+                np.maximum(distances, 0.0, out=distances)
+                if exclude is not None:
+                    distances[exclude[pending, None] == rows[None, :]] = np.inf
+                if distances.shape[1] > k:
+                    order = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                    order = np.take_along_axis(order, np.argsort(np.take_along_axis(distances, order, axis=1), axis=1), axis=1)
+                else:
+                    order = np.argsort(distances, axis=1)
+                nearest = np.take_along_axis(distances, order, axis=1)
+                # Points outside the cube are at least `radius` cells away
+                done = covers_all | (nearest[:, -1] <= (radius * self.width) ** 2)
+                for position in np.flatnonzero(done).tolist():
+                    neighbors[pending[position]] = rows[order[position][np.isfinite(nearest[position])]]
+                pending = pending[~done]
+                if not len(pending):
+                    break
+        return neighbors
+
+
+class ProfileIndex:
+    """
+    Read-only index over a set of profiles.
+
+    Holds inverted indices by `INDEXED_FIELDS` for exact lookups and a
+    `ScoreGrid` for nearest neighbors on the preference scores. Candidate
+    partners of a user are the users closest to their ideal partner's scores,
+    overall and within the complementary temperament and dominant function, so
+    partners can be ranked by scoring O(k) candidates per user instead of
+    everyone. Candidate generation is approximate: it finds most, not all, of
+    the exact best partners.
+    """
+
+    def __init__(self, profiles: dict[str, dict[str, Any]]):
+        self.features = ProfileFeatures.from_profiles(profiles)
+        self.user_ids = self.features.user_ids
+        self.rows = {user_id: row for row, user_id in enumerate(self.user_ids)}
+        self.grid = ScoreGrid(self.features.scores)
+
+        self._posting_grids: dict[tuple[str, str], ScoreGrid] = {}
+        self._candidate_pairs: dict[int, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self.by_field: dict[str, dict[str, np.ndarray]] = {}
+        for field in INDEXED_FIELDS:
+            postings: dict[str, list[int]] = {}
+            for row, user_id in enumerate(self.user_ids):
+                profile = profiles[user_id]
+                value = temperament(profile["mbti_type"]) if field == "temperament" else profile.get(field)
+                if value is not None:
+                    postings.setdefault(str(value), []).append(row)
+            self.by_field[field] = {value: np.asarray(rows, dtype=np.int64) for value, rows in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def lookup(self, **criteria: str) -> list[str]:
+        """
+        User IDs matching every given field value, e.g. `lookup(temperament="NT", work_preference="Remote")`.
+
+        Raises:
+            ValueError: If a criterion is not one of `INDEXED_FIELDS`.
+        """
+        rows: Optional[np.ndarray] = None
+        for field, value in criteria.items():
+            if field not in self.by_field:
+                raise ValueError(f"Unknown indexed field: {field}")
+            postings = self.by_field[field].get(str(value), np.zeros(0, dtype=np.int64))
+            rows = postings if rows is None else np.intersect1d(rows, postings, assume_unique=True)
+        if rows is None:
+            return list(self.user_ids)
+        return [self.user_ids[row] for row in rows.tolist()]
+
+    def candidate_rows(self, rows: np.ndarray, k: int = 32) -> list[np.ndarray]:
+        """
+        Candidate partner rows of each user: the `k` users closest to their ideal
+        partner's scores overall, and among the users of the complementary
+        temperament and of the complementary dominant function.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return []
+        ideals = ideal_partner(self.features.scores[rows])
+        sources = [self.grid.nearest(ideals, k, exclude=rows)]
+
+        temperaments = np.array(TEMPERAMENTS)[np.argmax(self.features.temperaments[rows], axis=1)]
+        sources.append(self._nearest_in("temperament", [_PARTNER_TEMPERAMENT[value] for value in temperaments], ideals, k))
+        functions = np.where(
+            self.features.dominant[rows].any(axis=1),
+            np.array(FUNCTIONS)[np.argmax(self.features.dominant[rows], axis=1)],
+            "",
+        )
+        sources.append(self._nearest_in("dominant_function", [_PARTNER_FUNCTION.get(value, "") for value in functions], ideals, k))
+
+        # Merge the sources of all users at once: unique (position, candidate) keys, sorted by position then row
+        found = [neighbors for source in sources for neighbors in source]
+        positions = np.tile(np.arange(len(rows)), len(sources))
+        lengths = np.array([len(neighbors) for neighbors in found], dtype=np.int64)
+        size = len(self)
+        keys = _unique(np.repeat(positions, lengths) * size + np.concatenate(found + [np.zeros(0, dtype=np.int64)]))
+        owners, merged = keys // size, keys % size
+        keep = merged != rows[owners]
+        owners, merged = owners[keep], merged[keep]
+        return np.split(merged, np.searchsorted(owners, np.arange(1, len(rows))))
+
+    def candidate_pairs(self, candidates: int = 32) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scored candidate pairs of the whole index, each unordered pair once.
+
+        The pairs are computed on first use and kept with the index, as read-only arrays.
+
+        Args:
+            candidates: Candidates per source (nearest neighbors, temperament, function).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Left rows, right rows (left < right) and scores of the pairs.
+        """
+        if candidates in self._candidate_pairs:
+            return self._candidate_pairs[candidates]
+        size = len(self)
+        if size < 2:
+            left_rows = right_rows = np.zeros(0, dtype=np.int64)
+        else:
+            rows = np.arange(size, dtype=np.int64)
+            right = self.candidate_rows(rows, candidates)
+            left_rows = np.repeat(rows, [len(partners) for partners in right])
+            right_rows = np.concatenate(right)
+            keys = _unique(np.minimum(left_rows, right_rows) * size + np.maximum(left_rows, right_rows))
+            left_rows, right_rows = keys // size, keys % size
+        pairs = (left_rows, right_rows, pair_scores(self.features, left_rows, right_rows))
+        for array in pairs:
+            array.flags.writeable = False
+        self._candidate_pairs[candidates] = pairs
+        return pairs
+
+    def _nearest_in(self, field: str, values: list[str], points: np.ndarray, k: int) -> list[np.ndarray]:
+        """For each query, the `k` rows with `field == values[i]` closest to `points[i]`, using a grid per posting list."""
+        neighbors: list[np.ndarray] = [np.zeros(0, dtype=np.int64)] * len(values)
+        for value in set(values):
+            rows = self.by_field[field].get(value)
+            if rows is None:
+                continue
+            queries = [position for position, query_value in enumerate(values) if query_value == value]
+            grid = self._posting_grids.get((field, value))
+            if grid is None:
+                grid = self._posting_grids[(field, value)] = ScoreGrid(self.features.scores[rows])
+            for position, found in zip(queries, grid.nearest(points[queries], k)):
+                neighbors[position] = rows[found]
+        return neighbors
+
+    def top_partners(
+        self,
+        user_ids: Optional[list[str]] = None,
+        top_n: int = 3,
+        candidates: int = 32,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        Best `top_n` partners per user among the whole index, scoring only candidate pairs.
+
+        Args:
+            user_ids: Users to find partners for, defaults to everyone in the index.
+            top_n: Number of partners per user.
+            candidates: Candidates per source (nearest neighbors, temperament, function).
+
+        Returns:
+            dict[str, list[dict[str, Any]]]: Same structure as `compatibility.top_partners`.
+        """
+        user_ids = self.user_ids if user_ids is None else user_ids
+        if not user_ids:
+            return {}
+        rows = np.array([self.rows[user_id] for user_id in user_ids], dtype=np.int64)
+        right = self.candidate_rows(rows, candidates)
+
+        lengths = [len(partners) for partners in right]
+        left_rows = np.repeat(rows, lengths)
+        right_rows = np.concatenate(right)
+        scores = pair_scores(self.features, left_rows, right_rows)
+
+        result = {}
+        position = 0
+        for user_id, length in zip(user_ids, lengths):
+            user_scores = scores[position:position + length]
+            user_rows = right_rows[position:position + length]
+            best = np.lexsort((user_rows, -user_scores))[:top_n]
+            result[user_id] = [
+                {"user_id": self.user_ids[user_rows[index]], "score": round(float(user_scores[index]), 3)}
+                for index in best
+            ]
+            position += length
+        return result
+
+
+_indexes: OrderedDict[str, ProfileIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def profile_fingerprint(profiles: dict[str, dict[str, Any]]) -> str:
+    """Content hash of a set of profiles; costs a serialization of every profile."""
+    return hashlib.sha256(json.dumps(profiles, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def cached_profile_index(
+    key: str,
+    load: Callable[[], dict[str, dict[str, Any]]],
+    max_entries: int = 4,
+) -> ProfileIndex:
+    """
+    Index cached under `key`, built from the profiles returned by `load` on a miss.
+
+    Args:
+        key: Identifier of the profiles' content, e.g. the version of the shared profiles.
+        load: Returns the profiles to index; only called on a miss.
+        max_entries: Number of indexes kept in memory.
+
+    Returns:
+        ProfileIndex: The cached or newly built index.
+    """
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+
+    index = ProfileIndex(load())
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > max_entries:
+            _indexes.popitem(last=False)
+    return index
+
+
+def profile_index(
+    profiles: dict[str, dict[str, Any]],
+    version: Optional[str] = None,
+    max_entries: int = 4,
+) -> ProfileIndex:
+    """
+    Index for a set of profiles, built once per version and shared by all sessions.
+
+    Args:
+        profiles: Profiles keyed by user ID, as stored in the `user_profiles` state.
+        version: Identifier of the profiles' content, e.g. a snapshot version. Without it the
+            profiles are hashed, which costs O(pool) on every call: pass it for shared pools.
+        max_entries: Number of indexes kept in memory.
+
+    Returns:
+        ProfileIndex: The cached or newly built index.
+    """
+    return cached_profile_index(version or profile_fingerprint(profiles), lambda: profiles, max_entries)
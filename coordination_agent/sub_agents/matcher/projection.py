@@ -0,0 +1,163 @@
+"""Compact, token-efficient encoding of user profiles for LLM prompts."""
+
+import json
+from typing import Any, Callable, Iterable
+
+# The four preference scores, in the order they are encoded
+SCORE_FIELDS = ("extraversion", "sensing", "thinking", "judging")
+
+# Free-text style fields encoded as numbers into a per-prompt legend, with their legend prefix
+STYLE_FIELDS = {
+    "communication_style": "c",
+    "leadership_style": "l",
+    "stress_response": "s",
+    "work_preference": "w",
+}
+
+PREFERENCE_LABELS = {
+    "energy_preference": {"E": "Extraversion", "I": "Introversion"},
+    "information_preference": {"S": "Sensing", "N": "Intuition"},
+    "decision_preference": {"T": "Thinking", "F": "Feeling"},
+    "lifestyle_preference": {"J": "Judging", "P": "Perceiving"},
+}
+FUNCTION_FIELDS = ("dominant_function", "auxiliary_function", "tertiary_function", "inferior_function")
+
+# Function stack of every type: dominant, auxiliary, tertiary and inferior
+FUNCTION_STACKS = {
+    "INTJ": ("Ni", "Te", "Fi", "Se"), "INTP": ("Ti", "Ne", "Si", "Fe"),
+    "ENTJ": ("Te", "Ni", "Se", "Fi"), "ENTP": ("Ne", "Ti", "Fe", "Si"),
+    "INFJ": ("Ni", "Fe", "Ti", "Se"), "INFP": ("Fi", "Ne", "Si", "Te"),
+    "ENFJ": ("Fe", "Ni", "Se", "Ti"), "ENFP": ("Ne", "Fi", "Te", "Si"),
+    "ISTJ": ("Si", "Te", "Fi", "Ne"), "ISFJ": ("Si", "Fe", "Ti", "Ne"),
+    "ESTJ": ("Te", "Si", "Ne", "Fi"), "ESFJ": ("Fe", "Si", "Ne", "Ti"),
+    "ISTP": ("Ti", "Se", "Ni", "Fe"), "ISFP": ("Fi", "Se", "Ni", "Te"),
+    "ESTP": ("Se", "Ti", "Fe", "Ni"), "ESFP": ("Se", "Fi", "Te", "Ni"),
+}
+
+HEADER = (
+    "Profiles, one per line: user_id|MBTI type|extraversion/sensing/thinking/judging scores (0-100)"
+    "|communication style|leadership style|stress response|work preference, the styles as numbers from the legend. "
+    "The preference labels and the dominant/auxiliary/tertiary/inferior functions follow from the type "
+    "(e.g. INTJ: Introversion, Intuition, Thinking, Judging; functions Ni-Te-Fi-Se); "
+    "any other or differing fields are appended as field=value, or field:=JSON value for non-text values."
+)
+
+
+def derived_fields(mbti_type: str) -> dict[str, str]:
+    """Profile fields that follow from the MBTI type: preference labels and the function stack."""
+    mbti_type = mbti_type.upper()
+    fields = {
+        field: labels[letter]
+        for (field, labels), letter in zip(PREFERENCE_LABELS.items(), mbti_type)
+        if letter in labels
+    }
+    if mbti_type in FUNCTION_STACKS:
+        fields.update(zip(FUNCTION_FIELDS, FUNCTION_STACKS[mbti_type]))
+    return fields
+
+
+def encode_profiles(profiles: dict[str, dict[str, Any]]) -> str:
+    """
+    Encode profiles as a legend followed by one short line per user.
+
+    Fields derivable from `mbti_type` are dropped when they match the
+    derivation, style fields are replaced by legend numbers and the scores are
+    joined, which cuts the prompt size several-fold compared to JSON. Other
+    fields are appended as `field=value`, or `field:=value` with the value in
+    JSON when it is not a string (numbers, booleans, lists, ...). The encoding
+    is lossless (see `decode_profiles`) for integer scores and string style
+    fields, as long as no value contains the separators `|`, `/`, `=` or `; `.
+
+    Args:
+        profiles: Profiles keyed by user ID, as stored in the `user_profiles` state.
+
+    Returns:
+        str: The encoded profiles.
+    """
+    return encode_profile_pages(lambda: [profiles])
+
+
+def encode_profile_pages(pages: Callable[[], Iterable[dict[str, dict[str, Any]]]]) -> str:
+    """
+    `encode_profiles` over profiles read page by page, e.g. from `ProfileRepository.iter_pages`.
+
+    The pages are read twice, once for the legend and once for the lines, so
+    only one page of profiles is held in memory at a time.
+
+    Args:
+        pages: Returns a new iterator over the pages of profiles on every call.
+
+    Returns:
+        str: The encoded profiles.
+    """
+    values: dict[str, set[str]] = {field: set() for field in STYLE_FIELDS}
+    for page in pages():
+        for profile in page.values():
+            for field in STYLE_FIELDS:
+                if field in profile:
+                    values[field].add(str(profile[field]))
+    legends = {
+        field: {value: code for code, value in enumerate(sorted(values[field]), start=1)}
+        for field in STYLE_FIELDS
+    }
+
+    lines = [HEADER]
+    for field, prefix in STYLE_FIELDS.items():
+        entries = "; ".join(f"{code}={value}" for value, code in legends[field].items())
+        lines.append(f"{prefix} ({field}): {entries}")
+
+    encoded = {"mbti_type", *SCORE_FIELDS, *STYLE_FIELDS}
+    for page in pages():
+        for user_id, profile in page.items():
+            mbti_type = str(profile.get("mbti_type", ""))
+            columns = [
+                user_id,
+                mbti_type,
+                "/".join(str(profile.get(field, "")) for field in SCORE_FIELDS),
+                *(str(legends[field].get(str(profile.get(field, "")), "")) for field in STYLE_FIELDS),
+            ]
+            derived = derived_fields(mbti_type) if mbti_type else {}
+            columns.extend(
+                _encode_extra(field, value) for field, value in profile.items()
+                if field not in encoded and (field not in derived or derived[field] != value)
+            )
+            lines.append("|".join(columns))
+    return "\n".join(lines)
+
+
+def _encode_extra(field: str, value: Any) -> str:
+    """A field that is not part of the fixed columns, with its JSON type kept for non-string values."""
+    if isinstance(value, str):
+        return f"{field}={value}"
+    return f"{field}:={json.dumps(value, separators=(',', ':'))}"
+
+
+def _decode_extra(extra: str) -> tuple[str, Any]:
+    """Inverse of `_encode_extra`."""
+    field, value = extra.split("=", 1)
+    if field.endswith(":"):
+        return field[:-1], json.loads(value)
+    return field, value
+
+
+def decode_profiles(text: str) -> dict[str, dict[str, Any]]:
+    """Rebuild the profiles from `encode_profiles` output; scores come back as integers, other fields with their types."""
+    lines = text.split("\n")
+    legends: dict[str, dict[str, str]] = {}
+    for line, field in zip(lines[1:], STYLE_FIELDS):
+        entries = line.split(": ", 1)[1]
+        legends[field] = dict(entry.split("=", 1) for entry in entries.split("; ")) if entries else {}
+
+    profiles = {}
+    for line in lines[1 + len(STYLE_FIELDS):]:
+        user_id, mbti_type, scores, *rest = line.split("|")
+        styles, extras = rest[:len(STYLE_FIELDS)], rest[len(STYLE_FIELDS):]
+        profile: dict[str, Any] = {"mbti_type": mbti_type} if mbti_type else {}
+        profile.update(
+            (field, int(score)) for field, score in zip(SCORE_FIELDS, scores.split("/")) if score
+        )
+        profile.update((field, legends[field][code]) for field, code in zip(STYLE_FIELDS, styles) if code)
+        profile.update(derived_fields(mbti_type) if mbti_type else {})
+        profile.update(_decode_extra(extra) for extra in extras)
+        profiles[user_id] = profile
+    return profiles
@@ -1,7 +1,20 @@
+import json
 import os
 from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.utils import instructions_utils
 
 from coordination_agent.shared_libraries.types import MatcherResponse
+from coordination_agent.tools.profiles import iter_session_profiles
+from .projection import encode_profile_pages
+
+# How the profiles in `user_profiles` are added to the matcher instruction:
+# "compact" (legend and one short line per user), "json" or "none" (default,
+# the instruction file as is)
+PROFILE_FORMAT = os.getenv("MATCHER_PROFILE_FORMAT", "none")
+
 
 def load_instruction_from_file(instruction_file_path=None):
     """
@@ -33,11 +46,69 @@ def load_instruction_from_file(instruction_file_path=None):
 # Load instruction from environment variable or default
 INSTRUCTION = load_instruction_from_file()
 
+
+def format_profiles(profiles: dict, profile_format: Optional[str] = None) -> str:
+    """
+    Render user profiles for the matcher instruction.
+
+    Args:
+        profiles (dict): Profiles keyed by user ID.
+        profile_format (str): "compact", "json" or "none"; defaults to `MATCHER_PROFILE_FORMAT`.
+
+    Returns:
+        str: The profiles section, empty for "none" or when there are no profiles
+    """
+    return format_profile_pages(lambda: [profiles], profile_format)
+
+
+def format_profile_pages(pages: Callable[[], Iterable[dict]], profile_format: Optional[str] = None) -> str:
+    """
+    `format_profiles` over profiles read page by page, so a large pool is never held in memory as a whole.
+
+    Args:
+        pages (Callable): Returns a new iterator over pages of profiles keyed by user ID on every call.
+        profile_format (str): "compact", "json" or "none"; defaults to `MATCHER_PROFILE_FORMAT`.
+
+    Returns:
+        str: The profiles section, empty for "none" or when there are no profiles
+    """
+    profile_format = profile_format or PROFILE_FORMAT
+    if profile_format == "none" or not any(pages()):
+        return ""
+    if profile_format == "json":
+        entries = ", ".join(json.dumps(page)[1:-1] for page in pages() if page)
+        return f"User profiles (JSON):\n{{{entries}}}"
+    return f"User profiles:\n{encode_profile_pages(pages)}"
+
+
+async def matcher_instruction(readonly_context: ReadonlyContext) -> str:
+    """
+    Instruction provider for the matcher: the instruction file with state placeholders filled in,
+    followed by the session's profiles in `MATCHER_PROFILE_FORMAT`, read page by page.
+    """
+    instruction = await instructions_utils.inject_session_state(INSTRUCTION, readonly_context)
+    profiles = format_profile_pages(lambda: iter_session_profiles(readonly_context.state))
+    return f"{instruction}\n\n{profiles}" if profiles else instruction
+
 PRESENTER_INSTRUCTION = f"""
 You are an expert talent matcher who analyzes individual profiles and creates new meeting groups from scratch using a reasoning-based approach. Your role focuses on GROUP FORMATION rather than working with existing groups.
 
 Use the `matcher` tool to create new groups from the individual pool. Always use this tool instead of trying to create groups on your own.
 
+When more than a few dozen users should be matched, use the `match_in_chunks` tool instead of the `matcher` tool, with the same request. It runs the `matcher` on smaller parts of the pool in parallel and merges the groups.
+
+When users should be matched separately (e.g. "match these three departments separately"), use the `match_in_parallel` tool with one batch of user IDs per department or team. It runs the `matcher` on every batch concurrently and merges the groups, so users are only grouped within their batch. Use `find_users` to collect the user IDs of each batch when needed.
+
+When the response of `match_in_chunks` or `match_in_parallel` lists `errors` or `unassigned_user_ids`, tell the user which users were not grouped.
+
+Use the `form_groups` tool instead of the `matcher` tool when the user asks for a fixed group size (pairs, trios, ...), for reproducible or optimal groups, or when the pool is large. It forms the groups in code and stores them as the matched groups; its response has the same structure as the `matcher` response, without rationales. When presenting its groups, write a short rationale for each group based on the `complementary_traits` of its members.
+
+When groups were already formed and the user reports that people joined or left, use the `update_groups` tool instead of regrouping everyone. It only changes the affected groups; present those (listed in `changed_groups`) with a new rationale and mention that the other groups are unchanged.
+
+Use the `score_compatibility` tool when the user asks how compatible specific people are or who someone's best partners are. It scores profiles deterministically in code and works for pools of any size.
+
+Use the `find_users` tool to look up users by MBTI type, dominant function, temperament or work preference, for example when only part of the pool should be matched. Pass the user IDs it returns to the other tools.
+
 The response of the `matcher` tool is a structured JSON object:
 {MatcherResponse.model_json_schema()}
 
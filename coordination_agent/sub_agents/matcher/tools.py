@@ -0,0 +1,357 @@
+import logging
+import os
+from collections import Counter
+from typing import Any, Callable
+
+import numpy as np
+from google.adk.tools import ToolContext
+
+from coordination_agent.shared_libraries.constants import MATCHED_GROUPS, USER_PROFILES, USER_PROFILES_VERSION
+from coordination_agent.shared_libraries.types import MatcherResponse, UserGroup, matched_groups_state
+from coordination_agent.tools.profiles import (
+    find_profiles,
+    load_profiles,
+    profile_repository,
+    profile_store,
+    profiles_version,
+)
+from . import grouping
+from .compatibility import PairScoreCache, ProfileFeatures, compatibility_matrix, top_partners
+from .index import INDEXED_FIELDS, ProfileIndex, cached_profile_index, profile_fingerprint, profile_index
+
+logger = logging.getLogger(__name__)
+
+ScoreCompatibilityResponse = dict[str, str | dict[str, list[dict[str, Any]]]] # {"status": "success", "result": {"user_id": [{"user_id": "...", "score": 0.7}, ...]}}
+FormGroupsResponse = dict[str, str | dict[str, Any]] # {"status": "success", "result": MatcherResponse as dict}
+
+# Solver budget for `form_groups`
+GROUPING_TIME_LIMIT_SECONDS = float(os.getenv("MATCHER_GROUPING_TIME_LIMIT", "10"))
+GROUPING_NUM_WORKERS = int(os.getenv("MATCHER_GROUPING_WORKERS", "1"))
+
+# Pools from this size on are scored and grouped over indexed candidate partners instead of everyone
+INDEX_MIN_USERS = int(os.getenv("MATCHER_INDEX_MIN_USERS", "1000"))
+
+# Chunking of large pools for `match_in_chunks`: users per matcher call and concurrent calls
+CHUNK_SIZE = int(os.getenv("MATCHER_CHUNK_SIZE", "50"))
+CHUNK_CONCURRENCY = int(os.getenv("MATCHER_CHUNK_CONCURRENCY", "8"))
+
+# Build the index of the shared profiles with every new version, so the tools can query it right away
+profile_store.add_load_hook(lambda snapshot: profile_index(snapshot.data, version=snapshot.version))
+
+# Pairwise scores reused by incremental updates of the matched groups (about 170 bytes per score)
+pair_score_cache = PairScoreCache(int(os.getenv("MATCHER_SCORE_CACHE_SIZE", "100000")))
+
+
+def score_compatibility(
+    user_ids: list[str],
+    tool_context: ToolContext,
+    top_n: int = 3,
+) -> ScoreCompatibilityResponse:
+    """
+    Score the pairwise compatibility of users from their MBTI profiles and return each user's best partners.
+    Scores are computed in code from the matching principles, so use this tool instead of comparing
+    profiles yourself, especially for large pools.
+
+    Args:
+        user_ids (list[str]): The user IDs to score against each other. Use an empty list to score every
+            user with a profile.
+        tool_context (ToolContext): The ADK tool context.
+        top_n (int): Number of best partners to return per user.
+
+    Returns:
+        dict: Response dictionary containing:
+            - "status" (str): Either "success" or "error"
+            - "result" (dict): When status is "success", maps every user ID to its best partners, best first,
+              as a list of {"user_id": str, "score": float} with scores between 0 and 1
+
+    Examples:
+        >>> score_compatibility(["u1", "u2", "u3"], tool_context, top_n=1)
+        {"status": "success", "result": {"u1": [{"user_id": "u3", "score": 0.712}], "u2": [...], "u3": [...]}}
+    """
+    index = _shared_index(user_ids, tool_context)
+    if index is not None:
+        missing = [user_id for user_id in user_ids if user_id not in index.rows]
+        if missing:
+            return {"status": "error", "result": f"No profile found for users: {', '.join(missing)}"}
+        return {"status": "success", "result": index.top_partners(top_n=top_n)}
+
+    profiles, error = _select_profiles(user_ids, tool_context)
+    if error:
+        return {"status": "error", "result": error}
+
+    if len(profiles) >= INDEX_MIN_USERS:
+        return {"status": "success", "result": profile_index(profiles).top_partners(top_n=top_n)}
+    features = ProfileFeatures.from_profiles(profiles)
+    scores = compatibility_matrix(features)
+    return {"status": "success", "result": top_partners(scores, features.user_ids, top_n)}
+
+
+def find_users(
+    tool_context: ToolContext,
+    mbti_type: str = "",
+    dominant_function: str = "",
+    temperament: str = "",
+    work_preference: str = "",
+) -> dict[str, str | list[str]]:
+    """
+    Find the users whose profile matches all given criteria, e.g. to restrict matching to part of the pool.
+    Leave a criterion empty to ignore it.
+
+    Args:
+        tool_context (ToolContext): The ADK tool context.
+        mbti_type (str): MBTI type, e.g. "INTJ".
+        dominant_function (str): Dominant cognitive function, e.g. "Ni".
+        temperament (str): Temperament: "NT", "NF", "ST" (the S_J types) or "SP".
+        work_preference (str): Work preference, e.g. "Team-oriented".
+
+    Returns:
+        dict: Response dictionary containing:
+            - "status" (str): Either "success" or "error"
+            - "result" (list[str]): When status is "success", the matching user IDs
+
+    Examples:
+        >>> find_users(tool_context, temperament="NT", work_preference="Independent")
+        {"status": "success", "result": ["u1", "u7"]}
+    """
+    if not tool_context.state.get(USER_PROFILES) and tool_context.state.get(USER_PROFILES_VERSION) is None:
+        return {"status": "error", "result": "No user profiles loaded"}
+
+    values = dict(zip(INDEXED_FIELDS, (mbti_type.upper(), dominant_function, temperament.upper(), work_preference)))
+    criteria = {field: value for field, value in values.items() if value}
+    return {"status": "success", "result": find_profiles(tool_context.state, **criteria)}
+
+
+def form_groups(
+    user_ids: list[str],
+    tool_context: ToolContext,
+    group_size: int = 2,
+) -> FormGroupsResponse:
+    """
+    Form groups of maximum total compatibility from the users' MBTI profiles and store them as the matched
+    groups. Groups are computed deterministically in code; write a rationale for each group when presenting them.
+
+    Args:
+        user_ids (list[str]): The user IDs to group. Use an empty list to group every user with a profile.
+        tool_context (ToolContext): The ADK tool context.
+        group_size (int): Number of users per group (at least 2). When the users cannot be split evenly,
+            some groups get one extra member.
+
+    Returns:
+        dict: Response dictionary containing:
+            - "status" (str): Either "success" or "error"
+            - "result" (dict): When status is "success", the matcher response:
+                * "matched_groups": maps group IDs to {"user_ids": [...], "complementary_traits": [...]},
+                  where the traits list each member's MBTI type and dominant/auxiliary functions
+                * "matching_strategy": how the groups were formed
+
+    Examples:
+        >>> form_groups(["u1", "u2", "u3", "u4"], tool_context)
+        {"status": "success", "result": {"matched_groups": {"4f1c...": {"user_ids": ["u1", "u3"], "complementary_traits": ["INTJ (Ni-Te)", "ENFP (Ne-Fi)"]}, ...}, "matching_strategy": "..."}}
+    """
+    if group_size < 2:
+        return {"status": "error", "result": "Groups must have at least two users"}
+    profiles, error = _select_profiles(user_ids, tool_context)
+    if error:
+        return {"status": "error", "result": error}
+
+    try:
+        if len(profiles) >= INDEX_MIN_USERS:
+            # Large pools are grouped over indexed candidate pairs instead of the full matrix
+            index = _shared_index(user_ids, tool_context) or profile_index(profiles)
+            user_order = index.user_ids
+            groups, total = _form_groups_sparse(index, profiles, group_size)
+        else:
+            features = ProfileFeatures.from_profiles(profiles)
+            user_order = features.user_ids
+            scores = compatibility_matrix(features)
+            groups = grouping.form_groups(
+                scores,
+                group_size=group_size,
+                time_limit_seconds=GROUPING_TIME_LIMIT_SECONDS,
+                num_workers=GROUPING_NUM_WORKERS,
+            )
+            total = grouping.groups_score(scores, groups)
+    except Exception as e:
+        logger.error(f"Error forming groups: {e}")
+        return {"status": "error", "result": str(e)}
+
+    response = MatcherResponse.from_list(
+        [
+            UserGroup(
+                user_ids=[user_order[row] for row in group],
+                complementary_traits=[_traits(profiles[user_order[row]]) for row in group],
+            )
+            for group in groups
+        ],
+        matching_strategy=(
+            f"Groups of {group_size} maximizing the total pairwise compatibility score "
+            f"({total:.2f} over {len(groups)} groups)"
+        ),
+    )
+    state = matched_groups_state(response)
+    tool_context.state.update(state)
+    return {"status": "success", "result": state[MATCHED_GROUPS]}
+
+
+def update_groups(
+    added_user_ids: list[str],
+    removed_user_ids: list[str],
+    tool_context: ToolContext,
+    group_size: int = 0,
+) -> FormGroupsResponse:
+    """
+    Update the stored matched groups when users join or leave, without regrouping everyone. Only the groups that
+    lose members or receive newcomers change; all other groups keep their group ID, members and rationale, so
+    meeting times already found for them stay valid.
+
+    Args:
+        added_user_ids (list[str]): User IDs joining the pool.
+        removed_user_ids (list[str]): User IDs leaving the pool.
+        tool_context (ToolContext): The ADK tool context.
+        group_size (int): Target number of users per group. Use 0 to keep the most common size of the existing groups.
+
+    Returns:
+        dict: Response dictionary containing:
+            - "status" (str): Either "success" or "error"
+            - "result" (dict): When status is "success", the updated matcher response with the same structure as
+              the `form_groups` response. Changed groups have no rationale.
+            - "changed_groups" (list[str]): IDs of the groups that were created or changed. Groups that were
+              dissolved are no longer in the result.
+
+    Examples:
+        >>> update_groups(["u9"], ["u2"], tool_context)
+        {"status": "success", "result": {"matched_groups": {...}, "matching_strategy": "..."}, "changed_groups": ["4f1c..."]}
+    """
+    if not tool_context.state.get(MATCHED_GROUPS):
+        return {"status": "error", "result": "There are no matched groups to update yet"}
+    try:
+        matched = MatcherResponse.model_validate(tool_context.state[MATCHED_GROUPS])
+    except Exception as e:
+        logger.error(f"Invalid matched groups in state: {e}")
+        return {"status": "error", "result": f"Invalid matched groups: {e}"}
+
+    group_ids = list(matched.matched_groups)
+    groups = [list(group.user_ids) for group in matched.matched_groups.values()]
+    # Only the grouped and the new users are scored, so only their profiles are loaded
+    profiles, _ = load_profiles(tool_context.state, [user_id for group in groups for user_id in group] + added_user_ids)
+    missing = [user_id for user_id in added_user_ids if user_id not in profiles]
+    if missing:
+        return {"status": "error", "result": f"No profile found for users: {', '.join(missing)}"}
+
+    if group_size <= 0:
+        group_size = max(2, Counter(len(group) for group in groups).most_common(1)[0][0])
+
+    # Cached scores are only reused while the profiles keep their version
+    version = profiles_version(tool_context.state) or profile_fingerprint(profiles)
+    # In large pools newcomers only fill the open groups of their indexed candidate partners
+    index = _shared_index([], tool_context)
+    repaired, changed = grouping.repair_groups(
+        groups,
+        added_user_ids,
+        removed_user_ids,
+        lambda left, right: pair_score_cache.matrix(profiles, left, right, version),
+        group_size,
+        partners=_indexed_partners(index) if index is not None else None,
+    )
+
+    matched_groups = {}
+    changed_ids = []
+    for index, user_ids in enumerate(repaired):
+        if not user_ids:
+            continue
+        if index not in changed:
+            matched_groups[group_ids[index]] = matched.matched_groups[group_ids[index]]
+            continue
+        group = UserGroup(
+            user_ids=user_ids,
+            complementary_traits=[_traits(profiles[user_id]) for user_id in user_ids if user_id in profiles] or None,
+        )
+        if index < len(group_ids):
+            matched_groups[group_ids[index]] = group
+            changed_ids.append(group_ids[index])
+        else:
+            new_id = next(iter(MatcherResponse.from_list([group]).matched_groups))
+            matched_groups[new_id] = group
+            changed_ids.append(new_id)
+
+    if not matched_groups:
+        return {"status": "error", "result": "No users left to group"}
+
+    logger.info(f"Updated {len(changed_ids)} of {len(matched_groups)} matched groups")
+    response = MatcherResponse(matched_groups=matched_groups, matching_strategy=matched.matching_strategy)
+    state = matched_groups_state(response)
+    tool_context.state.update(state)
+    return {"status": "success", "result": state[MATCHED_GROUPS], "changed_groups": changed_ids}
+
+
+def _shared_index(user_ids: list[str], tool_context: ToolContext) -> ProfileIndex | None:
+    """
+    Index of `user_ids` (all profiles if empty) when they are a large selection of the shared profiles, else None.
+
+    The index is cached by profile version, so only the first call for a version loads and indexes
+    the profiles. Users without a profile are left out of the index.
+    """
+    version = profiles_version(tool_context.state, user_ids)
+    if version is None or (len(user_ids) if user_ids else len(profile_repository)) < INDEX_MIN_USERS:
+        return None
+    return cached_profile_index(version, lambda: load_profiles(tool_context.state, user_ids)[0])
+
+
+def _indexed_partners(index: ProfileIndex) -> Callable[[list[str]], dict[str, list[str]]]:
+    """Candidate partner user IDs of the given users that are in `index`, for `grouping.repair_groups`."""
+
+    def partners(user_ids: list[str]) -> dict[str, list[str]]:
+        indexed = [user_id for user_id in user_ids if user_id in index.rows]
+        candidates = index.candidate_rows(np.array([index.rows[user_id] for user_id in indexed], dtype=np.int64))
+        return {
+            user_id: [index.user_ids[row] for row in rows.tolist()] for user_id, rows in zip(indexed, candidates)
+        }
+
+    return partners
+
+
+def _form_groups_sparse(
+    index: ProfileIndex,
+    profiles: dict[str, dict[str, Any]],
+    group_size: int,
+) -> tuple[list[list[int]], float]:
+    """
+    Groups of index rows and their total score, formed from candidate pairs only.
+
+    The first round uses the candidates of the whole index; later rounds index the
+    users still free, so they get candidates among each other.
+    """
+    def candidate_pairs(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if len(rows) == len(index):
+            return index.candidate_pairs()
+        free_users = [index.user_ids[row] for row in rows.tolist()]
+        left, right, scores = ProfileIndex({user_id: profiles[user_id] for user_id in free_users}).candidate_pairs()
+        return rows[left], rows[right], scores
+
+    def score(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        scores = compatibility_matrix(index.features.subset(left), index.features.subset(right))
+        scores[np.equal.outer(left, right)] = 0.0
+        return scores
+
+    groups = grouping.form_groups_sparse(
+        len(index), candidate_pairs, score, group_size, time_limit_seconds=GROUPING_TIME_LIMIT_SECONDS,
+    )
+    return groups, grouping.sparse_groups_score(groups, score)
+
+
+def _select_profiles(
+    user_ids: list[str],
+    tool_context: ToolContext,
+) -> tuple[dict[str, dict[str, Any]], str | None]:
+    """Look up the profiles of `user_ids` (all profiles if empty) in state, with an error message if unusable."""
+    profiles, missing = load_profiles(tool_context.state, user_ids)
+    if missing:
+        return {}, f"No profile found for users: {', '.join(missing)}"
+    if len(profiles) < 2:
+        return {}, "At least two users with profiles are required"
+    return profiles, None
+
+
+def _traits(profile: dict[str, Any]) -> str:
+    """Short trait summary of a profile, e.g. "INTJ (Ni-Te)"."""
+    return f"{profile['mbti_type']} ({profile.get('dominant_function', '?')}-{profile.get('auxiliary_function', '?')})"
@@ -1,5 +1,4 @@
 import logging
-import litellm
 from google.adk import Agent
 from google.adk.tools import BaseTool, ToolContext
 from google.adk.models.lite_llm import LiteLlm
@@ -7,15 +6,21 @@ from typing import Any, Optional
 
 from .prompt import INSTRUCTION
 from .tools import (
+  assign_meet_times,
   fetch_time_availabilities,
   get_meet_times,
 )
 from coordination_agent.shared_libraries.callbacks import (
     before_tool_trace,
+    after_tool_trace,
     before_agent_trace,
     after_agent_trace,
+    before_model_trace,
+    after_model_trace,
+    describe_value,
 )
 from coordination_agent.shared_libraries.constants import (
+    ASSIGN_MEET_TIMES,
     FETCH_TIME_AVAILABILITIES,
     GET_MEET_TIMES,
     MEETING_TIMES,
@@ -24,25 +29,31 @@ from coordination_agent.shared_libraries.constants import (
 from coordination_agent.tools.memory import memorize
 
 logger = logging.getLogger(__name__)
-litellm._turn_on_debug()
 
 def after_tool_callback(
     tool: BaseTool, args: dict[str, Any], tool_context: ToolContext, tool_response: dict
 ) -> Optional[dict]:
+    after_tool_trace(tool, args, tool_context, tool_response)
     tool_name = tool.name
+    debug = logger.isEnabledFor(logging.DEBUG)
     logger.info(f"Run tool '{tool_name}'")
-    logger.debug(f"With args: {args}")
-    logger.debug(f"With tool_response: {tool_response}")
+    if debug:
+        logger.debug(f"With args: {args}")
+        logger.debug(f"With tool_response: {tool_response}")
 
     if tool_name == FETCH_TIME_AVAILABILITIES:
         availabilities = tool_response.get("result", {})
         memorize(USER_AVAILABILITIES, availabilities, tool_context)
-        logger.debug(f"Updated state with user availabilities: {tool_context.state.__dict__}")
+        logger.info(f"Updated state with user availabilities: {describe_value(availabilities)}")
+        if debug:
+            logger.debug(f"Updated state with user availabilities: {tool_context.state.__dict__}")
 
-    if tool_name == GET_MEET_TIMES:
+    if tool_name in (GET_MEET_TIMES, ASSIGN_MEET_TIMES):
         meeting_times = tool_response.get("result", {})
         memorize(MEETING_TIMES, meeting_times, tool_context)
-        logger.debug(f"Updated state with meeting times: {tool_context.state.__dict__}")
+        logger.info(f"Updated state with meeting times: {describe_value(meeting_times)}")
+        if debug:
+            logger.debug(f"Updated state with meeting times: {tool_context.state.__dict__}")
 
     return None
 
@@ -56,10 +67,13 @@ scheduler = Agent(
     tools=[
         fetch_time_availabilities,
         get_meet_times,
+        assign_meet_times,
     ],
     instruction=INSTRUCTION,
     before_agent_callback=before_agent_trace,
     after_agent_callback=after_agent_trace,
+    before_model_callback=before_model_trace,
+    after_model_callback=after_model_trace,
     before_tool_callback=before_tool_trace,
     after_tool_callback=after_tool_callback,
 )
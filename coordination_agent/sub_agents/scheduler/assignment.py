@@ -0,0 +1,212 @@
+"""Conflict-free assignment of one meeting block per group."""
+
+import logging
+import time
+from typing import Optional
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # Without OR-Tools only the greedy assignment is available
+    cp_model = None
+
+from .intervals import Interval
+
+logger = logging.getLogger(__name__)
+
+
+def _is_free(
+    group: list[str],
+    block: Interval,
+    busy_users: dict[int, set[str]],
+    load: dict[int, int],
+    max_concurrent_meetings: int,
+) -> bool:
+    """Check whether a group can take a block given the assignments made so far."""
+    start = block[0]
+    if max_concurrent_meetings and load.get(start, 0) >= max_concurrent_meetings:
+        return False
+    return busy_users.get(start, set()).isdisjoint(group)
+
+
+def assign_greedy(
+    groups: list[list[str]],
+    candidates: list[list[Interval]],
+    max_concurrent_meetings: int = 0,
+) -> list[Optional[Interval]]:
+    """
+    Give each group its earliest conflict-free block, most constrained groups first.
+
+    Args:
+        groups: Groups of user IDs.
+        candidates: Candidate meeting blocks per group, all of the same size and
+            on the same grid.
+        max_concurrent_meetings: Maximum number of meetings per block (e.g. rooms),
+            or 0 for no limit.
+
+    Returns:
+        list[Optional[Interval]]: The chosen block per group, or None when the group
+        could not be placed.
+    """
+    busy_users: dict[int, set[str]] = {}
+    load: dict[int, int] = {}
+    assignment: list[Optional[Interval]] = [None] * len(groups)
+
+    for index in sorted(range(len(groups)), key=lambda index: len(candidates[index])):
+        for block in sorted(candidates[index]):
+            if _is_free(groups[index], block, busy_users, load, max_concurrent_meetings):
+                assignment[index] = block
+                busy_users.setdefault(block[0], set()).update(groups[index])
+                load[block[0]] = load.get(block[0], 0) + 1
+                break
+    return assignment
+
+
+def assignment_objective(assignment: list[Optional[Interval]], candidates: list[list[Interval]]) -> tuple[int, int]:
+    """
+    Quality of an assignment, comparable with `>`: the number of placed groups
+    first, then how early they meet, as ranks among the candidate starts like in
+    the CP-SAT objective.
+    """
+    rank = {start: position for position, start in enumerate(sorted({block[0] for blocks in candidates for block in blocks}))}
+    placed = [rank[block[0]] for block in assignment if block is not None]
+    return len(placed), -sum(placed)
+
+
+def assign_cpsat(
+    groups: list[list[str]],
+    candidates: list[list[Interval]],
+    max_concurrent_meetings: int = 0,
+    time_limit_seconds: float = 10.0,
+    num_workers: int = 8,
+    hint: Optional[list[Optional[Interval]]] = None,
+) -> Optional[list[Optional[Interval]]]:
+    """
+    Assign one block per group with Google OR-Tools CP-SAT.
+
+    The objective places as many groups as possible and, among those solutions,
+    prefers earlier blocks. Every user attends at most one meeting per block and
+    at most `max_concurrent_meetings` meetings share a block. The search stops
+    when the optimum is proven or `time_limit_seconds`, which includes building
+    the model, is reached first.
+
+    Args:
+        groups: Groups of user IDs.
+        candidates: Candidate meeting blocks per group, all of the same size and
+            on the same grid.
+        max_concurrent_meetings: Maximum number of meetings per block, or 0 for no limit.
+        time_limit_seconds: Wall time budget for building the model and solving it.
+        num_workers: Number of parallel search workers.
+        hint: Optional feasible assignment (e.g. from `assign_greedy`) used as a
+            warm start.
+
+    Returns:
+        Optional[list[Optional[Interval]]]: The chosen block per group, or None if
+        the solver found no solution within the time limit.
+    """
+    if cp_model is None:
+        raise ImportError("The CP-SAT assignment requires the `ortools` package")
+    deadline = time.monotonic() + time_limit_seconds
+
+    starts = sorted({block[0] for blocks in candidates for block in blocks})
+    rank = {start: position for position, start in enumerate(starts)}
+    # Each placed group is worth more than any total earliness bonus
+    base_weight = len(groups) * len(starts) + len(starts)
+
+    model = cp_model.CpModel()
+    choices: list[list[tuple[Interval, cp_model.IntVar]]] = []
+    by_start: dict[int, list[cp_model.IntVar]] = {}
+    by_user_start: dict[tuple[str, int], list[cp_model.IntVar]] = {}
+    objective = []
+
+    for index, (group, blocks) in enumerate(zip(groups, candidates)):
+        group_choices = []
+        for block in sorted(set(blocks)):
+            chosen = model.NewBoolVar(f"group_{index}_at_{block[0]}")
+            group_choices.append((block, chosen))
+            by_start.setdefault(block[0], []).append(chosen)
+            for user_id in set(group):
+                by_user_start.setdefault((user_id, block[0]), []).append(chosen)
+            objective.append(chosen * (base_weight - rank[block[0]]))
+            if hint is not None:
+                model.AddHint(chosen, hint[index] == block)
+        if group_choices:
+            model.AddAtMostOne(chosen for _, chosen in group_choices)
+        choices.append(group_choices)
+
+    for variables in by_user_start.values():
+        if len(variables) > 1:
+            model.AddAtMostOne(variables)
+    if max_concurrent_meetings:
+        for variables in by_start.values():
+            if len(variables) > max_concurrent_meetings:
+                model.Add(sum(variables) <= max_concurrent_meetings)
+
+    model.Maximize(sum(objective))
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        logger.info("CP-SAT assignment skipped: building the model used up the time limit")
+        return None
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = remaining
+    solver.parameters.num_workers = num_workers
+    status = solver.Solve(model)
+    logger.info(f"CP-SAT assignment finished with status {solver.StatusName(status)} in {solver.WallTime():.3f}s")
+
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+
+    assignment: list[Optional[Interval]] = []
+    for group_choices in choices:
+        assignment.append(next(
+            (block for block, chosen in group_choices if solver.BooleanValue(chosen)),
+            None,
+        ))
+    return assignment
+
+
+def assign_meeting_blocks(
+    groups: list[list[str]],
+    candidates: list[list[Interval]],
+    max_concurrent_meetings: int = 0,
+    time_limit_seconds: float = 10.0,
+    num_workers: int = 8,
+) -> list[Optional[Interval]]:
+    """
+    Pick one conflict-free block per group.
+
+    A greedy assignment is computed first and used to warm start CP-SAT. A
+    time-limited CP-SAT solution is not guaranteed to be as good as its hint, so
+    the greedy result is kept unless CP-SAT places more groups, or as many
+    groups earlier. It is also returned when OR-Tools is not installed or the
+    solver does not find a solution within `time_limit_seconds`.
+
+    Args:
+        groups: Groups of user IDs.
+        candidates: Candidate meeting blocks per group.
+        max_concurrent_meetings: Maximum number of meetings per block, or 0 for no limit.
+        time_limit_seconds: Overall wall time budget, including the greedy
+            assignment and building the CP-SAT model.
+        num_workers: Number of parallel search workers.
+
+    Returns:
+        list[Optional[Interval]]: The chosen block per group, or None when the group
+        could not be placed.
+    """
+    start = time.monotonic()
+    greedy = assign_greedy(groups, candidates, max_concurrent_meetings)
+    remaining = time_limit_seconds - (time.monotonic() - start)
+    if cp_model is None or not any(candidates) or remaining <= 0:
+        return greedy
+
+    solution = assign_cpsat(
+        groups,
+        candidates,
+        max_concurrent_meetings=max_concurrent_meetings,
+        time_limit_seconds=remaining,
+        num_workers=num_workers,
+        hint=greedy,
+    )
+    if solution is not None and assignment_objective(solution, candidates) > assignment_objective(greedy, candidates):
+        return solution
+    return greedy
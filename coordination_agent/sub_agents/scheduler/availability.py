@@ -0,0 +1,105 @@
+"""Compact block-bitset availability used by the `bitset` scheduler engine."""
+
+import functools
+import operator
+from typing import NamedTuple, Optional
+
+from .intervals import Interval
+
+
+class BlockAvailability(NamedTuple):
+    """
+    Immutable availability stored as a bitset of block-sized cells.
+
+    Bit `i` is set when the block starting at `origin + i * block_minutes` is fully
+    available. A month of 30-minute blocks fits in a ~200 byte integer, and the
+    availability shared by a group is the bitwise AND of its members' bitsets.
+    Conversion from and to intervals is lossless for slots on the block grid.
+    """
+    origin: int  # epoch minutes of bit 0, on the block grid
+    block_minutes: int
+    bits: int
+
+    @classmethod
+    def from_intervals(
+        cls,
+        intervals: list[Interval],
+        origin: int,
+        block_minutes: int,
+    ) -> 'BlockAvailability':
+        """Build a bitset from normalized intervals, keeping only fully covered blocks."""
+        bits = 0
+        for start, end in intervals:
+            first = max(0, -(-(start - origin) // block_minutes))
+            last = (end - origin) // block_minutes
+            if last > first:
+                bits |= ((1 << (last - first)) - 1) << first
+        return cls(origin=origin, block_minutes=block_minutes, bits=bits)
+
+    def to_intervals(self) -> list[Interval]:
+        """Convert the runs of set bits back to normalized intervals."""
+        intervals = []
+        bits = self.bits
+        offset = 0
+        while bits:
+            # Skip to the lowest set bit, then measure the run of ones from there
+            skip = (bits & -bits).bit_length() - 1
+            bits >>= skip
+            offset += skip
+            run = (bits ^ (bits + 1)).bit_length() - 1
+            intervals.append((
+                self.origin + offset * self.block_minutes,
+                self.origin + (offset + run) * self.block_minutes,
+            ))
+            bits >>= run
+            offset += run
+        return intervals
+
+    def __and__(self, other: 'BlockAvailability') -> 'BlockAvailability':
+        if (self.origin, self.block_minutes) != (other.origin, other.block_minutes):
+            raise ValueError("Cannot intersect availability on different block grids")
+        return self._replace(bits=self.bits & other.bits)
+
+    def block_count(self) -> int:
+        """Number of available blocks."""
+        return self.bits.bit_count()
+
+
+def intersect_groups_bitset(
+    groups: list[list[str]],
+    user_intervals: dict[str, list[Interval]],
+    block_minutes: int,
+    origin: int = 0,
+) -> list[Optional[list[Interval]]]:
+    """
+    Intersect the availability of many groups with bitwise ANDs.
+
+    Every user is encoded once on a grid shared by the whole population, so each
+    group costs one AND per member instead of an interval merge.
+
+    Args:
+        groups: Groups of user IDs.
+        user_intervals: Normalized intervals per user ID.
+        block_minutes: Size of a bitset cell in minutes.
+        origin: Epoch minute the cell grid is anchored to, see `grid_origin`.
+
+    Returns:
+        list[Optional[list[Interval]]]: The block-aligned intersection for each
+        group, in input order, or None for groups with a member missing from
+        `user_intervals`.
+    """
+    starts = [intervals[0][0] for intervals in user_intervals.values() if intervals]
+    first = origin + ((min(starts) - origin) // block_minutes) * block_minutes if starts else origin
+    bitsets = {
+        user_id: BlockAvailability.from_intervals(intervals, first, block_minutes)
+        for user_id, intervals in user_intervals.items()
+    }
+
+    results: list[Optional[list[Interval]]] = []
+    for group in groups:
+        if not group or any(user_id not in bitsets for user_id in group):
+            results.append(None)
+            continue
+        shared = functools.reduce(operator.and_, (bitsets[user_id] for user_id in group))
+        results.append(shared.to_intervals())
+    return results
@@ -0,0 +1,234 @@
+"""Integer-minute interval primitives used by the scheduler engines."""
+
+import datetime
+import heapq
+from typing import Iterable, Iterator, Optional
+
+Interval = tuple[int, int]  # (start, end) in epoch minutes, half-open
+
+_NAIVE_EPOCH = datetime.datetime(1970, 1, 1)
+_AWARE_EPOCH = _NAIVE_EPOCH.replace(tzinfo=datetime.timezone.utc)
+
+
+def to_epoch_minutes(value: datetime.datetime, round_up: bool = False, aware: Optional[bool] = None) -> int:
+    """
+    Convert a datetime to whole minutes since the Unix epoch.
+
+    Naive datetimes are measured against a naive epoch so that they round-trip
+    through `from_epoch_minutes` without picking up a timezone. Naive and aware
+    datetimes therefore do not share a timeline: callers converting values that
+    must be compared pass `aware` to reject the odd one out.
+
+    Args:
+        value: The datetime to convert.
+        round_up: Round partial minutes up instead of truncating them.
+        aware: Whether `value` must be timezone-aware (True) or naive (False); None accepts both.
+
+    Returns:
+        int: Minutes since the epoch.
+
+    Raises:
+        ValueError: If `value` does not match `aware`.
+    """
+    if aware is not None and (value.tzinfo is not None) != aware:
+        expected = "timezone-aware" if aware else "naive"
+        raise ValueError(f"Cannot mix naive and timezone-aware times: expected a {expected} time, got {value.isoformat()}")
+    epoch = _NAIVE_EPOCH if value.tzinfo is None else _AWARE_EPOCH
+    delta = value - epoch
+    seconds = delta.days * 86400 + delta.seconds
+    if round_up and (delta.microseconds or seconds % 60):
+        return seconds // 60 + 1
+    return seconds // 60
+
+
+def from_epoch_minutes(
+    minutes: int,
+    tzinfo: Optional[datetime.tzinfo] = None,
+) -> datetime.datetime:
+    """Convert minutes since the Unix epoch back to a datetime in `tzinfo`."""
+    if tzinfo is None:
+        return _NAIVE_EPOCH + datetime.timedelta(minutes=minutes)
+    return (_AWARE_EPOCH + datetime.timedelta(minutes=minutes)).astimezone(tzinfo)
+
+
+def merge_intervals(intervals: list[Interval]) -> list[Interval]:
+    """
+    Normalize intervals into a sorted list of disjoint, non-adjacent intervals.
+    Empty intervals are dropped.
+    """
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def merge_consecutive(intervals: Iterable[Interval]) -> list[Interval]:
+    """
+    Join intervals where each starts exactly where the previous one ends, keeping
+    their order, e.g. blocks ranked best first. On sorted, disjoint intervals this
+    matches `merge_intervals`.
+    """
+    merged: list[Interval] = []
+    for start, end in intervals:
+        if merged and start == merged[-1][1]:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _events(intervals: list[Interval]) -> Iterator[tuple[int, int]]:
+    """Yield sorted (time, delta) sweep events for normalized intervals."""
+    for start, end in intervals:
+        yield start, 1
+        yield end, -1
+
+
+def intersect_intervals(interval_lists: list[list[Interval]]) -> list[Interval]:
+    """
+    Intersect several normalized interval lists with a k-way sweep.
+
+    Each list must be sorted and disjoint (see `merge_intervals`), which makes
+    its event stream sorted as well. The streams are merged with a heap, so the
+    cost is O(total intervals * log(number of lists)).
+
+    Args:
+        interval_lists: One normalized interval list per participant.
+
+    Returns:
+        list[Interval]: The normalized intervals covered by every list.
+    """
+    if not interval_lists:
+        return []
+    if len(interval_lists) == 1:
+        return list(interval_lists[0])
+
+    required = len(interval_lists)
+    active = 0
+    open_start = None
+    result: list[Interval] = []
+
+    # Ends sort before starts at the same instant (-1 < 1), so touching
+    # intervals never produce a zero-length overlap.
+    for time, delta in heapq.merge(*(_events(lst) for lst in interval_lists)):
+        active += delta
+        if delta > 0 and active == required:
+            open_start = time
+        elif delta < 0 and open_start is not None:
+            if time > open_start:
+                result.append((open_start, time))
+            open_start = None
+    return result
+
+
+def clip_intervals(intervals: list[Interval], lower: Optional[int], upper: Optional[int]) -> list[Interval]:
+    """Clip normalized intervals to the optional [lower, upper) window."""
+    clipped = []
+    for start, end in intervals:
+        if lower is not None:
+            start = max(start, lower)
+        if upper is not None:
+            end = min(end, upper)
+        if start < end:
+            clipped.append((start, end))
+    return clipped
+
+
+def grid_origin(tzinfo: Optional[datetime.tzinfo]) -> int:
+    """
+    Epoch minute the block grid is anchored to so that blocks start on the local
+    clock of `tzinfo`, e.g. at :00 and :30 in a +05:45 zone rather than at :15 and
+    :45. Naive times and zones whose offset depends on the date use a UTC grid.
+    """
+    offset = tzinfo.utcoffset(None) if tzinfo is not None else None
+    if offset is None:
+        return 0
+    return -int(offset.total_seconds() // 60)
+
+
+def align_intervals(
+    intervals: list[Interval],
+    block_minutes: int,
+    min_duration_minutes: int,
+    origin: int = 0,
+) -> list[Interval]:
+    """
+    Shrink intervals onto the block grid and drop the ones that get too short.
+
+    Starts are rounded up and ends are rounded down to `origin` plus a multiple
+    of `block_minutes`, so only whole blocks that are fully available remain.
+    Pass `grid_origin(tzinfo)` to align blocks to a local clock.
+    """
+    aligned = []
+    for start, end in intervals:
+        start = origin - (-(start - origin) // block_minutes) * block_minutes
+        end = origin + ((end - origin) // block_minutes) * block_minutes
+        if end - start >= min_duration_minutes:
+            aligned.append((start, end))
+    return aligned
+
+
+def iter_blocks(intervals: Iterable[Interval], block_minutes: int) -> Iterator[Interval]:
+    """Lazily split intervals into consecutive blocks of `block_minutes`, dropping remainders."""
+    for start, end in intervals:
+        while start + block_minutes <= end:
+            yield start, start + block_minutes
+            start += block_minutes
+
+
+def split_intervals(intervals: list[Interval], block_minutes: int) -> list[Interval]:
+    """Split intervals into consecutive blocks of `block_minutes`, dropping remainders."""
+    return list(iter_blocks(intervals, block_minutes))
+
+
+def intersect_groups(
+    groups: list[list[str]],
+    user_intervals: dict[str, list[Interval]],
+) -> list[Optional[list[Interval]]]:
+    """
+    Intersect the availability of many groups in one pass.
+
+    Members of every group are ordered by how many groups they belong to, so
+    groups that share members also share a prefix. Each prefix is intersected
+    once and cached, which lets later groups start from the partial
+    intersection of the members they have in common with earlier ones.
+
+    Args:
+        groups: Groups of user IDs.
+        user_intervals: Normalized intervals per user ID, parsed once up front.
+
+    Returns:
+        list[Optional[list[Interval]]]: The intersection for each group, in input
+        order, or None for groups with a member missing from `user_intervals`.
+    """
+    frequency: dict[str, int] = {}
+    for group in groups:
+        for user_id in set(group):
+            frequency[user_id] = frequency.get(user_id, 0) + 1
+
+    prefixes: dict[tuple[str, ...], list[Interval]] = {}
+    results: list[Optional[list[Interval]]] = []
+    for group in groups:
+        members = sorted(set(group), key=lambda user_id: (-frequency[user_id], user_id))
+        if not members or any(user_id not in user_intervals for user_id in members):
+            results.append(None)
+            continue
+
+        # Resume from the longest prefix that has already been intersected
+        depth = len(members)
+        while depth > 0 and tuple(members[:depth]) not in prefixes:
+            depth -= 1
+        current = prefixes[tuple(members[:depth])] if depth else None
+
+        for index in range(depth, len(members)):
+            intervals = user_intervals[members[index]]
+            current = intervals if current is None else intersect_intervals([current, intervals])
+            prefixes[tuple(members[:index + 1])] = current
+        results.append(current)
+    return results
@@ -0,0 +1,132 @@
+"""NumPy availability matrix used by the `matrix` scheduler engine."""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from .intervals import Interval
+
+
+class AvailabilityMatrix(NamedTuple):
+    """
+    Users x time-blocks boolean matrix for a whole population.
+
+    `free[row, t]` is True when the user mapped to `row` by `user_index` is fully
+    available in the block starting at `origin + t * block_minutes`.
+    """
+    user_index: dict[str, int]
+    origin: int  # epoch minutes of column 0, on the block grid
+    block_minutes: int
+    free: np.ndarray  # shape (users, blocks), dtype bool
+
+    @classmethod
+    def from_intervals(
+        cls,
+        user_intervals: dict[str, list[Interval]],
+        block_minutes: int,
+        origin: int = 0,
+    ) -> 'AvailabilityMatrix':
+        """
+        Build the matrix from normalized intervals per user ID, with columns on
+        the block grid anchored at epoch minute `origin`.
+        """
+        user_index = {user_id: row for row, user_id in enumerate(user_intervals)}
+        rows, firsts, lasts = [], [], []
+        for user_id, intervals in user_intervals.items():
+            for start, end in intervals:
+                rows.append(user_index[user_id])
+                firsts.append(-(-(start - origin) // block_minutes))
+                lasts.append((end - origin) // block_minutes)
+
+        if not rows:
+            return cls(user_index, origin, block_minutes, np.zeros((len(user_index), 0), dtype=bool))
+
+        rows = np.asarray(rows, dtype=np.int64)
+        firsts = np.asarray(firsts, dtype=np.int64)
+        lasts = np.asarray(lasts, dtype=np.int64)
+        keep = lasts > firsts
+        rows, firsts, lasts = rows[keep], firsts[keep], lasts[keep]
+        if not len(rows):
+            return cls(user_index, origin, block_minutes, np.zeros((len(user_index), 0), dtype=bool))
+
+        # Mark slot boundaries with +1/-1 and integrate them along the time axis
+        offset = firsts.min()
+        width = int(lasts.max() - offset)
+        deltas = np.zeros((len(user_index), width + 1), dtype=np.int32)
+        np.add.at(deltas, (rows, firsts - offset), 1)
+        np.add.at(deltas, (rows, lasts - offset), -1)
+        free = np.cumsum(deltas, axis=1)[:, :width] > 0
+        return cls(user_index, origin + int(offset) * block_minutes, block_minutes, free)
+
+    def groups_free(self, groups: list[list[str]]) -> np.ndarray:
+        """
+        Blocks where every member of each group is free.
+
+        All groups are reduced at once with `np.logical_and.reduceat` over the
+        concatenated member rows, so the cost is one vectorized pass over
+        (total group members x blocks). Every group must be non-empty and only
+        contain known users.
+
+        Returns:
+            np.ndarray: Boolean matrix of shape (groups, blocks).
+        """
+        if not groups:
+            return np.zeros((0, self.free.shape[1]), dtype=bool)
+        members = np.fromiter(
+            (self.user_index[user_id] for group in groups for user_id in group),
+            dtype=np.int64,
+        )
+        offsets = np.cumsum([0] + [len(group) for group in groups[:-1]])
+        return np.logical_and.reduceat(self.free[members], offsets, axis=0)
+
+    def rows_to_intervals(self, free: np.ndarray) -> list[list[Interval]]:
+        """Convert each boolean row of `free` to runs of epoch-minute intervals."""
+        padded = np.zeros((free.shape[0], free.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = free
+        edges = np.diff(padded, axis=1)
+        start_rows, start_cols = np.nonzero(edges == 1)
+        _, end_cols = np.nonzero(edges == -1)
+
+        starts = (self.origin + start_cols * self.block_minutes).tolist()
+        ends = (self.origin + end_cols * self.block_minutes).tolist()
+        counts = np.bincount(start_rows, minlength=free.shape[0]).tolist()
+
+        intervals = []
+        position = 0
+        for count in counts:
+            intervals.append(list(zip(starts[position:position + count], ends[position:position + count])))
+            position += count
+        return intervals
+
+
+def intersect_groups_matrix(
+    groups: list[list[str]],
+    user_intervals: dict[str, list[Interval]],
+    block_minutes: int,
+    origin: int = 0,
+) -> list[Optional[list[Interval]]]:
+    """
+    Intersect the availability of many groups with vectorized matrix reductions.
+
+    Args:
+        groups: Groups of user IDs.
+        user_intervals: Normalized intervals per user ID.
+        block_minutes: Size of a matrix column in minutes.
+        origin: Epoch minute the column grid is anchored to, see `grid_origin`.
+
+    Returns:
+        list[Optional[list[Interval]]]: The block-aligned intersection for each
+        group, in input order, or None for groups with a member missing from
+        `user_intervals`.
+    """
+    matrix = AvailabilityMatrix.from_intervals(user_intervals, block_minutes, origin)
+    valid = [
+        index for index, group in enumerate(groups)
+        if group and all(user_id in matrix.user_index for user_id in group)
+    ]
+
+    results: list[Optional[list[Interval]]] = [None] * len(groups)
+    free = matrix.groups_free([groups[index] for index in valid])
+    for index, intervals in zip(valid, matrix.rows_to_intervals(free)):
+        results[index] = intervals
+    return results
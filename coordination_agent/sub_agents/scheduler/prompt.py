@@ -1,9 +1,11 @@
 from coordination_agent.shared_libraries.constants import (
     # State keys
     MATCHED_GROUPS,
+    MATCHED_USER_GROUPS,
     MEETING_TIMES,
     USER_AVAILABILITIES,
     # Tool names
+    ASSIGN_MEET_TIMES,
     FETCH_TIME_AVAILABILITIES,
     GET_MEET_TIMES,
 )
@@ -16,13 +18,19 @@ We have the following matched users:
 {{{MATCHED_GROUPS}}}
 </{MATCHED_GROUPS}>
 
+The user IDs of each matched group, one list per group in the same order:
+<{MATCHED_USER_GROUPS}>
+{{{MATCHED_USER_GROUPS}?}}
+</{MATCHED_USER_GROUPS}>
+
 ## Core Capabilities
-If there are `<{MATCHED_GROUPS}>`, extract the users to schedule from the data.
+If there are `<{MATCHED_GROUPS}>`, schedule the users listed in `<{MATCHED_USER_GROUPS}>`; they are already extracted from the groups.
 If we already have `<{MEETING_TIMES}>` in the current state, then we should use it to find overlapping time slots and skip tool calls unless we need to re-calculate them.
 
 You have access to the following tools:
 - `{FETCH_TIME_AVAILABILITIES}`: Retrieves availability data for specified user IDs
 - `{GET_MEET_TIMES}`: Calculates overlapping time slots for groups of users
+- `{ASSIGN_MEET_TIMES}`: Picks one final, conflict-free meeting time per group so that nobody is double-booked
 
 ## Primary Responsibilities
 You have access to `{USER_AVAILABILITIES}` in your state, which contains availability data for all users. The data is a dictionary where the key is the user ID and the value is the availability data represented as a list of time slots as a dictionary with `start` and `end` keys in ISO 8601 format.
@@ -45,6 +53,7 @@ After completing both tool calls:
 
 ### Error Handling
 - If availability data is missing for any user, fetch it immediately
+- If `{FETCH_TIME_AVAILABILITIES}` reports `errors` for some users, schedule the remaining users and tell the user whose calendars could not be fetched
 - If tools return errors, explain the issue clearly and suggest next steps
 - Always verify you have all required user IDs before proceeding
 
@@ -57,6 +66,12 @@ After completing both tool calls:
 5. **Suggest a time** based on earliest available time slot from `{GET_MEET_TIMES}`
 6. **Transfer to parent** after completion
 
+### Scheduling All Matched Groups At Once
+When the user asks to book or finalize one meeting per group (for example for all `<{MATCHED_GROUPS}>`), or mentions room limits or people belonging to several groups:
+1. Use `{FETCH_TIME_AVAILABILITIES}` for all users in all groups
+2. Use `{ASSIGN_MEET_TIMES}` instead of `{GET_MEET_TIMES}`, passing the number of available rooms as `max_concurrent_meetings` if the user gave one
+3. Present the single assigned time for each group and list any group that could not be placed
+
 ### CRITICAL: Two-Tool Workflow
 You MUST always use both tools in this exact order for every meeting request:
 1. `{FETCH_TIME_AVAILABILITIES}` - Get fresh availability data for all specified users
@@ -70,6 +85,8 @@ Never skip either tool or change the order. Always complete both tool calls befo
 - Use single group format `[["user1", "user2", "user3"]]` when all users meet together
 - Confirm that your arguments for your tools are formatted properly
 - When providing `user_availability`, ensure all user IDs are included and have corresponding availability data
+- When availability spans several days, call `{GET_MEET_TIMES}` with `compact` set to true so consecutive 30-minute blocks come back as longer ranges
+- When only a few suggestions are needed, pass `top_k` (e.g. 5) to `{GET_MEET_TIMES}` so it returns only the best options, and use `rank_by` to honor preferences such as buffers between meetings (`fewest_conflicts`) or preferred hours (`preferred_hours` with `preferred_hours`)
 
 ### Proactive Suggestions
 - When no overlaps exist, suggest users might need to adjust their availability
@@ -0,0 +1,547 @@
+"""Availability providers used by `fetch_time_availabilities`."""
+
+import asyncio
+import datetime
+import json
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from .intervals import Interval, from_epoch_minutes, intersect_intervals, merge_intervals, to_epoch_minutes
+
+logger = logging.getLogger(__name__)
+
+TimeWindow = tuple[datetime.datetime, datetime.datetime]  # (start, end) of the requested horizon
+
+
+class AvailabilityFetchResult(NamedTuple):
+    """Availability for the users that could be fetched and an error message for the ones that could not."""
+    availabilities: dict[str, list[dict[str, str]]]
+    errors: dict[str, str]
+
+
+def default_window(days: int = 1, timezone: Optional[str] = None) -> TimeWindow:
+    """
+    Horizon of `days` whole days starting today, used when no explicit window is requested.
+    The window is naive local time unless an IANA `timezone` is given.
+    """
+    tzinfo = ZoneInfo(timezone) if timezone else None
+    start = datetime.datetime.combine(datetime.datetime.now(tzinfo).date(), datetime.time(), tzinfo)
+    return start, start + datetime.timedelta(days=days)
+
+
+class AvailabilityProvider(ABC):
+    """Source of availability slots for users, e.g. a calendar service."""
+
+    @abstractmethod
+    def fetch(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> dict[str, list[dict[str, str]]]:
+        """
+        Fetch availability slots for the given users within a time window.
+
+        Args:
+            user_ids: User IDs to fetch availability for.
+            window: The (start, end) horizon to fetch.
+
+        Returns:
+            dict[str, list[dict[str, str]]]: Availability slots per user ID, each slot
+            a dictionary with `start` and `end` ISO8601 strings.
+        """
+
+    async def fetch_async(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> AvailabilityFetchResult:
+        """
+        Fetch availability without blocking the event loop, reporting failures per user.
+        By default the synchronous `fetch` runs in a worker thread.
+        """
+        availabilities = await asyncio.to_thread(self.fetch, user_ids, window)
+        return AvailabilityFetchResult(availabilities, {})
+
+    async def aclose(self) -> None:
+        """Release held resources such as pooled connections. The provider can still be used afterwards."""
+
+
+class WorkingHours(NamedTuple):
+    """
+    A user's working-hour window, in their own timezone.
+    Without a timezone, slots are naive local times.
+    """
+    start: datetime.time = datetime.time(9)
+    end: datetime.time = datetime.time(17)
+    weekdays: tuple[int, ...] = (0, 1, 2, 3, 4, 5, 6)  # Monday is 0
+    timezone: Optional[str] = None  # IANA name, e.g. "Europe/Berlin"
+
+    def tzinfo(self) -> Optional[datetime.tzinfo]:
+        return ZoneInfo(self.timezone) if self.timezone else None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], default: Optional['WorkingHours'] = None) -> 'WorkingHours':
+        """
+        Parse `{"start": "09:00", "end": "17:00", "weekdays": [0, ...], "timezone": "Europe/Berlin"}`.
+        Missing fields are taken from `default`.
+        """
+        default = default or cls()
+        return cls(
+            start=datetime.time.fromisoformat(data["start"]) if "start" in data else default.start,
+            end=datetime.time.fromisoformat(data["end"]) if "end" in data else default.end,
+            weekdays=tuple(data["weekdays"]) if "weekdays" in data else default.weekdays,
+            timezone=data.get("timezone", default.timezone),
+        )
+
+    def window_days(self, window: TimeWindow) -> tuple[datetime.date, int]:
+        """First day and number of days of `window`, the first day taken in this timezone."""
+        start = window[0]
+        if start.tzinfo is not None and self.timezone:
+            start = start.astimezone(self.tzinfo())
+        return start.date(), max(1, -(-(window[1] - window[0]) // datetime.timedelta(days=1)))
+
+    def intervals(
+        self,
+        date: datetime.date,
+        days: int = 1,
+        tzinfo: Optional[datetime.tzinfo] = None,
+    ) -> list[Interval]:
+        """Working time of `days` days from `date` on, as epoch-minute intervals; `tzinfo` applies without a timezone."""
+        tzinfo = self.tzinfo() or tzinfo
+        intervals = []
+        for offset in range(days):
+            day = date + datetime.timedelta(days=offset)
+            if day.weekday() in self.weekdays:
+                intervals.append((
+                    to_epoch_minutes(datetime.datetime.combine(day, self.start, tzinfo)),
+                    to_epoch_minutes(datetime.datetime.combine(day, self.end, tzinfo)),
+                ))
+        return intervals
+
+
+def load_working_hours(path: str, default: Optional[WorkingHours] = None) -> dict[str, WorkingHours]:
+    """
+    Load per-user working hours from a JSON file mapping user IDs to `WorkingHours.from_dict` objects.
+
+    Args:
+        path: Path to the JSON file.
+        default: Working hours the fields missing for a user are taken from.
+
+    Returns:
+        dict[str, WorkingHours]: Working hours by user ID.
+
+    Raises:
+        ValueError: If users have a timezone but `default` has none, which would mix naive and
+            timezone-aware availability.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        working_hours = {user_id: WorkingHours.from_dict(data, default) for user_id, data in json.load(file).items()}
+    if not (default and default.timezone) and any(hours.timezone for hours in working_hours.values()):
+        raise ValueError("Per-user working hour timezones require a default timezone (SCHEDULER_TIMEZONE)")
+    return working_hours
+
+
+def clip_to_working_hours(
+    slots: list[dict[str, str]],
+    working_hours: WorkingHours,
+    window: TimeWindow,
+) -> list[dict[str, str]]:
+    """
+    Cut availability slots down to the working hours within `window`.
+
+    Naive slots are read as local times of the working hours' timezone, and
+    naive working hours as times of the slots' timezone. The clipped slots keep
+    the slots' own timezone (or lack of one).
+    """
+    if not slots:
+        return []
+    slot_tzinfo = datetime.datetime.fromisoformat(slots[0]["start"]).tzinfo
+    tzinfo = working_hours.tzinfo() or slot_tzinfo
+
+    def minutes(value: str, round_up: bool = False) -> int:
+        parsed = datetime.datetime.fromisoformat(value)
+        if parsed.tzinfo is None and tzinfo is not None:
+            parsed = parsed.replace(tzinfo=tzinfo)
+        return to_epoch_minutes(parsed, round_up=round_up)
+
+    def iso(value: int) -> str:
+        parsed = from_epoch_minutes(value, tzinfo)
+        if tzinfo is not None:
+            parsed = parsed.replace(tzinfo=None) if slot_tzinfo is None else parsed.astimezone(slot_tzinfo)
+        return parsed.isoformat()
+
+    available = merge_intervals([(minutes(slot["start"], round_up=True), minutes(slot["end"])) for slot in slots])
+    date, days = working_hours.window_days(window)
+    working = working_hours.intervals(date, days, tzinfo)
+    return [{"start": iso(start), "end": iso(end)} for start, end in intersect_intervals([available, working])]
+
+
+def _generate_availability(
+    num_slots: Optional[int] = None, 
+    date: Optional[datetime.date] = None,
+    days: int = 1,
+    working_hours: Optional[WorkingHours] = None,
+) -> list[dict[str, str]]:
+    """
+    Generate random time availability slots. Internal helper function.
+
+    Up to `num_slots` slots are drawn per working day of the horizon. Times are
+    computed in epoch minutes, so slots stay correct across day and DST boundaries.
+    """
+    working_hours = working_hours or WorkingHours()
+    tzinfo = working_hours.tzinfo()
+    date = date or datetime.datetime.now(tzinfo).date()
+    raw_slots = []
+
+    for day_start, day_end in working_hours.intervals(date, days):
+        possible_slots = list(range(day_start, day_end, 30))
+
+        random.shuffle(possible_slots)
+        for start_time in sorted(possible_slots[:num_slots]):
+            # Duration between 30 and 120 minutes, within business hours
+            duration = random.choice([30, 60, 90, 120])
+            raw_slots.append((start_time, min(start_time + duration, day_end)))
+
+    # Merge overlapping or adjacent slots
+    return [
+        {
+            "start": from_epoch_minutes(start_time, tzinfo).isoformat(),
+            "end": from_epoch_minutes(end_time, tzinfo).isoformat(),
+        }
+        for start_time, end_time in merge_intervals(raw_slots)
+    ]
+
+
+def _generate_availabilities(
+    user_ids: list[str],
+    num_slots_per_user: Optional[int] = None,
+    date: Optional[datetime.date] = None,
+    days: int = 1,
+    working_hours: Optional[dict[str, WorkingHours]] = None,
+) -> dict[str, list[dict[str, str]]]:
+    """
+    Generate random availability slots for a list of users. Internal wrapper function.
+    """
+    availabilities = {}
+    working_hours = working_hours or {}
+    
+    for user_id in user_ids:
+        availability = _generate_availability(num_slots_per_user, date, days, working_hours.get(user_id))
+        availabilities[user_id] = availability
+
+    return availabilities
+
+
+class RandomAvailabilityProvider(AvailabilityProvider):
+    """
+    Local stand-in backend that generates random availability within each
+    user's working hours over the requested window.
+    A single random slot count per day is drawn per call and used for every user.
+    """
+
+    def __init__(
+        self,
+        min_slots: int = 3,
+        max_slots: int = 8,
+        working_hours: Optional[dict[str, WorkingHours]] = None,
+        default_working_hours: WorkingHours = WorkingHours(),
+    ):
+        self.min_slots = min_slots
+        self.max_slots = max_slots
+        self.working_hours = working_hours or {}
+        self.default_working_hours = default_working_hours
+
+    def fetch(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> dict[str, list[dict[str, str]]]:
+        num_slots = random.randint(self.min_slots, self.max_slots)
+        availabilities = {}
+        for user_id in user_ids:
+            working_hours = self.working_hours.get(user_id, self.default_working_hours)
+            date, days = working_hours.window_days(window)
+            availabilities[user_id] = _generate_availability(num_slots, date, days, working_hours)
+        return availabilities
+
+
+class CachedAvailabilityProvider(AvailabilityProvider):
+    """
+    In-process LRU cache with a time-to-live in front of another provider.
+
+    Entries are keyed by user ID and time window. Only users missing from the
+    cache are requested from the backend, in a single call.
+    """
+
+    def __init__(
+        self,
+        backend: AvailabilityProvider,
+        max_entries: int = 4096,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, TimeWindow], tuple[float, list[dict[str, str]]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fetch(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> dict[str, list[dict[str, str]]]:
+        availabilities, missing = self._lookup(user_ids, window)
+        if missing:
+            availabilities.update(self._store(self.backend.fetch(missing, window), window))
+        return {user_id: availabilities[user_id] for user_id in user_ids if user_id in availabilities}
+
+    async def fetch_async(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> AvailabilityFetchResult:
+        availabilities, missing = self._lookup(user_ids, window)
+        errors = {}
+        if missing:
+            fetched = await self.backend.fetch_async(missing, window)
+            availabilities.update(self._store(fetched.availabilities, window))
+            errors = fetched.errors
+        return AvailabilityFetchResult(
+            {user_id: availabilities[user_id] for user_id in user_ids if user_id in availabilities},
+            errors,
+        )
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+    def _lookup(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> tuple[dict[str, list[dict[str, str]]], list[str]]:
+        """Split users into cached availability and the user IDs that still need fetching."""
+        now = self._clock()
+        availabilities = {}
+        missing = []
+        with self._lock:
+            for user_id in dict.fromkeys(user_ids):
+                entry = self._entries.get((user_id, window))
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end((user_id, window))
+                    availabilities[user_id] = list(entry[1])
+                else:
+                    missing.append(user_id)
+        return availabilities, missing
+
+    def _store(
+        self,
+        fetched: dict[str, list[dict[str, str]]],
+        window: TimeWindow,
+    ) -> dict[str, list[dict[str, str]]]:
+        """Cache freshly fetched availability and evict the least recently used entries."""
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            for user_id, slots in fetched.items():
+                self._entries[(user_id, window)] = (expires_at, list(slots))
+                self._entries.move_to_end((user_id, window))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fetched
+
+    def invalidate(self, user_ids: Optional[list[str]] = None):
+        """
+        Drop cached availability for the given users in every window, or everything if None.
+        """
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+                return
+            targets = set(user_ids)
+            for key in [key for key in self._entries if key[0] in targets]:
+                del self._entries[key]
+
+
+class ConcurrentAvailabilityProvider(AvailabilityProvider):
+    """
+    Base class for remote providers that fan out lookups with asyncio.
+
+    Users are split into batches of `batch_size` and at most `max_concurrency`
+    batches are in flight at once. A failing batch is retried with exponential
+    backoff, and users whose batch keeps failing are reported in
+    `AvailabilityFetchResult.errors` instead of failing the whole call.
+
+    Requests go through one long-lived HTTP client, so connections and TLS
+    sessions are reused across calls. An httpx client is bound to the event loop
+    it was first used on: the provider opens its own client lazily and replaces
+    it when called from another loop. The synchronous `fetch` runs its own loop
+    and closes the client at the end. Close the provider with `aclose` on
+    shutdown. An injected `client` is used as is and left to its owner to close.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        batch_size: int = 1,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.2,
+        timeout_seconds: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self._injected_client = client
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @abstractmethod
+    async def _fetch_batch(
+        self,
+        client: httpx.AsyncClient,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> AvailabilityFetchResult:
+        """Fetch one batch of users. Raise to have the batch retried."""
+
+    def fetch(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> dict[str, list[dict[str, str]]]:
+        """
+        Synchronous wrapper around `fetch_async`. Users that could not be fetched are left out.
+        """
+
+        async def fetch_and_close() -> AvailabilityFetchResult:
+            try:
+                return await self.fetch_async(user_ids, window)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(fetch_and_close()).availabilities
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """The injected client, or the provider's own client for the running event loop."""
+        if self._injected_client is not None:
+            return self._injected_client
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # A client of another loop cannot be closed from this one; its connections go with that loop
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_seconds,
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the provider's own HTTP client; a new one is opened on the next call."""
+        client, loop = self._client, self._client_loop
+        self._client, self._client_loop = None, None
+        if client is not None and loop is asyncio.get_running_loop():
+            await client.aclose()
+
+    async def fetch_async(
+        self,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> AvailabilityFetchResult:
+        user_ids = list(dict.fromkeys(user_ids))
+        batches = [user_ids[i:i + self.batch_size] for i in range(0, len(user_ids), self.batch_size)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self._get_client()
+
+        results = await asyncio.gather(*(
+            self._fetch_batch_with_retries(client, semaphore, batch, window)
+            for batch in batches
+        ))
+
+        availabilities, errors = {}, {}
+        for result in results:
+            availabilities.update(result.availabilities)
+            errors.update(result.errors)
+        return AvailabilityFetchResult(availabilities, errors)
+
+    async def _fetch_batch_with_retries(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> AvailabilityFetchResult:
+        """Fetch a batch under the concurrency limit, retrying with exponential backoff and jitter."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    return await self._fetch_batch(client, user_ids, window)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.warning(f"Giving up on availability for {user_ids} after {attempt + 1} attempts: {e}")
+                    return AvailabilityFetchResult({}, {user_id: str(e) for user_id in user_ids})
+                delay = self.backoff_seconds * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+
+class HttpAvailabilityProvider(ConcurrentAvailabilityProvider):
+    """
+    Calendar service client.
+
+    Each batch is a `GET {base_url}/availability` request with `user_ids`
+    (comma separated), `start` and `end` (ISO8601) query parameters. The service
+    responds with `{"result": {user_id: [slot, ...]}, "errors": {user_id: message}}`.
+    Server errors (5xx) and rate limiting (429) are retried; other error
+    responses fail the batch's users immediately. The slots of users with
+    `working_hours` are clipped to them.
+    """
+
+    def __init__(self, base_url: str, working_hours: Optional[dict[str, WorkingHours]] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.working_hours = working_hours or {}
+
+    async def _fetch_batch(
+        self,
+        client: httpx.AsyncClient,
+        user_ids: list[str],
+        window: TimeWindow,
+    ) -> AvailabilityFetchResult:
+        response = await client.get(
+            f"{self.base_url}/availability",
+            params={
+                "user_ids": ",".join(user_ids),
+                "start": window[0].isoformat(),
+                "end": window[1].isoformat(),
+            },
+        )
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+        if response.is_error:
+            message = f"Calendar service returned {response.status_code}"
+            return AvailabilityFetchResult({}, {user_id: message for user_id in user_ids})
+
+        body = response.json()
+        availabilities = body.get("result", {})
+        errors = dict(body.get("errors", {}))
+        for user_id in user_ids:
+            if user_id not in availabilities and user_id not in errors:
+                errors[user_id] = "No availability returned"
+        return AvailabilityFetchResult(
+            {
+                user_id: clip_to_working_hours(slots, self.working_hours[user_id], window)
+                if user_id in self.working_hours else slots
+                for user_id, slots in availabilities.items() if user_id in user_ids
+            },
+            errors,
+        )
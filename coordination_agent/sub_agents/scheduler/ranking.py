@@ -0,0 +1,87 @@
+"""Top-K ranking of candidate meeting blocks."""
+
+import bisect
+import datetime
+import heapq
+from typing import Callable, Optional
+
+from .intervals import Interval, from_epoch_minutes, iter_blocks
+
+# Supported values of `rank_by`
+RANKINGS = ("earliest", "fewest_conflicts", "preferred_hours")
+
+
+def _is_free(intervals: list[Interval], start: int, end: int) -> bool:
+    """Check whether normalized intervals fully cover [start, end)."""
+    index = bisect.bisect_right(intervals, (start, float("inf"))) - 1
+    return index >= 0 and intervals[index][1] >= end
+
+
+def near_conflicts(
+    block: Interval,
+    member_intervals: list[list[Interval]],
+    buffer_minutes: int,
+) -> int:
+    """
+    Count the group members that are busy right before or right after a block.
+    Blocks with fewer near-conflicts leave members a buffer between meetings.
+    """
+    start, end = block
+    return sum(
+        not _is_free(intervals, start - buffer_minutes, start) or not _is_free(intervals, end, end + buffer_minutes)
+        for intervals in member_intervals
+    )
+
+
+def _score_function(
+    rank_by: str,
+    block_minutes: int,
+    member_intervals: list[list[Interval]],
+    preferred_hours: set[int],
+    tzinfo: Optional[datetime.tzinfo],
+) -> Callable[[Interval], tuple]:
+    """Build the sort key for `rank_by`; lower is better and ties go to the earlier block."""
+    if rank_by == "earliest":
+        return lambda block: (block[0],)
+    if rank_by == "fewest_conflicts":
+        return lambda block: (near_conflicts(block, member_intervals, block_minutes), block[0])
+    if rank_by == "preferred_hours":
+        return lambda block: (from_epoch_minutes(block[0], tzinfo).hour not in preferred_hours, block[0])
+    raise ValueError(f"Unknown ranking: {rank_by}")
+
+
+def top_k_blocks(
+    ranges: list[Interval],
+    block_minutes: int,
+    k: int,
+    rank_by: str = "earliest",
+    member_intervals: Optional[list[list[Interval]]] = None,
+    preferred_hours: Optional[list[int]] = None,
+    tzinfo: Optional[datetime.tzinfo] = None,
+) -> list[Interval]:
+    """
+    Select the best `k` meeting blocks from a group's available ranges.
+
+    Blocks are streamed from `ranges` through a bounded heap, so only `k`
+    candidates are kept in memory regardless of the horizon length.
+
+    Args:
+        ranges: Block-aligned ranges where the whole group is available.
+        block_minutes: Length of a meeting block.
+        k: Number of blocks to return, or 0 to rank every block.
+        rank_by: `earliest`, `fewest_conflicts` (members free right before and
+            after the block) or `preferred_hours` (block starts in one of
+            `preferred_hours`), ties broken by start time.
+        member_intervals: Normalized availability of each group member, used by
+            `fewest_conflicts`.
+        preferred_hours: Preferred hours of the day (0-23), used by `preferred_hours`.
+        tzinfo: Timezone the preferred hours are expressed in.
+
+    Returns:
+        list[Interval]: The selected blocks, best first.
+    """
+    score = _score_function(rank_by, block_minutes, member_intervals or [], set(preferred_hours or []), tzinfo)
+    blocks = iter_blocks(ranges, block_minutes)
+    if k > 0:
+        return heapq.nsmallest(k, blocks, key=score)
+    return sorted(blocks, key=score)
@@ -1,15 +1,84 @@
 import datetime
-import random
-from typing import Optional, NamedTuple
-from ortools.sat.python import cp_model
-
-from coordination_agent.shared_libraries.types import MatcherResponse
+import itertools
+import os
+from typing import Any, Optional, NamedTuple
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # OR-Tools is only required by the CP-SAT backend
+    cp_model = None
+
+from coordination_agent.shared_libraries.types import MatcherResponse, group_views, parse_matcher_response
+from .assignment import assign_meeting_blocks
+from .availability import intersect_groups_bitset
+from .intervals import (
+    Interval,
+    align_intervals,
+    clip_intervals,
+    from_epoch_minutes,
+    grid_origin,
+    intersect_groups,
+    iter_blocks,
+    merge_consecutive,
+    merge_intervals,
+    split_intervals,
+    to_epoch_minutes,
+)
+from .matrix import intersect_groups_matrix
+from .providers import (
+    AvailabilityProvider,
+    CachedAvailabilityProvider,
+    HttpAvailabilityProvider,
+    RandomAvailabilityProvider,
+    WorkingHours,
+    default_window,
+    load_working_hours,
+)
+from .ranking import RANKINGS, top_k_blocks
 
 TimeSlotDict = dict[str, str]  # {"start": "isoformat", "end": "isoformat"}
 UserAvailabilityDict = dict[str, list[TimeSlotDict]]  # {user_id: [TimeSlotDict, ...]}
 FetchAvailabilityResponse = dict[str, str | dict[str, list[dict[str, str]]]] # {"status": "success", "result": {"user_id": [{"start": "isoformat", "end": "isoformat"}, ...]}}
 GetMeetingTimesResponse = dict[str, str | list[list[dict[str, str]]]] # {"status": "success", "result": [[{"start": "isoformat", "end": "isoformat"}, ...], ...]}
 
+# Overlap engine used by `get_meet_times`: `sweep` (interval sweep), `bitset` (block bitsets)
+# or `matrix` (NumPy users x blocks matrix)
+SCHEDULER_ENGINE = os.getenv("SCHEDULER_ENGINE", "sweep")
+
+# Wall time budget (greedy pass, model building and solving) and CP-SAT workers of `assign_meet_times`
+ASSIGNMENT_TIME_LIMIT_SECONDS = float(os.getenv("SCHEDULER_ASSIGNMENT_TIME_LIMIT", "10"))
+ASSIGNMENT_NUM_WORKERS = int(os.getenv("SCHEDULER_ASSIGNMENT_WORKERS", "8"))
+
+# Scheduling horizon requested from the availability provider: whole days starting today, in
+# SCHEDULER_TIMEZONE (IANA name) or naive local time if unset
+HORIZON_DAYS = int(os.getenv("SCHEDULER_HORIZON_DAYS", "1"))
+SCHEDULER_TIMEZONE = os.getenv("SCHEDULER_TIMEZONE")
+
+# Working hours of users without their own, in SCHEDULER_TIMEZONE, and an optional JSON file of
+# per-user working hours ({user_id: {"start": "09:00", "end": "17:00", "weekdays": [0, 1, 2, 3, 4],
+# "timezone": "Europe/Berlin"}}, missing fields taken from the defaults)
+DEFAULT_WORKING_HOURS = WorkingHours(timezone=SCHEDULER_TIMEZONE)
+SCHEDULER_WORKING_HOURS_FILE = os.getenv("SCHEDULER_WORKING_HOURS_FILE")
+WORKING_HOURS = (
+    load_working_hours(SCHEDULER_WORKING_HOURS_FILE, DEFAULT_WORKING_HOURS) if SCHEDULER_WORKING_HOURS_FILE else {}
+)
+
+# Availability source for `fetch_time_availabilities`: the calendar service at CALENDAR_SERVICE_URL
+# if configured, random mock data otherwise. Lookups are cached to keep repeated turns local.
+CALENDAR_SERVICE_URL = os.getenv("CALENDAR_SERVICE_URL")
+availability_provider: AvailabilityProvider = CachedAvailabilityProvider(
+    HttpAvailabilityProvider(
+        CALENDAR_SERVICE_URL,
+        working_hours=WORKING_HOURS,
+        max_concurrency=int(os.getenv("CALENDAR_SERVICE_CONCURRENCY", "16")),
+    ) if CALENDAR_SERVICE_URL else RandomAvailabilityProvider(
+        working_hours=WORKING_HOURS,
+        default_working_hours=DEFAULT_WORKING_HOURS,
+    ),
+    max_entries=int(os.getenv("AVAILABILITY_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.getenv("AVAILABILITY_CACHE_TTL", "300")),
+)
+
 
 class TimeRange(NamedTuple):
     """
@@ -39,87 +108,7 @@ class TimeRange(NamedTuple):
         return int((self.end - self.start).total_seconds() / 60)
 
 
-def _generate_availability(
-    num_slots: Optional[int] = None, 
-) -> list[TimeSlotDict]:
-    """
-    Generate random time availability slots. Internal helper function.
-    """
-    date = datetime.datetime.now().date()
-    raw_slots = []  # Store as datetime objects initially
-    
-    start_hour, end_hour = 9, 17
-    
-    possible_slots = []
-    for hour in range(start_hour, end_hour):
-        for minute in [0, 30]:
-            start_time = datetime.datetime.combine(date, datetime.time(hour, minute))
-            possible_slots.append(start_time)
-
-    random.shuffle(possible_slots)
-    selected_starts = sorted(possible_slots[:num_slots])
-    
-    for start_time in selected_starts:
-        # Duration between 30 and 120 minutes
-        duration = random.choice([30, 60, 90, 120])
-        end_time = start_time + datetime.timedelta(minutes=duration)
-        
-        # Make sure end time doesn't exceed business hours
-        day_end = datetime.datetime.combine(date, datetime.time(end_hour, 0))
-        if end_time > day_end:
-            end_time = day_end
-        
-        if start_time < end_time:  # Only add valid slots
-            raw_slots.append((start_time, end_time))
-    
-    # Merge overlapping or adjacent slots
-    if not raw_slots:
-        return []
-
-    raw_slots.sort(key=lambda x: x[0])
-    
-    merged_slots = []
-    current_start, current_end = raw_slots[0]
-    
-    for start_time, end_time in raw_slots[1:]:
-        # Check if current slot overlaps or is adjacent to the previous one
-        if start_time <= current_end:  # Overlapping or adjacent
-            # Extend the current slot to include this one
-            current_end = max(current_end, end_time)
-        else:
-            # No overlap, add the previous merged slot and start a new one
-            merged_slots.append({
-                "start": current_start.isoformat(),
-                "end": current_end.isoformat()
-            })
-            current_start, current_end = start_time, end_time
-    
-    # Add the last merged slot
-    merged_slots.append({
-        "start": current_start.isoformat(),
-        "end": current_end.isoformat()
-    })
-    
-    return merged_slots
-
-
-def _generate_availabilities(
-    user_ids: list[str],
-    num_slots_per_user: Optional[int] = None,
-) -> UserAvailabilityDict:
-    """
-    Generate random availability slots for a list of users. Internal wrapper function.
-    """
-    availabilities = {}
-    
-    for user_id in user_ids:
-        availability = _generate_availability(num_slots_per_user)
-        availabilities[user_id] = availability
-
-    return availabilities
-
-
-def fetch_time_availabilities(
+async def fetch_time_availabilities(
     user_ids: list[str],
 ) -> dict[str, str | dict[str, list[dict[str, str]]]]:
     """
@@ -137,6 +126,9 @@ def fetch_time_availabilities(
         the keys are user IDs and the values are lists of dictionaries objects representing
         availability slots, which is a dictionary containing `start` and `end` keys with
         datetime values in ISO8601 string format.
+      - `errors`: Only present when availability could not be fetched for some of the users.
+        A dictionary mapping those user IDs to an error message. The other users are still
+        returned in `result`.
 
     Example success:
         >>> fetch_time_availabilities(user_ids=['123', '456'])
@@ -153,6 +145,15 @@ def fetch_time_availabilities(
                 ],
             }
         }
+    Example partial failure:
+        >>> fetch_time_availabilities(user_ids=['123', '456'])
+        {
+            "status": "success",
+            "result": {
+                "123": [{"start": "2023-10-01T09:00:00", "end": "2023-10-01T10:30:00"}]
+            },
+            "errors": {"456": "Calendar service returned 404"}
+        }
     Example error:
         >>> fetch_time_availabilities(user_ids=['123', '456'])
         {
@@ -160,21 +161,186 @@ def fetch_time_availabilities(
             "result": "Error fetching availability data"
         }
     """
-    # This is a mock function and can be replaced with an API call
-    num_slots = random.randint(3, 8)
+    # Backed by a mock provider by default, see `availability_provider`
+    try:
+        availabilities, errors = await availability_provider.fetch_async(
+            user_ids, default_window(HORIZON_DAYS, SCHEDULER_TIMEZONE)
+        )
+    except Exception as e:
+        return {
+            "status": "error",
+            "result": "Error fetching availability data",
+        }
 
-    availabilities = _generate_availabilities(
-        user_ids=user_ids,
-        num_slots_per_user=num_slots,
-    )   
-    
-    return {
+    if errors and not availabilities:
+        return {
+            "status": "error",
+            "result": "Error fetching availability data",
+            "errors": errors,
+        }
+
+    response = {
         "status": "success",
         "result": availabilities,
     }
+    if errors:
+        response["errors"] = errors
+    return response
+
+
+def _slots_to_intervals(time_slots: list[TimeSlotDict], aware: Optional[bool] = None) -> list[Interval]:
+    """
+    Convert TimeSlotDicts to normalized epoch-minute intervals. Internal helper function.
+    With `aware`, slots that are not timezone-aware (True) or naive (False) raise a ValueError.
+    """
+    intervals = []
+    for slot in time_slots:
+        slot_range = TimeRange.from_slot_dict(slot)
+        intervals.append((
+            to_epoch_minutes(slot_range.start, round_up=True, aware=aware),
+            to_epoch_minutes(slot_range.end, aware=aware),
+        ))
+    return merge_intervals(intervals)
+
+
+def _intervals_to_slots(
+    intervals: list[Interval],
+    tzinfo: Optional[datetime.tzinfo] = None,
+) -> list[TimeSlotDict]:
+    """
+    Convert epoch-minute intervals back to TimeSlotDicts. Internal helper function.
+    """
+    return [
+        TimeRange(
+            start=from_epoch_minutes(start, tzinfo),
+            end=from_epoch_minutes(end, tzinfo),
+        ).to_slot_dict()
+        for start, end in intervals
+    ]
+
+
+def _availability_tzinfo(users_availability: UserAvailabilityDict) -> Optional[datetime.tzinfo]:
+    """
+    Timezone of the first slot in the availability data, used to format results. Internal helper function.
+    """
+    for time_slots in users_availability.values():
+        for slot in time_slots:
+            return datetime.datetime.fromisoformat(slot["start"]).tzinfo
+    return None
 
 
 def _find_overlapping_times(
+    users_availability: UserAvailabilityDict,
+    min_duration_minutes: int = 30,
+    start_time: Optional[datetime.datetime] = None,
+    end_time: Optional[datetime.datetime] = None,
+    block_time_minutes: int = 30,
+    engine: Optional[str] = None,
+) -> list[TimeSlotDict]:
+    """
+    Find overlapping availability times between multiple users.
+    Time slots are aligned to specified minute blocks.
+
+    The `sweep` engine intersects the users' slots with a k-way sweep over
+    epoch-minute intervals and then shrinks the overlaps onto the block grid. The
+    `bitset` engine ANDs per-user block bitsets and the `matrix` engine reduces a
+    NumPy users x blocks matrix instead. The `cpsat` engine solves
+    the same problem with Google OR-Tools and is kept for comparison; all of them
+    return the same slots for availability on the block grid.
+
+    Args:
+        users_availability: Dictionary mapping user IDs to lists of TimeSlot objects
+        min_duration_minutes: Minimum duration of overlap in minutes
+        start_time: Optional start time boundary for the search
+        end_time: Optional end time boundary for the search
+        block_time_minutes: Size of time blocks in minutes (default: 30)
+        engine: Overlap engine to use: `sweep`, `bitset`, `matrix` or `cpsat` (default: SCHEDULER_ENGINE)
+
+    Returns:
+        List of TimeSlot objects representing times when all users are available
+    """
+    engine = engine or SCHEDULER_ENGINE
+    if engine == "cpsat":
+        return _find_overlapping_times_cpsat(
+            users_availability=users_availability,
+            min_duration_minutes=min_duration_minutes,
+            start_time=start_time,
+            end_time=end_time,
+            block_time_minutes=block_time_minutes,
+        )
+    tzinfo = _availability_tzinfo(users_availability)
+    origin = grid_origin(tzinfo)
+    user_intervals = {
+        user_id: _slots_to_intervals(time_slots, tzinfo is not None)
+        for user_id, time_slots in users_availability.items()
+    }
+    overlaps = _intersect_groups(
+        [list(user_intervals)],
+        user_intervals,
+        block_time_minutes=max(15, block_time_minutes),
+        engine=engine,
+        origin=origin,
+    )[0] or []
+
+    return _intervals_to_slots(
+        _align_overlaps(overlaps, min_duration_minutes, start_time, end_time, block_time_minutes, origin),
+        tzinfo,
+    )
+
+
+def _intersect_groups(
+    groups: list[list[str]],
+    user_intervals: dict[str, list[Interval]],
+    block_time_minutes: int = 30,
+    engine: Optional[str] = None,
+    origin: int = 0,
+) -> list[Optional[list[Interval]]]:
+    """
+    Intersect the availability of each group with the selected engine. Internal helper function.
+    Block-based engines put their grid at `origin`, see `grid_origin`.
+    """
+    engine = engine or SCHEDULER_ENGINE
+    if engine == "sweep":
+        return intersect_groups(groups, user_intervals)
+    if engine == "bitset":
+        return intersect_groups_bitset(groups, user_intervals, block_time_minutes, origin)
+    if engine == "matrix":
+        return intersect_groups_matrix(groups, user_intervals, block_time_minutes, origin)
+    raise ValueError(f"Unknown overlap engine: {engine}")
+
+
+def _align_overlaps(
+    overlaps: list[Interval],
+    min_duration_minutes: int = 30,
+    start_time: Optional[datetime.datetime] = None,
+    end_time: Optional[datetime.datetime] = None,
+    block_time_minutes: int = 30,
+    origin: int = 0,
+) -> list[Interval]:
+    """
+    Clip raw overlaps to the search boundaries and shrink them onto the block grid. Internal helper function.
+    The grid is anchored at `origin`, so blocks follow the local clock of the availability, like the CP-SAT backend.
+    """
+    # Ensure block_time_minutes is at least 15 minutes
+    block_time_minutes = max(15, block_time_minutes)
+
+    # Ensure min_duration is a multiple of block_time_minutes
+    min_duration_minutes = max(block_time_minutes,
+                              ((min_duration_minutes + block_time_minutes - 1) // block_time_minutes) * block_time_minutes)
+
+    # Boundaries are widened to the block grid, matching the CP-SAT backend
+    lower = None
+    if start_time:
+        lower = origin + ((to_epoch_minutes(start_time) - origin) // block_time_minutes) * block_time_minutes
+    upper = None
+    if end_time:
+        upper = origin - (-(to_epoch_minutes(end_time, round_up=True) - origin) // block_time_minutes) * block_time_minutes
+    overlaps = clip_intervals(overlaps, lower, upper)
+
+    return align_intervals(overlaps, block_time_minutes, min_duration_minutes, origin)
+
+
+def _find_overlapping_times_cpsat(
     users_availability: UserAvailabilityDict,
     min_duration_minutes: int = 30,
     start_time: Optional[datetime.datetime] = None,
@@ -195,6 +361,9 @@ def _find_overlapping_times(
     Returns:
         List of TimeSlot objects representing times when all users are available
     """   
+    if cp_model is None:
+        raise ImportError("The CP-SAT overlap engine requires the `ortools` package")
+
     # Ensure block_time_minutes is at least 15 minutes
     block_time_minutes = max(15, block_time_minutes)
     
@@ -344,31 +513,13 @@ def _find_overlapping_times(
     return result
 
 
-def _split_into_time_blocks(
-        time_slots: list[TimeSlotDict],
-        block_time_minutes: int = 30,
-) -> list[TimeSlotDict]:
-    """
-    Split time slots into chunks of specified minutes. Internal helper function.
-    """
-    chunks = []
-    
-    for time_slot in time_slots:
-        # Convert to TimeRange class for calculations
-        slot_range = TimeRange.from_slot_dict(time_slot)
-        current_time = slot_range.start
-        
-        while current_time + datetime.timedelta(minutes=block_time_minutes) <= slot_range.end:
-            chunk_end = current_time + datetime.timedelta(minutes=block_time_minutes)
-            chunks.append(TimeRange(start=current_time, end=chunk_end).to_slot_dict())
-            current_time = chunk_end
-
-    return chunks
-
-
 def get_meet_times(
     user_ids: list[list[str]],
     user_availability: UserAvailabilityDict,
+    compact: bool = False,
+    top_k: int = 0,
+    rank_by: str = "earliest",
+    preferred_hours: Optional[list[int]] = None,
 ) -> GetMeetingTimesResponse:
     """
     Fetch available meeting times for groups of users. This function already calculates overlapping time slots
@@ -382,6 +533,15 @@ def get_meet_times(
         user_availability (dict[str, list[dict[str, str]]]): A dictionary mapping user IDs to lists of objects
             representing availability slots for those users.
             - Format: {"user1": [{"start": "ISO8601_datetime", "end": "ISO8601_datetime"}, ...], "user2": [{"start": "ISO8601_datetime", "end": "ISO8601_datetime"}]}
+        compact (bool): Return consecutive 30-minute blocks merged into longer time ranges instead of one
+            entry per block. Use this for multi-day availability to keep the response short. Ranked blocks
+            keep their rank order; only blocks that follow each other in it are merged.
+        top_k (int): Only return the best `top_k` 30-minute blocks of each group, best first. Use 0 for all.
+        rank_by (str): How blocks are ranked for `top_k`:
+            - "earliest" (default): earliest blocks first
+            - "fewest_conflicts": blocks where the fewest members have another commitment right before or after
+            - "preferred_hours": blocks starting in one of `preferred_hours` first
+        preferred_hours (list[int]): Preferred hours of the day (0-23) for "preferred_hours", e.g. [10, 11, 14]
 
     Returns:
         dict: Response dictionary containing:
@@ -390,6 +550,8 @@ def get_meet_times(
                 * Outer list: One entry per user group (matches user_ids order)
                 * Inner list: Available time slots for that group
                 * Each slot dict has: {"start": "ISO8601_datetime", "end": "ISO8601_datetime"}
+            - "block_minutes" (int): Only when `compact` is true. Length of a meeting block; every returned
+              range can be split into blocks of this length
 
     Examples:
         Single group with overlapping availability:
@@ -468,54 +630,182 @@ def get_meet_times(
         - All user IDs in user_ids must have corresponding entries in user_availability
         - The function calculates overlapping time slots automatically - you provide individual availability
         - Empty result lists indicate no overlapping meeting times for that group
-        - Times should be in ISO8601 format (YYYY-MM-DDTHH:MM:SS)
+        - Times should be in ISO8601 format (YYYY-MM-DDTHH:MM:SS), either all with a UTC offset or all without
     """
-    time_block_size = 30
-    blocks = []
-    
-    for user_group in user_ids:
-        # Filter availability for users in this group
-        group_availability = {
-            user_id: slots 
-            for user_id, slots in user_availability.items() 
-            if user_id in user_group
+    if rank_by not in RANKINGS:
+        return {
+            "status": "error",
+            "result": f"Unknown rank_by '{rank_by}', expected one of {', '.join(RANKINGS)}",
         }
-        
-        if not group_availability or len(group_availability) != len(user_group):
-            blocks.append([])
+
+    time_block_size = 30
+    try:
+        tzinfo = _availability_tzinfo(user_availability)
+        user_intervals = _parse_requested_availability(user_ids, user_availability, tzinfo)
+    except ValueError as e:
+        return {"status": "error", "result": str(e)}
+    group_ranges = _group_meeting_ranges(user_ids, user_intervals, time_block_size, grid_origin(tzinfo))
+
+    result = []
+    for user_group, ranges in zip(user_ids, group_ranges):
+        if not ranges:
+            # No common availability, e.g. a member without any: nothing to rank
+            result.append([])
             continue
-            
-        overlaps = _find_overlapping_times(
-            users_availability=group_availability,
+        if rank_by == "earliest":
+            # Blocks are generated lazily so `top_k` never materializes the rest of a long horizon
+            blocks = iter_blocks(ranges, time_block_size)
+            if top_k > 0:
+                blocks = itertools.islice(blocks, top_k)
+            blocks = list(blocks)
+        else:
+            blocks = top_k_blocks(
+                ranges,
+                time_block_size,
+                top_k,
+                rank_by=rank_by,
+                member_intervals=[user_intervals[user_id] for user_id in set(user_group)],
+                preferred_hours=preferred_hours,
+                tzinfo=tzinfo,
+            )
+        result.append(_intervals_to_slots(merge_consecutive(blocks) if compact else blocks, tzinfo))
+
+    response = {
+        "status": "success",
+        "result": result,
+    }
+    if compact:
+        response["block_minutes"] = time_block_size
+    return response
+
+
+def _parse_requested_availability(
+    user_ids: list[list[str]],
+    user_availability: UserAvailabilityDict,
+    tzinfo: Optional[datetime.tzinfo] = None,
+) -> dict[str, list[Interval]]:
+    """
+    Parse the availability of every user in the requested groups once, to share it across groups. Internal helper function.
+    All slots must be naive or all timezone-aware, like the first one whose `tzinfo` is passed; a ValueError is raised otherwise.
+    """
+    requested_users = {user_id for user_group in user_ids for user_id in user_group}
+    return {
+        user_id: _slots_to_intervals(slots, tzinfo is not None)
+        for user_id, slots in user_availability.items()
+        if user_id in requested_users
+    }
+
+
+def _group_meeting_ranges(
+    user_ids: list[list[str]],
+    user_intervals: dict[str, list[Interval]],
+    time_block_size: int = 30,
+    origin: int = 0,
+) -> list[list[Interval]]:
+    """
+    Compute the block-aligned meeting ranges of every group in one batched pass on the grid at `origin`. Internal helper function.
+    """
+    group_ranges = []
+
+    for overlaps in _intersect_groups(user_ids, user_intervals, block_time_minutes=time_block_size, origin=origin):
+        if not overlaps:
+            group_ranges.append([])
+            continue
+
+        group_ranges.append(_align_overlaps(
+            overlaps,
             min_duration_minutes=time_block_size,
-            start_time=None,
-            end_time=None,
-            block_time_minutes=time_block_size
-        )
+            block_time_minutes=time_block_size,
+            origin=origin,
+        ))
+
+    return group_ranges
 
-        if overlaps:
-            blocks.append(_split_into_time_blocks(overlaps, block_time_minutes=time_block_size))
-        else:
-            blocks.append([])
+
+def assign_meet_times(
+    user_ids: list[list[str]],
+    user_availability: UserAvailabilityDict,
+    max_concurrent_meetings: int = 0,
+) -> GetMeetingTimesResponse:
+    """
+    Pick exactly one meeting time for each group of users so that no user is double-booked.
+    Use this instead of `get_meet_times` when every group needs a single, final meeting time.
+
+    Args:
+        user_ids (list[list[str]]): A list of user groups, where each group is a list of user ID strings.
+            - Format: [["user1", "user2"], ["user3", "user4"], ...]
+        user_availability (dict[str, list[dict[str, str]]]): A dictionary mapping user IDs to lists of objects
+            representing availability slots for those users.
+            - Format: {"user1": [{"start": "ISO8601_datetime", "end": "ISO8601_datetime"}, ...], ...}
+        max_concurrent_meetings (int): Maximum number of meetings that can happen at the same time
+            (for example the number of available rooms). Use 0 for no limit.
+
+    Returns:
+        dict: Response dictionary containing:
+            - "status" (str): Either "success" or "error"
+            - "result" (list[list[dict]]): One entry per user group (matches user_ids order), holding either
+              a single {"start": "ISO8601_datetime", "end": "ISO8601_datetime"} slot or an empty list when
+              no conflict-free time could be found for that group
+
+    Example:
+        >>> assign_meet_times(
+        ...     user_ids=[["123", "456"], ["456", "789"]],
+        ...     user_availability={
+        ...         "123": [{"start": "2023-10-01T09:00:00", "end": "2023-10-01T10:00:00"}],
+        ...         "456": [{"start": "2023-10-01T09:00:00", "end": "2023-10-01T11:00:00"}],
+        ...         "789": [{"start": "2023-10-01T09:00:00", "end": "2023-10-01T11:00:00"}]
+        ...     }
+        ... )
+        {
+            "status": "success",
+            "result": [
+                [{"start": "2023-10-01T09:00:00", "end": "2023-10-01T09:30:00"}],
+                [{"start": "2023-10-01T09:30:00", "end": "2023-10-01T10:00:00"}]
+            ]
+        }
+    """
+    time_block_size = 30
+    try:
+        tzinfo = _availability_tzinfo(user_availability)
+        user_intervals = _parse_requested_availability(user_ids, user_availability, tzinfo)
+    except ValueError as e:
+        return {"status": "error", "result": str(e)}
+    group_ranges = _group_meeting_ranges(user_ids, user_intervals, time_block_size, grid_origin(tzinfo))
+
+    assignment = assign_meeting_blocks(
+        user_ids,
+        [split_intervals(ranges, time_block_size) for ranges in group_ranges],
+        max_concurrent_meetings=max_concurrent_meetings,
+        time_limit_seconds=ASSIGNMENT_TIME_LIMIT_SECONDS,
+        num_workers=ASSIGNMENT_NUM_WORKERS,
+    )
 
     return {
         "status": "success",
-        "result": blocks,
+        "result": [_intervals_to_slots([block] if block else [], tzinfo) for block in assignment],
     }
 
 
-def extract_groups_and_users(matcher_response: MatcherResponse) -> dict[str, list[str] | list[list[str]]]:
+def extract_groups_and_users(
+    matcher_response: MatcherResponse | str | bytes | dict[str, Any],
+) -> dict[str, list[str] | list[list[str]]]:
     """
     Extract groups and users from a MatcherResponse for scheduling purposes.
-    
+
+    Raw JSON text or bytes (e.g. the matcher's LLM output) are validated in one
+    pass with `model_validate_json`. Dictionaries are taken to be the validated
+    `matched_groups` state and are flattened without validating them again.
+    Matcher tools already store the flattened views in the `matched_users` and
+    `matched_user_groups` state, so prefer those when available.
+
     Args:
-        matcher_response: MatcherResponse object containing matched groups
-        
+        matcher_response: MatcherResponse object containing matched groups, its JSON, or its `model_dump`
+
     Returns:
         dict: Dictionary containing:
             - "status": "success" if operation was successful, or "error" if an error occurred
             - "result": Dictionary containing extracted data when status is "success". Empty dictionary when status is "error".
-            
+
     Example:
         >>> response = MatcherResponse(matched_groups={
         ...     "group1": UserGroup(id="group1", user_ids=["user1", "user2"]),
@@ -530,7 +820,7 @@ def extract_groups_and_users(matcher_response: MatcherResponse) -> dict[str, lis
                 "user_groups": [["user1", "user2"], ["user3", "user4"]]
             }
         }
-        
+
         >>> extract_groups_and_users(None)
         {
             "status": "error",
@@ -538,37 +828,9 @@ def extract_groups_and_users(matcher_response: MatcherResponse) -> dict[str, lis
         }
     """
     try:
-        if not isinstance(matcher_response, MatcherResponse):
-            return {
-                "status": "error",
-                "result": {}
-            }
-            
-        groups = list(matcher_response.matched_groups.keys())
-        
-        all_users = set()
-        user_groups = []
-        
-        for group in matcher_response.matched_groups.values():
-            if not hasattr(group, 'user_ids'):
-                return {
-                    "status": "error",
-                    "result": {}
-                }
-            user_groups.append(group.user_ids)
-            all_users.update(group.user_ids)
-        
-        result = {
-            "groups": groups,
-            "users": list(all_users),
-            "user_groups": user_groups
-        }
-        
-        return {
-            "status": "success",
-            "result": result
-        }
-        
+        if isinstance(matcher_response, dict):
+            return {"status": "success", "result": group_views(matcher_response)}
+        return {"status": "success", "result": group_views(parse_matcher_response(matcher_response))}
     except Exception as e:
         return {
             "status": "error",
@@ -7,6 +7,8 @@ from .prompt import INSTRUCTION
 from coordination_agent.shared_libraries.callbacks import (
     before_agent_trace,
     after_agent_trace,
+    before_model_trace,
+    after_model_trace,
 )
 
 writer = Agent(
@@ -18,4 +20,6 @@ writer = Agent(
     instruction=INSTRUCTION,
     before_agent_callback=before_agent_trace,
     after_agent_callback=after_agent_trace,
+    before_model_callback=before_model_trace,
+    after_model_callback=after_model_trace,
 )
@@ -1,5 +1,5 @@
-import json
-import os
+import copy
+import logging
 from typing import Any
 
 from google.adk.agents.callback_context import CallbackContext
@@ -7,9 +7,9 @@ from google.adk.sessions.state import State
 from google.adk.tools import ToolContext
 
 from coordination_agent.shared_libraries import constants
+from .profiles import initial_state_store, profile_repository
 
-INITIAL_STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "initial_state.json")
-USER_PROFILES_SEED_FILE = os.getenv("USER_PROFILES_SEED")
+logger = logging.getLogger(__name__)
 
 
 def memorize(key: str, value: dict, tool_context: ToolContext):
@@ -61,22 +61,27 @@ def _set_initial_states(source: dict[str, Any], target: State | dict[str, Any]):
 
 def load_initial_state(callback_context: CallbackContext):
     """
-    Sets up the initial state. Use as a callback as for `before_agent_call` of the root_agent.
+    Sets up the initial state once per session. Use as a callback as for `before_agent_call` of the root_agent.
+
+    The `state_initialized` marker makes later turns a no-op, so they keep the groups and meeting
+    times found so far. The initial state and the profiles come from process-wide stores, and
+    sessions only hold the version of the shared profiles (see `profiles.load_profiles`), so the
+    cost of a turn does not depend on the size of the profile file.
 
     Args:
         callback_context: The callback context.
     """
-    init_state = {}
-    with open(INITIAL_STATE_FILE, "r") as file:
-        init_state = json.load(file)
-        print(f"\nLoading Initial State: {init_state}\n")
+    if callback_context.state.get(constants.STATE_INITIALIZED):
+        return
 
+    snapshot = initial_state_store.snapshot()
+    init_state = copy.deepcopy(snapshot.data)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Loading initial state version {snapshot.version}: {init_state}")
     _set_initial_states(init_state[constants.STATE], callback_context.state)
 
-    # Seed with user profiles
-    with open(USER_PROFILES_SEED_FILE, "r") as file:
-        p = json.load(file)
-        profiles = { constants.USER_PROFILES: p }
-        print(f"\nLoading Initial Profiles Seed...\n")
-
+    # Reference the shared user profiles instead of copying them into the session
+    profiles = { constants.USER_PROFILES_VERSION: profile_repository.version }
     _set_initial_states(profiles, callback_context.state)
+
+    callback_context.state[constants.STATE_INITIALIZED] = snapshot.version
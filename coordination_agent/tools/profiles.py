@@ -0,0 +1,309 @@
+"""Process-wide, read-only stores of the initial state and the user profiles every session starts from."""
+
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+from coordination_agent.shared_libraries.constants import USER_PROFILES, USER_PROFILES_VERSION
+from .repository import (
+    ProfileRepository,
+    ProfilesDict,
+    SqliteProfileRepository,
+    _check_criteria,
+    filter_postings,
+    match_profiles,
+)
+
+logger = logging.getLogger(__name__)
+
+INITIAL_STATE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "initial_state.json")
+USER_PROFILES_SEED_FILE = os.getenv("USER_PROFILES_SEED")
+# SQLite profile database (see `repository.import_seed`); used instead of the seed file when set
+USER_PROFILES_DB = os.getenv("USER_PROFILES_DB")
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Shared data is read-only; copy it with `copy.deepcopy` before changing it")
+
+
+class ReadOnlyDict(dict):
+    """
+    A dict that refuses changes, for data shared by all sessions.
+
+    It serializes like a dict. Deep copies and unpickled values are ordinary
+    mutable containers; shallow copies (`copy.copy`, `dict(...)`) only at the top level.
+    """
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        return thaw(self)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Read-only version of parsed JSON: dicts become `ReadOnlyDict`s and lists tuples, recursively."""
+    if isinstance(value, dict):
+        return ReadOnlyDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable copy of frozen JSON, the inverse of `freeze`."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class Snapshot(NamedTuple):
+    """Contents of a JSON file at one version."""
+    version: str
+    data: Any
+
+
+class JsonFileStore:
+    """
+    A JSON file loaded once per process and shared by all sessions.
+
+    The file is parsed again only when its modification time or size changes,
+    so a call costs a single `stat`. Snapshots are shared between sessions, so
+    their data is frozen (see `freeze`): changing it raises a TypeError.
+    """
+
+    def __init__(self, path: Optional[str], on_load: Optional[Callable[[Snapshot], None]] = None):
+        """
+        Args:
+            path: Path of the JSON file.
+            on_load: Load hook, see `add_load_hook`.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature: Optional[tuple[int, int]] = None
+        self._snapshot: Optional[Snapshot] = None
+        self._load_hooks: list[Callable[[Snapshot], None]] = []
+        if on_load is not None:
+            self.add_load_hook(on_load)
+
+    def add_load_hook(self, hook: Callable[[Snapshot], None]) -> None:
+        """
+        Call `hook` with every new snapshot as it is loaded, e.g. to build indexes.
+
+        The hook is called right away with the current snapshot when the file was already loaded.
+        """
+        with self._lock:
+            self._load_hooks.append(hook)
+            snapshot = self._snapshot
+        if snapshot is not None:
+            hook(snapshot)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Current contents of the file, reloaded if the file changed since the last call.
+
+        Returns:
+            Snapshot: The data with its version, a hash of the file contents.
+
+        Raises:
+            FileNotFoundError: If the file does not exist or no path is configured.
+        """
+        if not self.path:
+            raise FileNotFoundError("No file configured for the store")
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return self._snapshot
+
+        with self._lock:
+            if signature != self._signature:
+                with open(self.path, "rb") as file:
+                    content = file.read()
+                version = hashlib.sha256(content).hexdigest()[:16]
+                if self._snapshot is None or version != self._snapshot.version:
+                    snapshot = Snapshot(version, freeze(json.loads(content)))
+                    for hook in self._load_hooks:
+                        hook(snapshot)
+                    self._snapshot = snapshot
+                    logger.info(f"Loaded {self.path} (version {version})")
+                self._signature = signature
+            return self._snapshot
+
+
+initial_state_store = JsonFileStore(INITIAL_STATE_FILE)
+
+# Agents that index the profiles register load hooks on this store
+profile_store = JsonFileStore(USER_PROFILES_SEED_FILE)
+
+
+class JsonProfileRepository(ProfileRepository):
+    """Profiles of a JSON seed file, held in memory by a `JsonFileStore`."""
+
+    def __init__(self, store: JsonFileStore):
+        self.store = store
+        self._postings: Optional[tuple[str, dict[str, dict[str, dict[str, None]]]]] = None
+        store.add_load_hook(self._index)
+
+    def _index(self, snapshot: Snapshot) -> tuple[str, dict[str, dict[str, dict[str, None]]]]:
+        """Build the inverted index of the filter fields for a snapshot, once per version."""
+        postings = self._postings
+        if postings is None or postings[0] != snapshot.version:
+            postings = self._postings = (snapshot.version, filter_postings(snapshot.data))
+        return postings
+
+    @property
+    def version(self) -> str:
+        return self.store.snapshot().version
+
+    def __len__(self) -> int:
+        return len(self.store.snapshot().data)
+
+    def get_many(self, user_ids: list[str]) -> ProfilesDict:
+        profiles = self.store.snapshot().data
+        return {user_id: profiles[user_id] for user_id in dict.fromkeys(user_ids) if user_id in profiles}
+
+    def iter_pages(self, page_size: int = 1000) -> Iterator[ProfilesDict]:
+        items = iter(self.store.snapshot().data.items())
+        while page := dict(itertools.islice(items, page_size)):
+            yield page
+
+    def find(self, **criteria: str) -> list[str]:
+        _check_criteria(criteria)
+        snapshot = self.store.snapshot()
+        if not criteria:
+            return list(snapshot.data)
+        postings = self._index(snapshot)
+        matches = sorted(
+            (postings[1][field].get(str(value), {}) for field, value in criteria.items()), key=len
+        )
+        return [user_id for user_id in matches[0] if all(user_id in other for other in matches[1:])]
+
+    def all(self) -> ProfilesDict:
+        return self.store.snapshot().data
+
+
+profile_repository: ProfileRepository = (
+    SqliteProfileRepository(USER_PROFILES_DB) if USER_PROFILES_DB else JsonProfileRepository(profile_store)
+)
+
+
+def session_profiles(state: Any) -> dict[str, dict[str, Any]]:
+    """
+    Profiles visible to a session, without copying them into its state.
+
+    Prefer `load_profiles` when only some users are needed, and
+    `iter_session_profiles` to read all of them: with a SQLite repository this
+    loads the whole pool into memory.
+
+    Args:
+        state: The session state (or any mapping).
+
+    Returns:
+        dict: The session's own `user_profiles` when set (e.g. the users of a
+        matching chunk), every profile of the repository when the session references it
+        by `user_profiles_version`, and no profiles otherwise.
+    """
+    profiles = state.get(USER_PROFILES)
+    if profiles is not None:
+        return profiles
+    if state.get(USER_PROFILES_VERSION) is None:
+        return {}
+    return profile_repository.all()
+
+
+def iter_session_profiles(state: Any, page_size: int = 1000) -> Iterator[ProfilesDict]:
+    """
+    Profiles visible to a session (see `session_profiles`), page by page.
+
+    With a SQLite repository, only one page of the shared profiles is in memory at a time.
+
+    Args:
+        state: The session state (or any mapping).
+        page_size: Maximum number of profiles per page of the shared profiles.
+
+    Returns:
+        Iterator[dict]: Pages of profiles keyed by user ID; the session's own `user_profiles` come as one page.
+    """
+    profiles = state.get(USER_PROFILES)
+    if profiles is not None:
+        if profiles:
+            yield profiles
+        return
+    if state.get(USER_PROFILES_VERSION) is not None:
+        yield from profile_repository.iter_pages(page_size)
+
+
+def profiles_version(state: Any, user_ids: Optional[list[str]] = None) -> Optional[str]:
+    """
+    Identifier of the content of the session's shared profiles, or of some of them, without reading any profile.
+
+    Args:
+        state: The session state (or any mapping).
+        user_ids: The selected users, in order; an empty list or None selects every profile.
+
+    Returns:
+        str: The repository version, combined with the user IDs for a selection, or None when the
+        session has its own `user_profiles` or no profiles.
+    """
+    if state.get(USER_PROFILES) is not None or state.get(USER_PROFILES_VERSION) is None:
+        return None
+    version = profile_repository.version
+    if not user_ids:
+        return version
+    digest = hashlib.sha256(version.encode("utf-8"))
+    for user_id in user_ids:
+        digest.update(user_id.encode("utf-8") + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def find_profiles(state: Any, **criteria: str) -> list[str]:
+    """
+    User IDs of the session's profiles matching every given field value (see `repository.FILTER_FIELDS`).
+
+    Raises:
+        ValueError: If a criterion is not a filter field.
+    """
+    profiles = state.get(USER_PROFILES)
+    if profiles is not None:
+        return match_profiles(profiles, **criteria)
+    if state.get(USER_PROFILES_VERSION) is None:
+        _check_criteria(criteria)
+        return []
+    return profile_repository.find(**criteria)
+
+
+def load_profiles(state: Any, user_ids: list[str]) -> tuple[dict[str, dict[str, Any]], list[str]]:
+    """
+    Load the profiles of some users on demand instead of the whole pool.
+
+    Args:
+        state: The session state (or any mapping).
+        user_ids: User IDs to load, duplicates ignored; an empty list loads every profile.
+
+    Returns:
+        tuple[dict, list[str]]: The profiles found keyed by user ID, in the order of `user_ids`,
+        and the user IDs without a profile.
+    """
+    if not user_ids:
+        return dict(session_profiles(state)), []
+    user_ids = list(dict.fromkeys(user_ids))
+    profiles = state.get(USER_PROFILES)
+    if profiles is not None:
+        found = {user_id: profiles[user_id] for user_id in user_ids if user_id in profiles}
+    elif state.get(USER_PROFILES_VERSION) is not None:
+        found = profile_repository.get_many(user_ids)
+    else:
+        found = {}
+    return found, [user_id for user_id in user_ids if user_id not in found]
@@ -0,0 +1,273 @@
+"""Profile repositories: bulk and filtered access to user profiles, with a SQLite implementation for large pools."""
+
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+from uuid import uuid4
+
+from coordination_agent.shared_libraries.mbti import temperament
+
+logger = logging.getLogger(__name__)
+
+ProfilesDict = dict[str, dict[str, Any]]
+
+# Fields accepted by `ProfileRepository.find`; `temperament` is derived from `mbti_type`
+FILTER_FIELDS = ("mbti_type", "dominant_function", "temperament", "work_preference")
+
+# Maximum number of user IDs bound in one SQL query
+_MAX_VARIABLES = 500
+
+
+def _filter_value(profile: dict[str, Any], field: str) -> Optional[str]:
+    """Value of a filter field in a profile, as stored and compared by the repositories."""
+    if field == "temperament":
+        return temperament(profile["mbti_type"]) if profile.get("mbti_type") else None
+    value = profile.get(field)
+    return None if value is None else str(value)
+
+
+def _check_criteria(criteria: dict[str, Any]) -> None:
+    """Raise a ValueError for criteria that are not filter fields."""
+    unknown = [field for field in criteria if field not in FILTER_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown indexed field: {', '.join(unknown)}")
+
+
+def match_profiles(profiles: ProfilesDict, **criteria: str) -> list[str]:
+    """
+    User IDs of the profiles matching every given field value, in the order of `profiles`.
+
+    Scans every profile; use a repository's `find` for large pools.
+
+    Raises:
+        ValueError: If a criterion is not one of `FILTER_FIELDS`.
+    """
+    _check_criteria(criteria)
+    wanted = {field: str(value) for field, value in criteria.items()}
+    return [
+        user_id for user_id, profile in profiles.items()
+        if all(_filter_value(profile, field) == value for field, value in wanted.items())
+    ]
+
+
+def filter_postings(profiles: ProfilesDict) -> dict[str, dict[str, dict[str, None]]]:
+    """
+    Inverted index of the filter fields: the user IDs per field value, in the order of `profiles`.
+
+    User IDs are kept as the keys of a dict, an ordered set.
+    """
+    postings: dict[str, dict[str, dict[str, None]]] = {field: {} for field in FILTER_FIELDS}
+    for user_id, profile in profiles.items():
+        for field in FILTER_FIELDS:
+            value = _filter_value(profile, field)
+            if value is not None:
+                postings[field].setdefault(value, {})[user_id] = None
+    return postings
+
+
+class ProfileRepository(ABC):
+    """Read access to user profiles keyed by user ID."""
+
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        """Identifier of the current contents; it changes whenever profiles change."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of profiles."""
+
+    @abstractmethod
+    def get_many(self, user_ids: list[str]) -> ProfilesDict:
+        """Profiles of the given users, in the order of `user_ids`; unknown users are left out."""
+
+    @abstractmethod
+    def iter_pages(self, page_size: int = 1000) -> Iterator[ProfilesDict]:
+        """Every profile, in pages of at most `page_size` profiles in a stable order."""
+
+    @abstractmethod
+    def find(self, **criteria: str) -> list[str]:
+        """
+        User IDs whose profile matches every given field value, e.g. `find(mbti_type="INTJ")`.
+
+        Raises:
+            ValueError: If a criterion is not one of `FILTER_FIELDS`.
+        """
+
+    def all(self) -> ProfilesDict:
+        """Every profile in one dictionary; avoid for large pools when a subset is enough."""
+        profiles: ProfilesDict = {}
+        for page in self.iter_pages():
+            profiles.update(page)
+        return profiles
+
+
+class SqliteProfileRepository(ProfileRepository):
+    """
+    Profiles in a local SQLite database, for pools too large to keep in memory.
+
+    Profiles are stored as JSON next to indexed columns for `FILTER_FIELDS`, so
+    bulk fetches and filtered queries only read the matching rows. No profile
+    is cached in memory: `all()` reads the whole pool on every call, so prefer
+    `get_many`, `find` and `iter_pages`. Only the version is cached; it is read
+    again after writes, including those of other processes.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._initialized = False
+        # Long-lived connection of `version` and the (data_version, version) it last read
+        self._version_connection: Optional[sqlite3.Connection] = None
+        self._version_read: Optional[tuple[int, str]] = None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection in a transaction, creating the schema on first use."""
+        with closing(sqlite3.connect(self.path, timeout=30)) as connection, connection:
+            if not self._initialized:
+                with self._lock:
+                    columns = "".join(f", {field} TEXT" for field in FILTER_FIELDS)
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute(
+                        f"CREATE TABLE IF NOT EXISTS profiles (user_id TEXT PRIMARY KEY{columns}, profile TEXT NOT NULL)"
+                    )
+                    for field in FILTER_FIELDS:
+                        connection.execute(f"CREATE INDEX IF NOT EXISTS profiles_{field} ON profiles ({field})")
+                    connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                    self._initialized = True
+            yield connection
+
+    @property
+    def version(self) -> str:
+        # `PRAGMA data_version` changes when another connection commits, so the cached version is
+        # only read again after a write; the lookup runs for every cache key and callback
+        if self._version_connection is None:
+            with self._connect():
+                pass
+        with self._lock:
+            if self._version_connection is None:
+                self._version_connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            data_version = self._version_connection.execute("PRAGMA data_version").fetchone()[0]
+            if self._version_read is None or self._version_read[0] != data_version:
+                row = self._version_connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+                self._version_read = (data_version, row[0] if row else "empty")
+            return self._version_read[1]
+
+    def close(self) -> None:
+        """Close the connection kept for `version`; it is reopened on the next lookup."""
+        with self._lock:
+            if self._version_connection is not None:
+                self._version_connection.close()
+            self._version_connection, self._version_read = None, None
+
+    def __len__(self) -> int:
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def get_many(self, user_ids: list[str]) -> ProfilesDict:
+        user_ids = list(dict.fromkeys(user_ids))
+        found: ProfilesDict = {}
+        with self._connect() as connection:
+            for start in range(0, len(user_ids), _MAX_VARIABLES):
+                batch = user_ids[start:start + _MAX_VARIABLES]
+                rows = connection.execute(
+                    f"SELECT user_id, profile FROM profiles WHERE user_id IN ({', '.join('?' * len(batch))})", batch
+                )
+                found.update((user_id, json.loads(profile)) for user_id, profile in rows)
+        return {user_id: found[user_id] for user_id in user_ids if user_id in found}
+
+    def iter_pages(self, page_size: int = 1000) -> Iterator[ProfilesDict]:
+        # Keyset pagination on the rowid keeps every page an index range scan
+        last_row = 0
+        while True:
+            with self._connect() as connection:
+                rows = connection.execute(
+                    "SELECT rowid, user_id, profile FROM profiles WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                    (last_row, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            last_row = rows[-1][0]
+            yield {user_id: json.loads(profile) for _, user_id, profile in rows}
+
+    def find(self, **criteria: str) -> list[str]:
+        _check_criteria(criteria)
+        where = " AND ".join(f"{field} = ?" for field in criteria) or "1"
+        with self._connect() as connection:
+            rows = connection.execute(
+                f"SELECT user_id FROM profiles WHERE {where} ORDER BY rowid",
+                [str(value) for value in criteria.values()],
+            )
+            return [user_id for (user_id,) in rows]
+
+    def import_profiles(self, profiles: Iterable[tuple[str, dict[str, Any]]], batch_size: int = 10000) -> int:
+        """
+        Insert or replace profiles in bulk, in one transaction.
+
+        Args:
+            profiles: (user ID, profile) pairs, e.g. `profiles.items()`.
+            batch_size: Rows per `executemany` batch.
+
+        Returns:
+            int: Number of profiles written.
+        """
+        placeholders = ", ".join("?" * (len(FILTER_FIELDS) + 2))
+        statement = (
+            f"INSERT OR REPLACE INTO profiles (user_id, {', '.join(FILTER_FIELDS)}, profile) VALUES ({placeholders})"
+        )
+        written = 0
+        with self._connect() as connection:
+            batch = []
+            for user_id, profile in profiles:
+                values = (_filter_value(profile, field) for field in FILTER_FIELDS)
+                batch.append((user_id, *values, json.dumps(profile)))
+                if len(batch) >= batch_size:
+                    connection.executemany(statement, batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                connection.executemany(statement, batch)
+                written += len(batch)
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (uuid4().hex[:16],))
+        with self._lock:
+            self._version_read = None
+        logger.info(f"Imported {written} profiles into {self.path}")
+        return written
+
+
+def import_seed(seed_path: str | Path, repository: SqliteProfileRepository, batch_size: int = 10000) -> int:
+    """
+    Bulk import a JSON profile seed file, like `user_profiles_mbti_seed.json`, into a SQLite repository.
+
+    Args:
+        seed_path: Path of the JSON file with profiles keyed by user ID.
+        repository: The repository to import into.
+        batch_size: Rows per insert batch.
+
+    Returns:
+        int: Number of profiles imported.
+    """
+    with open(seed_path, "r") as file:
+        profiles = json.load(file)
+    return repository.import_profiles(profiles.items(), batch_size=batch_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a JSON profile seed file into a SQLite profile database.")
+    parser.add_argument("seed", help="JSON file with profiles keyed by user ID")
+    parser.add_argument("database", help="SQLite database file, created if missing")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Rows per insert batch")
+    args = parser.parse_args()
+    count = import_seed(args.seed, SqliteProfileRepository(args.database), args.batch_size)
+    print(f"Imported {count} profiles into {args.database}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# The agent modules read these at import time; point them at the bundled seed data.
+os.environ.setdefault("USER_PROFILES_SEED", "user_profiles_mbti_seed.json")
+os.environ.setdefault("MATCHER_INSTRUCTION_FILE", "instruction_mbti.txt")
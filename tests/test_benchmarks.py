@@ -0,0 +1,48 @@
+import argparse
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks import matching
+from benchmarks.population import synthetic_population
+from coordination_agent.sub_agents.matcher.compatibility import temperament
+from coordination_agent.sub_agents.matcher.projection import derived_fields
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return json.load(file)
+
+
+@pytest.mark.unit
+def test_synthetic_population_follows_the_seed_schema(profiles):
+    population = synthetic_population(300, seed=1, seed_profiles=profiles)
+
+    assert len(population) == 300
+    assert synthetic_population(300, seed=1, seed_profiles=profiles) == population
+    seed_fields = list(next(iter(profiles.values())))
+    for profile in population.values():
+        assert list(profile) == seed_fields
+        assert derived_fields(profile["mbti_type"]).items() <= profile.items()
+        assert (profile["extraversion"] > 50) == (profile["mbti_type"][0] == "E")
+    assert {temperament(profile["mbti_type"]) for profile in population.values()} == {"NT", "NF", "ST", "SP"}
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", ["random", "greedy", "chunked", "repair"])
+def test_benchmark_paths_group_the_pool(path):
+    args = argparse.Namespace(
+        seed=0, group_size=2, time_limit=1.0, chunk_size=30, chunk_method="temperament", concurrency=4,
+        latency=0.0, max_matrix_users=5000, no_memory=False,
+    )
+    result = matching.benchmark(80, path, args)
+
+    assert result["grouped"] == 1.0
+    assert 0 < result["objective"] <= 1
+    assert result["peak_mib"] is not None
+    if path != "random":
+        assert result["objective"] > matching.benchmark(80, "random", args)["objective"]
@@ -0,0 +1,81 @@
+import copy
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from coordination_agent.shared_libraries import callbacks
+
+
+class CountingValue:
+    """Value whose repr counts how often it is formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __repr__(self) -> str:
+        self.formatted += 1
+        return "counting"
+
+
+def _context(state: dict, invocation_id: str = "inv-1") -> SimpleNamespace:
+    return SimpleNamespace(
+        agent_name="matcher",
+        invocation_id=invocation_id,
+        state=SimpleNamespace(to_dict=lambda: dict(state)),
+    )
+
+
+@pytest.mark.unit
+def test_describe_value_is_size_bounded():
+    assert callbacks.describe_value({f"u{index}": {} for index in range(10000)}) == "dict[10000]"
+    assert callbacks.describe_value([1, 2]) == "list[2]"
+    assert callbacks.describe_value("short") == "'short'"
+    long = callbacks.describe_value("x" * 1000)
+    assert len(long) < 120 and long.endswith("(1002 chars)")
+
+
+@pytest.mark.unit
+def test_diff_state_reports_changed_keys():
+    profiles = {"u1": {}}
+    before = callbacks.summarize_state({"user_profiles": profiles, "matched_groups": {}, "old": 1})
+    after = callbacks.summarize_state({"user_profiles": profiles, "matched_groups": {"g1": {}}, "new": "x"})
+
+    assert callbacks.diff_state(before, after) == {"matched_groups": "~dict[1]", "new": "+'x'", "old": "-"}
+
+
+@pytest.mark.unit
+def test_diff_state_compares_content_not_identity():
+    state = {"matched_groups": {"g1": {"user_ids": ["u1", "u2"]}}, "request": "pairs"}
+    before = callbacks.summarize_state(state)
+
+    assert callbacks.diff_state(before, callbacks.summarize_state(copy.deepcopy(state))) == {}
+    state["matched_groups"]["g1"]["user_ids"][1] = "u3"
+    assert callbacks.diff_state(before, callbacks.summarize_state(state)) == {"matched_groups": "~dict[1]"}
+
+
+@pytest.mark.unit
+def test_agent_traces_log_summaries_and_diffs(caplog):
+    state = {"user_profiles": {f"u{index}": {} for index in range(500)}, "matched_groups": {}}
+    with caplog.at_level(logging.INFO, logger=callbacks.__name__):
+        callbacks.before_agent_trace(_context(state))
+        state["matched_groups"] = {"g1": {"user_ids": ["u1", "u2"]}}
+        callbacks.after_agent_trace(_context(state))
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert "[before_agent_trace] With state: user_profiles=dict[500], matched_groups=dict[0]" in messages
+    assert "[after_agent_trace] State changes: matched_groups~dict[1]" in messages
+    assert all(len(message) < 200 for message in messages)
+
+
+@pytest.mark.unit
+def test_disabled_levels_do_not_format_state(caplog):
+    value = CountingValue()
+    with caplog.at_level(logging.WARNING, logger=callbacks.__name__):
+        callbacks.before_agent_trace(_context({"value": value}))
+        callbacks.after_agent_trace(_context({"value": value}))
+    assert value.formatted == 0
+
+    with caplog.at_level(logging.DEBUG, logger=callbacks.__name__):
+        callbacks.before_agent_trace(_context({"value": value}, "inv-2"))
+    assert any("Full state" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from coordination_agent.shared_libraries.constants import MATCHED_GROUPS, USER_PROFILES, USER_PROFILES_VERSION
+from coordination_agent.shared_libraries.types import MatcherResponse, UserGroup
+from coordination_agent.sub_agents.matcher import cache as cache_module
+from coordination_agent.sub_agents.matcher import prompt
+from coordination_agent.sub_agents.matcher.cache import MatchCache, _profiles_key, match_cache_callbacks, match_fingerprint
+from coordination_agent.tools.profiles import profile_store
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return dict(list(json.load(file).items())[:6])
+
+
+def response(*user_ids: str) -> MatcherResponse:
+    return MatcherResponse(matched_groups={"g1": UserGroup(user_ids=list(user_ids))}, matching_strategy="Test.")
+
+
+class CountingAgent(BaseAgent):
+    """Offline stand-in for the matcher: pairs the first two users and counts its model calls."""
+
+    calls: int = 0
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        self.calls += 1
+        user_ids = list(ctx.session.state[USER_PROFILES])[:2]
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            content=types.Content(role="model", parts=[types.Part.from_text(text=response(*user_ids).model_dump_json())]),
+        )
+
+
+async def run(agent: BaseAgent, request: str, profiles: dict) -> tuple[str, dict]:
+    runner = Runner(app_name=agent.name, agent=agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(app_name=agent.name, user_id="user", state={USER_PROFILES: profiles})
+    content = types.Content(role="user", parts=[types.Part.from_text(text=request)])
+    events = [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=content)]
+    session = await runner.session_service.get_session(app_name=agent.name, user_id="user", session_id=session.id)
+    return events[-1].content.parts[0].text, session.state
+
+
+@pytest.mark.unit
+def test_fingerprint_covers_the_whole_prompt():
+    key = match_fingerprint("Pair them", "version:1", "instruction", "model", "compact")
+
+    assert key == match_fingerprint("Pair them", "version:1", "instruction", "model", "compact")
+    assert key != match_fingerprint("Pair them", "version:1", "other instruction", "model", "compact")
+    assert key != match_fingerprint("Group them", "version:1", "instruction", "model", "compact")
+    assert key != match_fingerprint("Pair them", "version:2", "instruction", "model", "compact")
+    assert key != match_fingerprint("Pair them", "version:1", "instruction", "model", "json")
+
+
+@pytest.mark.unit
+def test_profiles_key_uses_the_version_of_shared_profiles(profiles, monkeypatch):
+    version = profile_store.snapshot().version
+    reordered = dict(reversed(list(profiles.items())))
+    assert _profiles_key({USER_PROFILES: profiles}) == _profiles_key({USER_PROFILES: reordered})
+    assert _profiles_key({USER_PROFILES: profiles}) != _profiles_key({USER_PROFILES: dict(list(profiles.items())[:4])})
+
+    monkeypatch.setattr(cache_module, "profile_fingerprint", lambda profiles: pytest.fail("pool was hashed"))
+    assert _profiles_key({USER_PROFILES_VERSION: version}) == f"version:{version}"
+    assert _profiles_key({}) == ""
+
+
+@pytest.mark.unit
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = MatchCache(tmp_path / "matches.sqlite3", max_entries=2)
+    cache.put("a", response("u1", "u2"))
+    cache.put("b", response("u3", "u4"))
+    assert cache.get("a") == response("u1", "u2")
+
+    cache.put("c", response("u5", "u6"))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert MatchCache(tmp_path / "matches.sqlite3").get("c") == response("u5", "u6")
+
+
+@pytest.mark.unit
+def test_callbacks_answer_repeated_requests_from_the_cache(profiles, tmp_path, monkeypatch):
+    before, after = match_cache_callbacks(MatchCache(tmp_path / "matches.sqlite3"), "instruction")
+    agent = CountingAgent(name="matcher", before_agent_callback=before, after_agent_callback=after)
+
+    first, _ = asyncio.run(run(agent, "Pair them", profiles))
+    second, state = asyncio.run(run(agent, "Pair them", profiles))
+
+    assert agent.calls == 1
+    assert MatcherResponse.model_validate_json(second) == MatcherResponse.model_validate_json(first)
+    assert state[MATCHED_GROUPS] == MatcherResponse.model_validate_json(first).model_dump(exclude_none=True)
+
+    asyncio.run(run(agent, "Pair them", dict(list(profiles.items())[:4])))
+    assert agent.calls == 2
+
+    # Answers to a prompt with the profiles in another format are not reused
+    monkeypatch.setattr(prompt, "PROFILE_FORMAT", "json")
+    asyncio.run(run(agent, "Pair them", profiles))
+    assert agent.calls == 3
+    assert match_cache_callbacks(None, "instruction") == ([], [])
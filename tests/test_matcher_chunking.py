@@ -0,0 +1,160 @@
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import AsyncGenerator
+from types import SimpleNamespace
+
+import pytest
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.sessions.state import State
+from google.genai import types
+
+from coordination_agent.shared_libraries.constants import MATCHED_GROUPS, USER_PROFILES
+from coordination_agent.sub_agents.matcher import chunking
+from coordination_agent.sub_agents.matcher.compatibility import temperament
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return json.load(file)
+
+
+class PairingAgent(BaseAgent):
+    """Offline stand-in for the matcher: pairs the users of its chunk in order."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        request = ctx.user_content.parts[0].text
+        user_ids = list(ctx.session.state[USER_PROFILES])
+        if "fail" in request and len(user_ids) % 2:
+            raise RuntimeError("model unavailable")
+        groups = {
+            f"group_{index}": {"user_ids": user_ids[index:index + 2]}
+            for index in range(0, len(user_ids) - 1, 2)
+        }
+        response = {"matched_groups": groups, "matching_strategy": "Pairs in order."}
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            content=types.Content(role="model", parts=[types.Part.from_text(text=json.dumps(response))]),
+        )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("method", chunking.PARTITION_METHODS)
+def test_partition_profiles_covers_the_pool(profiles, method):
+    chunks = chunking.partition_profiles(profiles, 20, method)
+
+    assert len(chunks) == 5
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert sorted(user_id for chunk in chunks for user_id in chunk) == sorted(profiles)
+    assert chunking.partition_profiles(profiles, 20, method) == chunks
+
+
+@pytest.mark.unit
+def test_temperament_partition_mixes_temperaments(profiles):
+    pool_temperaments = {temperament(profile["mbti_type"]) for profile in profiles.values()}
+    for chunk in chunking.partition_profiles(profiles, 25, "temperament"):
+        assert {temperament(profiles[user_id]["mbti_type"]) for user_id in chunk} == pool_temperaments
+
+
+@pytest.mark.unit
+def test_partition_profiles_rejects_bad_arguments(profiles):
+    with pytest.raises(ValueError):
+        chunking.partition_profiles(profiles, 20, "random")
+    with pytest.raises(ValueError):
+        chunking.partition_profiles(profiles, 1)
+    assert chunking.partition_profiles({}, 20) == []
+
+
+@pytest.mark.unit
+def test_chunk_request_does_not_inline_profiles(profiles):
+    user_id = next(iter(profiles))
+    request = chunking.chunk_request("Pair them up", {user_id: profiles[user_id]})
+
+    assert request.startswith("Pair them up")
+    assert user_id not in request
+
+
+@pytest.mark.unit
+def test_match_in_chunks_merges_with_unique_group_ids(profiles):
+    merged, errors, unassigned = asyncio.run(chunking.match_in_chunks(PairingAgent(name="matcher"), "Pair them up", profiles, 30))
+
+    assert errors == {}
+    assert len(unassigned) == sum(len(chunk) % 2 for chunk in chunking.partition_profiles(profiles, 30))
+    assert len(merged.matched_groups) == sum(len(chunk) // 2 for chunk in chunking.partition_profiles(profiles, 30))
+    assert not any(re.fullmatch(r"group_\d+", group_id) for group_id in merged.matched_groups)
+    grouped = [user_id for group in merged.matched_groups.values() for user_id in group.user_ids]
+    assert len(grouped) == len(set(grouped))
+    assert merged.matching_strategy == "Pairs in order."
+
+
+@pytest.mark.unit
+def test_match_in_chunks_tool_reports_failed_chunks(profiles):
+    tool = chunking.chunked_matcher_tool(PairingAgent(name="matcher"), max_chunk_size=20)
+    tool_context = SimpleNamespace(state=State({USER_PROFILES: profiles}, {}))
+
+    response = asyncio.run(tool("Pair them up, fail on odd chunks", [], tool_context))
+
+    assert response["status"] == "success"
+    assert response["errors"]
+    grouped = {user_id for group in response["result"]["matched_groups"].values() for user_id in group["user_ids"]}
+    assert set(response["unassigned_user_ids"]) == set(profiles) - grouped
+    assert tool_context.state[MATCHED_GROUPS] == response["result"]
+    assert tool.__name__ == "match_in_chunks"
+    assert asyncio.run(tool("Pair them up", ["unknown"], tool_context))["status"] == "error"
+
+
+class StrayAgent(BaseAgent):
+    """Matcher stand-in that adds unknown users, repeats users and uses the user named in the request."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        stray = ctx.user_content.parts[0].text.split()[-1]
+        user_ids = list(ctx.session.state[USER_PROFILES])
+        groups = {
+            "group_1": {"user_ids": [user_ids[0], user_ids[1], "unknown"]},
+            "group_2": {"user_ids": [user_ids[1], user_ids[2]]},
+            "group_3": {"user_ids": [user_ids[3], stray]},
+        }
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            content=types.Content(role="model", parts=[types.Part.from_text(text=json.dumps({"matched_groups": groups}))]),
+        )
+
+
+@pytest.mark.unit
+def test_match_batches_keeps_every_user_in_its_batch_and_in_one_group(profiles):
+    user_ids = list(profiles)[:8]
+    batches = [{user_id: profiles[user_id] for user_id in user_ids[:4]}, {user_id: profiles[user_id] for user_id in user_ids[4:]}]
+
+    merged, errors, unassigned = asyncio.run(
+        chunking.match_batches(StrayAgent(name="matcher"), f"Group them with {user_ids[0]}", batches)
+    )
+
+    assert errors == {}
+    assert sorted(group.user_ids for group in merged.matched_groups.values()) == [user_ids[:2], user_ids[4:6]]
+    assert unassigned == [user_ids[2], user_ids[3], user_ids[6], user_ids[7]]
+
+
+@pytest.mark.unit
+def test_match_in_parallel_tool_keeps_batches_apart(profiles):
+    tool = chunking.parallel_matcher_tool(PairingAgent(name="matcher"), max_concurrency=2)
+    tool_context = SimpleNamespace(state=State({USER_PROFILES: profiles}, {}))
+    user_ids = list(profiles)
+    batches = [user_ids[:10], user_ids[10:20], user_ids[20:24]]
+
+    response = asyncio.run(tool("Pair them up", batches, tool_context))
+
+    assert response["status"] == "success" and "errors" not in response
+    batch_of = {user_id: index for index, batch in enumerate(batches) for user_id in batch}
+    groups = response["result"]["matched_groups"].values()
+    assert len(groups) == 12
+    assert all(len({batch_of[user_id] for user_id in group["user_ids"]}) == 1 for group in groups)
+    assert tool_context.state[MATCHED_GROUPS] == response["result"]
+    assert asyncio.run(tool("Pair them up", [user_ids[:4], user_ids[3:6]], tool_context))["status"] == "error"
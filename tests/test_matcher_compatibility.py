@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from coordination_agent.shared_libraries.constants import USER_PROFILES
+from coordination_agent.sub_agents.matcher.compatibility import (
+    ProfileFeatures,
+    compatibility_matrix,
+    pair_scores,
+    temperament,
+    top_partners,
+)
+from coordination_agent.sub_agents.matcher.tools import score_compatibility
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return json.load(file)
+
+
+def _profile(mbti_type: str, dominant: str, auxiliary: str, **overrides) -> dict:
+    profile = {
+        "mbti_type": mbti_type,
+        "extraversion": 50,
+        "sensing": 50,
+        "thinking": 50,
+        "judging": 50,
+        "dominant_function": dominant,
+        "auxiliary_function": auxiliary,
+        "communication_style": "Direct",
+        "leadership_style": "Visionary",
+        "stress_response": "Withdrawal",
+    }
+    profile.update(overrides)
+    return profile
+
+
+@pytest.mark.unit
+def test_temperament():
+    assert [temperament(mbti_type) for mbti_type in ("INTJ", "enfp", "ISTJ", "ESFP")] == ["NT", "NF", "ST", "SP"]
+
+
+@pytest.mark.unit
+def test_compatibility_matrix_is_symmetric_and_bounded(profiles):
+    features = ProfileFeatures.from_profiles(profiles)
+    scores = compatibility_matrix(features)
+
+    assert scores.shape == (len(profiles), len(profiles))
+    assert scores.dtype == np.float32
+    assert np.allclose(scores, scores.T)
+    assert np.all(np.diag(scores) == 0)
+    assert 0 <= scores.min() and scores.max() <= 1
+
+
+@pytest.mark.unit
+def test_pair_scores_match_the_full_matrix(profiles):
+    features = ProfileFeatures.from_profiles(profiles)
+    scores = compatibility_matrix(features)
+    rows = np.arange(len(profiles))
+    partners = np.roll(rows, 7)
+
+    assert np.allclose(pair_scores(features, rows, partners), scores[rows, partners])
+    assert pair_scores(features, [3], [3])[0] == 0
+
+
+@pytest.mark.unit
+def test_complementary_profiles_score_higher():
+    features = ProfileFeatures.from_profiles({
+        "intj": _profile("INTJ", "Ni", "Te", extraversion=20, thinking=80),
+        "enfp": _profile("ENFP", "Ne", "Fi", extraversion=80, thinking=20),
+        "intj_twin": _profile("INTJ", "Ni", "Te", extraversion=20, thinking=80, leadership_style="Strategic"),
+    })
+    scores = compatibility_matrix(features)
+    assert scores[0, 1] > scores[0, 2]
+
+
+@pytest.mark.unit
+def test_top_partners_excludes_self_and_is_sorted(profiles):
+    features = ProfileFeatures.from_profiles(profiles)
+    partners = top_partners(compatibility_matrix(features), features.user_ids, top_n=5)
+
+    assert set(partners) == set(profiles)
+    for user_id, ranked in partners.items():
+        assert len(ranked) == 5
+        assert user_id not in [partner["user_id"] for partner in ranked]
+        assert [partner["score"] for partner in ranked] == sorted((partner["score"] for partner in ranked), reverse=True)
+
+
+@pytest.mark.unit
+def test_score_compatibility_tool(profiles):
+    tool_context = SimpleNamespace(state={USER_PROFILES: profiles})
+    user_ids = list(profiles)[:4]
+
+    response = score_compatibility(user_ids, tool_context, top_n=2)
+    assert response["status"] == "success"
+    assert list(response["result"]) == user_ids
+
+    assert len(score_compatibility([], tool_context, top_n=1)["result"]) == len(profiles)
+    assert score_compatibility(["unknown", user_ids[0]], tool_context)["status"] == "error"
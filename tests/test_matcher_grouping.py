@@ -0,0 +1,222 @@
+import itertools
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from coordination_agent.shared_libraries.constants import MATCHED_GROUPS, MATCHED_USER_GROUPS, MATCHED_USERS, USER_PROFILES
+from coordination_agent.shared_libraries.types import MatcherResponse
+from coordination_agent.sub_agents.matcher import grouping
+from coordination_agent.sub_agents.matcher.compatibility import PairScoreCache, ProfileFeatures, compatibility_matrix
+from coordination_agent.sub_agents.matcher.tools import form_groups, update_groups
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope="module")
+def scores(profiles) -> np.ndarray:
+    return compatibility_matrix(ProfileFeatures.from_profiles(profiles))
+
+
+def _random_scores(size: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    scores = rng.random((size, size)).astype(np.float32)
+    scores = (scores + scores.T) / 2
+    np.fill_diagonal(scores, 0)
+    return scores
+
+
+def _brute_force_pairing(scores: np.ndarray) -> float:
+    def best(users: tuple[int, ...]) -> float:
+        if len(users) < 2:
+            return 0.0
+        first, rest = users[0], users[1:]
+        return max(scores[first, other] + best(tuple(user for user in rest if user != other)) for other in rest)
+    return best(tuple(range(scores.shape[0])))
+
+
+def _assert_partition(groups: list[list[int]], size: int, group_size: int):
+    assert sorted(itertools.chain.from_iterable(groups)) == list(range(size))
+    assert all(group_size <= len(group) < 2 * group_size for group in groups)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("group_size", [2, 3, 4])
+def test_greedy_and_local_search_partition_everyone(scores, group_size):
+    greedy = grouping.form_groups_greedy(scores, group_size)
+    improved = grouping.improve_groups(scores, greedy, time_limit_seconds=5)
+
+    _assert_partition(greedy, scores.shape[0], group_size)
+    _assert_partition(improved, scores.shape[0], group_size)
+    assert sorted(map(len, improved)) == sorted(map(len, greedy))
+    assert grouping.groups_score(scores, improved) >= grouping.groups_score(scores, greedy)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(3))
+def test_cpsat_pairing_is_optimal_on_small_populations(seed):
+    pytest.importorskip("ortools")
+    scores = _random_scores(10, seed)
+    pairs = grouping.form_groups(scores, 2, method="cpsat", time_limit_seconds=5)
+
+    _assert_partition(pairs, 10, 2)
+    assert grouping.groups_score(scores, pairs) == pytest.approx(_brute_force_pairing(scores), abs=1e-2)
+
+
+@pytest.mark.unit
+def test_form_groups_is_reproducible(scores):
+    first = grouping.form_groups(scores, 3, method="greedy", time_limit_seconds=5)
+    assert grouping.form_groups(scores, 3, method="greedy", time_limit_seconds=5) == first
+    with pytest.raises(ValueError):
+        grouping.form_groups(scores, 1)
+
+
+@pytest.mark.unit
+def test_cpsat_pairing_is_reproducible_and_skipped_for_large_pools(monkeypatch):
+    pytest.importorskip("ortools")
+    scores = _random_scores(60, 0)
+    first = grouping.form_groups(scores, 2, method="cpsat", time_limit_seconds=5)
+    assert grouping.form_groups(scores, 2, method="cpsat", time_limit_seconds=5) == first
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CP-SAT should not run above max_cpsat_users")
+
+    monkeypatch.setattr(grouping, "form_pairs_cpsat", fail)
+    pairs = grouping.form_groups(scores, 2, time_limit_seconds=5, max_cpsat_users=50)
+    _assert_partition(pairs, 60, 2)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("time_limit_seconds", [5.0, 0.0])
+def test_sparse_grouping_partitions_everyone(time_limit_seconds):
+    scores = _random_scores(300, 1)
+
+    def candidate_pairs(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # The 8 best partners of each row, as pairs with left < right
+        block = scores[np.ix_(rows, rows)]
+        best = np.zeros_like(block, dtype=bool)
+        np.put_along_axis(best, np.argsort(-block, axis=1)[:, :8], True, axis=1)
+        left, right = np.nonzero(np.triu(best | best.T, 1))
+        return rows[left], rows[right], block[left, right]
+
+    score = lambda left, right: scores[np.ix_(left, right)]
+    groups = grouping.form_groups_sparse(300, candidate_pairs, score, 3, time_limit_seconds, max_dense_users=50)
+    _assert_partition(groups, 300, 3)
+    assert grouping.sparse_groups_score(groups, score) == pytest.approx(grouping.groups_score(scores, groups), rel=1e-5)
+
+
+@pytest.mark.unit
+def test_form_groups_tool_stores_matcher_response(profiles, monkeypatch):
+    monkeypatch.setattr("coordination_agent.sub_agents.matcher.tools.GROUPING_TIME_LIMIT_SECONDS", 2.0)
+    tool_context = SimpleNamespace(state={USER_PROFILES: profiles})
+
+    response = form_groups([], tool_context, group_size=4)
+    assert response["status"] == "success"
+    matched = MatcherResponse.model_validate(tool_context.state[MATCHED_GROUPS])
+    assert sum(len(group.user_ids) for group in matched.matched_groups.values()) == len(profiles)
+    assert all(len(group.complementary_traits) == len(group.user_ids) for group in matched.matched_groups.values())
+    assert tool_context.state[MATCHED_USER_GROUPS] == [group.user_ids for group in matched.matched_groups.values()]
+    assert sorted(tool_context.state[MATCHED_USERS]) == sorted(profiles)
+
+    assert form_groups(list(profiles)[:4], tool_context, group_size=1)["status"] == "error"
+
+
+@pytest.mark.unit
+def test_pair_score_cache_matches_the_full_matrix(profiles, scores):
+    cache = PairScoreCache(max_entries=50)
+    user_ids = list(profiles)
+    left, right = user_ids[:5], user_ids[3:12]
+
+    expected = scores[:5, 3:12]
+    assert np.allclose(cache.matrix(profiles, left, right), expected)
+    assert np.allclose(cache.matrix(profiles, left, right), expected)
+    assert len(cache._entries) == 42
+    cache.invalidate([user_ids[0]])
+    assert len(cache._entries) == 33
+
+    # Scores of a new profile version are recomputed from the new profiles
+    cache.matrix(profiles, left, right, version="v1")
+    edited = profiles | {user_ids[3]: {**profiles[user_ids[3]], "extraversion": 100 - profiles[user_ids[3]]["extraversion"]}}
+    changed = cache.matrix(edited, left, right, version="v2")
+    assert np.allclose(changed, compatibility_matrix(ProfileFeatures.from_profiles(edited))[:5, 3:12])
+    assert not np.allclose(changed, expected)
+
+
+@pytest.mark.unit
+def test_repair_groups_only_touches_affected_groups():
+    groups = [["a", "b"], ["c", "d"], ["e", "f", "g"], ["h", "i"]]
+    calls = []
+
+    def score(left: list[str], right: list[str]) -> np.ndarray:
+        calls.append((len(left), len(right)))
+        liked = [{"x", "c"}, {"i", "e"}]
+        return np.array([[1.0 if {l, r} in liked else 0.1 for r in right] for l in left], dtype=np.float32)
+
+    repaired, changed = grouping.repair_groups(groups, added=["x", "a"], removed=["d", "g", "h"], score=score, group_size=2)
+
+    # "x" fills the group "c" was left alone in, the orphaned "i" joins the group it scores highest with
+    assert repaired == [["a", "b"], ["c", "x"], ["e", "f", "i"], []]
+    assert changed == {1, 2, 3}
+    assert all(rows <= 2 for rows, _ in calls)
+
+
+@pytest.mark.unit
+def test_repair_groups_forms_new_groups_from_newcomers():
+    groups = [["a", "b"], ["c", "d"]]
+    score = lambda left, right: np.full((len(left), len(right)), 0.5, dtype=np.float32)
+
+    repaired, changed = grouping.repair_groups(groups, ["w", "x", "y", "z"], [], score, 2)
+    assert repaired[:2] == groups
+    assert len(repaired) == 4
+    assert sorted(user_id for group in repaired[2:] for user_id in group) == ["w", "x", "y", "z"]
+    assert changed == {2, 3}
+
+
+@pytest.mark.unit
+def test_repair_groups_fills_open_groups_of_candidate_partners_only():
+    groups = [["a", "b"], ["c"], ["d"], ["e"]]
+    scored = []
+
+    def score(left: list[str], right: list[str]) -> np.ndarray:
+        scored.extend((l, r) for l in left for r in right)
+        return np.full((len(left), len(right)), 0.5, dtype=np.float32)
+
+    links = {"x": ["c"], "y": ["a"], "e": ["y"]}
+    partners = lambda user_ids: {user_id: links.get(user_id, []) for user_id in user_ids}
+
+    repaired, changed = grouping.repair_groups(groups, ["x", "y"], [], score, 2, partners=partners)
+
+    # "x" joins its candidate "c", "y" the member "e" that has "y" as candidate; "d" has no candidate newcomer
+    assert repaired == [["a", "b"], ["c", "x"], ["d"], ["e", "y"]]
+    assert changed == {1, 3}
+    assert set(scored) == {("x", "c"), ("y", "e")}
+
+
+@pytest.mark.unit
+def test_update_groups_tool_keeps_unaffected_group_ids(profiles, monkeypatch):
+    monkeypatch.setattr("coordination_agent.sub_agents.matcher.tools.GROUPING_TIME_LIMIT_SECONDS", 1.0)
+    user_ids = list(profiles)
+    tool_context = SimpleNamespace(state={USER_PROFILES: profiles})
+    form_groups(user_ids[:40], tool_context, group_size=2)
+    before = dict(tool_context.state[MATCHED_GROUPS]["matched_groups"])
+
+    leaving = before[next(iter(before))]["user_ids"][0]
+    response = update_groups([user_ids[40]], [leaving], tool_context)
+
+    assert response["status"] == "success"
+    after = response["result"]["matched_groups"]
+    assert len(response["changed_groups"]) == 1
+    for group_id, group in after.items():
+        if group_id not in response["changed_groups"]:
+            assert group == before[group_id]
+    members = sorted(user_id for group in after.values() for user_id in group["user_ids"])
+    assert members == sorted(set(user_ids[:41]) - {leaving})
+    assert update_groups(["unknown"], [], tool_context)["status"] == "error"
@@ -0,0 +1,151 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from coordination_agent.shared_libraries.constants import USER_PROFILES, USER_PROFILES_VERSION
+from coordination_agent.sub_agents.matcher import index as index_module
+from coordination_agent.sub_agents.matcher import tools
+from coordination_agent.tools.profiles import profile_store
+from coordination_agent.sub_agents.matcher.compatibility import compatibility_matrix, temperament, top_partners
+from coordination_agent.sub_agents.matcher.index import ProfileIndex, ScoreGrid, ideal_partner, profile_index
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return json.load(file)
+
+
+@pytest.fixture(scope="module")
+def large_pool(profiles) -> dict[str, dict]:
+    rng = np.random.default_rng(7)
+    seeds = list(profiles.values())
+    return {
+        f"user{index}": seeds[index % len(seeds)] | {
+            field: int(rng.integers(0, 101)) for field in ("extraversion", "sensing", "thinking", "judging")
+        }
+        for index in range(3000)
+    }
+
+
+@pytest.mark.unit
+def test_score_grid_nearest_is_exact():
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1, 1, (2000, 4)).astype(np.float32)
+    queries = rng.uniform(-1, 1, (50, 4)).astype(np.float32)
+    grid = ScoreGrid(points)
+
+    exclude = np.arange(50)
+    for position, found in enumerate(grid.nearest(queries, 5, exclude=exclude)):
+        distances = np.linalg.norm(points - queries[position], axis=1)
+        distances[position] = np.inf
+        assert np.allclose(distances[found], np.sort(distances)[:5])
+        assert position not in found
+
+
+@pytest.mark.unit
+def test_lookup_intersects_inverted_indices(profiles):
+    index = ProfileIndex(profiles)
+
+    found = index.lookup(temperament="NT", work_preference="Independent")
+    expected = [
+        user_id for user_id, profile in profiles.items()
+        if temperament(profile["mbti_type"]) == "NT" and profile["work_preference"] == "Independent"
+    ]
+    assert found == expected
+    assert index.lookup() == list(profiles)
+    assert index.lookup(mbti_type="XXXX") == []
+    with pytest.raises(ValueError):
+        index.lookup(stress_response="Withdrawal")
+
+
+@pytest.mark.unit
+def test_ideal_partner_mirrors_balanced_axes():
+    assert ideal_partner(np.array([0.5, 0.4, -0.2, 0.0])).tolist() == pytest.approx([-1.0, 0.4, 1.0, -1.0])
+
+
+@pytest.mark.unit
+def test_index_top_partners_recall(large_pool):
+    index = ProfileIndex(large_pool)
+    sample = index.user_ids[:200]
+    approximate = index.top_partners(sample, top_n=3)
+
+    exact_scores = compatibility_matrix(index.features.subset(np.arange(200)), index.features)
+    hits = 0
+    for row, user_id in enumerate(sample):
+        exact_scores[row, row] = -1
+        best = {index.user_ids[column] for column in np.argsort(-exact_scores[row])[:3]}
+        hits += len(best & {partner["user_id"] for partner in approximate[user_id]})
+        assert user_id not in {partner["user_id"] for partner in approximate[user_id]}
+    assert hits / (3 * len(sample)) > 0.6
+
+
+@pytest.mark.unit
+def test_index_matches_full_scoring_on_small_pools(profiles):
+    index = ProfileIndex(profiles)
+    # With candidates covering the whole pool the index is exact
+    approximate = index.top_partners(top_n=2, candidates=len(profiles))
+    assert approximate == top_partners(compatibility_matrix(index.features), index.user_ids, 2)
+
+
+@pytest.mark.unit
+def test_profile_index_is_shared_per_content(profiles):
+    assert profile_index(profiles) is profile_index(dict(profiles))
+
+
+@pytest.mark.unit
+def test_shared_pool_index_is_keyed_by_version(monkeypatch):
+    snapshot = profile_store.snapshot()
+    tool_context = SimpleNamespace(state={USER_PROFILES_VERSION: snapshot.version})
+    monkeypatch.setattr(tools, "INDEX_MIN_USERS", 10)
+    # Neither the load hook's index nor the tools may hash the pool
+    monkeypatch.setattr(index_module, "profile_fingerprint", lambda profiles: pytest.fail("pool was hashed"))
+
+    shared = profile_index(snapshot.data, version=snapshot.version)
+    assert tools._shared_index([], tool_context) is shared
+    response = tools.score_compatibility([], tool_context, top_n=1)
+    assert response["status"] == "success" and len(response["result"]) == len(snapshot.data)
+
+    user_ids = list(snapshot.data)[:20]
+    subset = tools._shared_index(user_ids, tool_context)
+    assert subset is tools._shared_index(user_ids, tool_context) and len(subset) == 20
+    assert tools.score_compatibility(user_ids + ["unknown"], tool_context)["status"] == "error"
+
+
+@pytest.mark.unit
+def test_tools_use_the_index(profiles, monkeypatch):
+    tool_context = SimpleNamespace(state={USER_PROFILES: profiles})
+    monkeypatch.setattr(tools, "INDEX_MIN_USERS", 10)
+
+    response = tools.score_compatibility([], tool_context, top_n=2)
+    assert response["status"] == "success"
+    assert len(response["result"]) == len(profiles)
+
+    found = tools.find_users(tool_context, mbti_type="intj")
+    assert found["result"] == [user_id for user_id, profile in profiles.items() if profile["mbti_type"] == "INTJ"]
+
+
+@pytest.mark.unit
+def test_form_groups_tool_uses_candidate_pairs_on_large_pools(large_pool, monkeypatch):
+    tool_context = SimpleNamespace(state={USER_PROFILES: large_pool})
+    monkeypatch.setattr(tools, "INDEX_MIN_USERS", 1000)
+    monkeypatch.setattr(tools.grouping, "form_groups", lambda *args, **kwargs: pytest.fail("full matrix was built"))
+
+    response = tools.form_groups([], tool_context, group_size=3)
+    assert response["status"] == "success"
+    groups = [group["user_ids"] for group in response["result"]["matched_groups"].values()]
+    assert sorted(user_id for group in groups for user_id in group) == sorted(large_pool)
+    assert all(3 <= len(group) < 6 for group in groups)
+
+    index = profile_index(large_pool)
+    assert index.candidate_pairs() is index.candidate_pairs()
+    # Close to the greedy grouping over the full matrix
+    scores = compatibility_matrix(index.features)
+    rows = [[index.rows[user_id] for user_id in group] for group in groups]
+    dense = tools.grouping.form_groups_greedy(scores, 3)
+    assert tools.grouping.groups_score(scores, rows) > 0.9 * tools.grouping.groups_score(scores, dense)
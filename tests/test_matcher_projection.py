@@ -0,0 +1,112 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.sessions import InMemorySessionService, Session
+from litellm import token_counter
+
+from coordination_agent.shared_libraries.constants import USER_PROFILES, USER_PROFILES_VERSION
+from coordination_agent.sub_agents.matcher import prompt
+from coordination_agent.sub_agents.matcher.projection import decode_profiles, derived_fields, encode_profiles
+from coordination_agent.tools import profiles as profile_tools
+from coordination_agent.tools.repository import SqliteProfileRepository, import_seed
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return json.load(file)
+
+
+@pytest.mark.unit
+def test_encoding_round_trips(profiles):
+    assert decode_profiles(encode_profiles(profiles)) == profiles
+    assert decode_profiles(encode_profiles({})) == {}
+
+
+@pytest.mark.unit
+def test_fields_not_following_the_type_are_kept(profiles):
+    user_id, profile = next(iter(profiles.items()))
+    odd = {user_id: profile | {"dominant_function": "Se", "team": "Platform"}}
+
+    line = encode_profiles(odd).split("\n")[-1]
+    assert "dominant_function=Se" in line and "team=Platform" in line
+    assert decode_profiles(encode_profiles(odd)) == odd
+
+
+@pytest.mark.unit
+def test_non_string_fields_keep_their_types(profiles):
+    user_id, profile = next(iter(profiles.items()))
+    typed = {user_id: profile | {"age": 31, "remote": True, "rating": 4.5, "teams": ["Platform", "Search"], "manager": None}}
+
+    line = encode_profiles(typed).split("\n")[-1]
+    assert "age:=31" in line and 'teams:=["Platform","Search"]' in line
+    assert decode_profiles(encode_profiles(typed)) == typed
+
+
+@pytest.mark.unit
+def test_derived_fields_match_the_seed(profiles):
+    for profile in profiles.values():
+        assert derived_fields(profile["mbti_type"]).items() <= profile.items()
+
+
+@pytest.mark.unit
+def test_compact_encoding_uses_fewer_tokens(profiles):
+    compact = token_counter(model="gpt-4o", text=encode_profiles(profiles))
+    assert compact * 3 < token_counter(model="gpt-4o", text=json.dumps(profiles))
+
+
+@pytest.mark.unit
+def test_matcher_instruction_appends_profiles(profiles, monkeypatch):
+    session = Session(id="session", app_name="matcher", user_id="user", state={"request": "pairs", USER_PROFILES: profiles})
+    context = ReadonlyContext(InvocationContext(
+        session_service=InMemorySessionService(),
+        invocation_id="invocation",
+        agent=LlmAgent(name="matcher"),
+        session=session,
+    ))
+    monkeypatch.setattr(prompt, "INSTRUCTION", "Match the users in {request}.")
+    monkeypatch.setattr(prompt, "PROFILE_FORMAT", "compact")
+
+    instruction = asyncio.run(prompt.matcher_instruction(context))
+    assert instruction.startswith("Match the users in pairs.")
+    assert all(user_id in instruction for user_id in profiles)
+
+    monkeypatch.setattr(prompt, "PROFILE_FORMAT", "none")
+    assert asyncio.run(prompt.matcher_instruction(context)) == "Match the users in pairs."
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("profile_format", ["compact", "json"])
+def test_paged_profiles_render_like_the_whole_pool(profiles, profile_format):
+    items = list(profiles.items())
+    pages = lambda: (dict(items[start:start + 25]) for start in range(0, len(items), 25))
+
+    assert prompt.format_profile_pages(pages, profile_format) == prompt.format_profiles(profiles, profile_format)
+    assert prompt.format_profile_pages(lambda: iter([]), profile_format) == ""
+
+
+@pytest.mark.unit
+def test_matcher_instruction_streams_a_sqlite_pool(profiles, tmp_path, monkeypatch):
+    repository = SqliteProfileRepository(tmp_path / "profiles.sqlite3")
+    import_seed(SEED_FILE, repository)
+    monkeypatch.setattr(profile_tools, "profile_repository", repository)
+    monkeypatch.setattr(repository, "all", lambda: pytest.fail("the whole pool was loaded"))
+    monkeypatch.setattr(prompt, "INSTRUCTION", "Match the users.")
+    monkeypatch.setattr(prompt, "PROFILE_FORMAT", "compact")
+    session = Session(id="session", app_name="matcher", user_id="user", state={USER_PROFILES_VERSION: repository.version})
+    context = ReadonlyContext(InvocationContext(
+        session_service=InMemorySessionService(),
+        invocation_id="invocation",
+        agent=LlmAgent(name="matcher"),
+        session=session,
+    ))
+
+    instruction = asyncio.run(prompt.matcher_instruction(context))
+    assert instruction == f"Match the users.\n\n{prompt.format_profiles(profiles)}"
@@ -0,0 +1,100 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from coordination_agent.shared_libraries.constants import USER_PROFILES_VERSION
+from coordination_agent.tools import profiles as profile_tools
+from coordination_agent.tools.profiles import JsonFileStore, JsonProfileRepository
+from coordination_agent.tools.repository import SqliteProfileRepository, import_seed
+
+SEED_FILE = Path(__file__).parent.parent / "user_profiles_mbti_seed.json"
+
+
+@pytest.fixture(scope="module")
+def profiles() -> dict[str, dict]:
+    with open(SEED_FILE, "r") as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def sqlite_repository(tmp_path) -> Iterator[SqliteProfileRepository]:
+    repository = SqliteProfileRepository(tmp_path / "profiles.sqlite3")
+    assert import_seed(SEED_FILE, repository, batch_size=40) == 99
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+def json_repository() -> JsonProfileRepository:
+    return JsonProfileRepository(JsonFileStore(str(SEED_FILE)))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", ["sqlite_repository", "json_repository"])
+def test_repositories_agree_with_the_seed(backend, profiles, request):
+    repository = request.getfixturevalue(backend)
+    user_ids = list(profiles)
+
+    assert len(repository) == len(profiles)
+    wanted = [user_ids[5], "unknown", user_ids[1], user_ids[5]]
+    assert repository.get_many(wanted) == {user_ids[5]: profiles[user_ids[5]], user_ids[1]: profiles[user_ids[1]]}
+
+    pages = list(repository.iter_pages(page_size=25))
+    assert [len(page) for page in pages] == [25, 25, 25, 24]
+    assert [user_id for page in pages for user_id in page] == user_ids
+    assert repository.all() == profiles
+
+    assert repository.find(mbti_type="ENFP") == [
+        user_id for user_id, profile in profiles.items() if profile["mbti_type"] == "ENFP"
+    ]
+    assert repository.find(temperament="NT", work_preference="Independent") == [
+        user_id for user_id, profile in profiles.items()
+        if profile["mbti_type"][1:3] in ("NT",) and profile["work_preference"] == "Independent"
+    ]
+    with pytest.raises(ValueError):
+        repository.find(stress_response="Withdrawal")
+
+
+@pytest.mark.unit
+def test_sqlite_version_is_cached_until_a_write(sqlite_repository, profiles, monkeypatch):
+    version = sqlite_repository.version
+    connections = []
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, "connect", lambda *args, **kwargs: connections.append(args) or connect(*args, **kwargs))
+
+    assert all(sqlite_repository.version == version for _ in range(100))
+    assert connections == []
+
+    # A write through another repository, e.g. another process, is seen on the next lookup
+    other = SqliteProfileRepository(sqlite_repository.path)
+    user_id = next(iter(profiles))
+    other.import_profiles([(user_id, profiles[user_id])])
+    assert sqlite_repository.version == other.version != version
+    other.close()
+
+
+@pytest.mark.unit
+def test_sqlite_import_replaces_profiles_and_changes_the_version(sqlite_repository, profiles):
+    user_id = next(iter(profiles))
+    version = sqlite_repository.version
+
+    sqlite_repository.import_profiles([(user_id, profiles[user_id] | {"work_preference": "Remote"})])
+    assert sqlite_repository.version != version
+    assert len(sqlite_repository) == len(profiles)
+    assert sqlite_repository.get_many([user_id])[user_id]["work_preference"] == "Remote"
+    assert sqlite_repository.all()[user_id]["work_preference"] == "Remote"
+
+
+@pytest.mark.unit
+def test_sessions_load_profiles_through_the_repository(sqlite_repository, profiles, monkeypatch):
+    monkeypatch.setattr(profile_tools, "profile_repository", sqlite_repository)
+    state = {USER_PROFILES_VERSION: sqlite_repository.version}
+    user_ids = list(profiles)[:3]
+
+    found, missing = profile_tools.load_profiles(state, user_ids + ["unknown"])
+    assert found == {user_id: profiles[user_id] for user_id in user_ids}
+    assert missing == ["unknown"]
+    assert profile_tools.find_profiles(state, mbti_type="ISFJ") == sqlite_repository.find(mbti_type="ISFJ")
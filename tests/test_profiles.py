@@ -0,0 +1,102 @@
+import copy
+import json
+import os
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from coordination_agent.shared_libraries.constants import (
+    MATCHED_GROUPS,
+    STATE_INITIALIZED,
+    USER_PROFILES,
+    USER_PROFILES_VERSION,
+)
+from coordination_agent.tools import memory, profiles
+
+
+@pytest.mark.unit
+def test_store_reloads_only_changed_files(tmp_path):
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({"u1": {"mbti_type": "INTJ"}}))
+    loaded = []
+    store = profiles.JsonFileStore(str(path), on_load=loaded.append)
+
+    first = store.snapshot()
+    assert store.snapshot() is first
+    assert loaded == [first]
+
+    # Same contents with a new modification time keep the version
+    os.utime(path, ns=(0, 0))
+    assert store.snapshot() is first
+
+    path.write_text(json.dumps({"u1": {"mbti_type": "ENFP"}, "u2": {"mbti_type": "ISTJ"}}))
+    second = store.snapshot()
+    assert second.version != first.version
+    assert list(second.data) == ["u1", "u2"]
+    assert len(loaded) == 2
+
+    late = []
+    store.add_load_hook(late.append)
+    assert late == [second]
+
+    with pytest.raises(FileNotFoundError):
+        profiles.JsonFileStore(None).snapshot()
+
+
+@pytest.mark.unit
+def test_shared_snapshots_are_read_only():
+    shared = profiles.profile_store.snapshot().data
+    user_id = next(iter(shared))
+    with pytest.raises(TypeError):
+        shared[user_id]["mbti_type"] = "INTJ"
+    with pytest.raises(TypeError):
+        shared.pop(user_id)
+
+    # Serialization and deep copies still work, and copies are mutable
+    assert json.loads(json.dumps(shared)) == shared
+    copied = copy.deepcopy(shared)
+    copied[user_id]["mbti_type"] = "INTJ"
+    assert type(copied[user_id]) is dict
+    assert pickle.loads(pickle.dumps(shared)) == shared
+
+
+@pytest.mark.unit
+def test_session_profiles_prefer_the_session_copy():
+    shared = profiles.profile_store.snapshot()
+    assert profiles.session_profiles({USER_PROFILES_VERSION: shared.version}) is shared.data
+    assert profiles.session_profiles({USER_PROFILES: {"u1": {}}, USER_PROFILES_VERSION: shared.version}) == {"u1": {}}
+    assert profiles.session_profiles({}) == {}
+
+
+@pytest.mark.unit
+def test_initial_state_references_the_shared_profiles():
+    first, second = SimpleNamespace(state={}), SimpleNamespace(state={})
+    memory.load_initial_state(first)
+    memory.load_initial_state(second)
+
+    assert USER_PROFILES not in first.state
+    assert first.state[USER_PROFILES_VERSION] == profiles.profile_store.snapshot().version
+    assert first.state[MATCHED_GROUPS] == {} and first.state[MATCHED_GROUPS] is not second.state[MATCHED_GROUPS]
+
+
+@pytest.mark.unit
+def test_initial_state_is_loaded_once_per_session():
+    context = SimpleNamespace(state={})
+    memory.load_initial_state(context)
+    context.state[MATCHED_GROUPS] = {"matched_groups": {"g1": {"user_ids": ["u1", "u2"]}}}
+
+    memory.load_initial_state(context)
+    assert context.state[MATCHED_GROUPS]["matched_groups"]["g1"]["user_ids"] == ["u1", "u2"]
+    assert context.state[STATE_INITIALIZED] == profiles.initial_state_store.snapshot().version
+
+
+@pytest.mark.unit
+def test_load_profiles_returns_only_the_requested_users():
+    state = {USER_PROFILES_VERSION: profiles.profile_store.snapshot().version}
+    user_ids = list(profiles.session_profiles(state))[:3]
+
+    found, missing = profiles.load_profiles(state, [user_ids[2], "unknown", user_ids[0], user_ids[2]])
+    assert list(found) == [user_ids[2], user_ids[0]]
+    assert missing == ["unknown"]
+    assert len(profiles.load_profiles(state, [])[0]) == len(profiles.session_profiles(state))
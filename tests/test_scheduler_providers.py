@@ -0,0 +1,300 @@
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from coordination_agent.sub_agents.scheduler import providers, tools
+
+
+def _slot(start: str, end: str) -> dict[str, str]:
+    return {"start": f"2023-10-01T{start}:00", "end": f"2023-10-01T{end}:00"}
+
+
+class FakeCalendarServer(ThreadingHTTPServer):
+    """
+    Local stand-in for a calendar service, speaking the `HttpAvailabilityProvider` protocol.
+
+    Users in `flaky` fail with a 503 for their first N requests, users in `broken`
+    always fail with a 503 and users in `unknown` are reported as per-user errors.
+    """
+    daemon_threads = True
+
+    def __init__(self, flaky=None, broken=(), unknown=()):
+        super().__init__(("127.0.0.1", 0), _FakeCalendarHandler)
+        self.flaky = dict(flaky or {})
+        self.broken = set(broken)
+        self.unknown = set(unknown)
+        self.requests = []
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _FakeCalendarHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        user_ids = parse_qs(urlparse(self.path).query)["user_ids"][0].split(",")
+        with self.server.lock:
+            self.server.requests.append(user_ids)
+            failing = False
+            for user_id in user_ids:
+                if user_id in self.server.broken:
+                    failing = True
+                elif self.server.flaky.get(user_id, 0) > 0:
+                    self.server.flaky[user_id] -= 1
+                    failing = True
+
+        if failing:
+            self._respond(503, {"error": "unavailable"})
+            return
+        self._respond(200, {
+            "result": {
+                user_id: [_slot("09:00", "10:00")]
+                for user_id in user_ids if user_id not in self.server.unknown
+            },
+            "errors": {user_id: "Unknown user" for user_id in user_ids if user_id in self.server.unknown},
+        })
+
+    def _respond(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def calendar_server():
+    servers = []
+
+    def start(**kwargs):
+        server = FakeCalendarServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+class _CountingProvider(providers.AvailabilityProvider):
+    def __init__(self):
+        self.requested = []
+
+    def fetch(self, user_ids, window):
+        self.requested.append(list(user_ids))
+        return {user_id: [_slot("09:00", "10:00")] for user_id in user_ids}
+
+
+@pytest.mark.unit
+def test_cached_provider_fetches_only_missing_or_expired_users():
+    now = [0.0]
+    backend = _CountingProvider()
+    cache = providers.CachedAvailabilityProvider(backend, max_entries=2, ttl_seconds=60, clock=lambda: now[0])
+    window = providers.default_window()
+
+    assert set(cache.fetch(["a", "b"], window)) == {"a", "b"}
+    cache.fetch(["b", "a"], window)
+    assert backend.requested == [["a", "b"]]
+
+    # "c" evicts the least recently used entry ("b")
+    cache.fetch(["a", "c"], window)
+    cache.fetch(["b"], window)
+    assert backend.requested[1:] == [["c"], ["b"]]
+
+    cache.invalidate(["b"])
+    cache.fetch(["b"], window)
+    now[0] = 61
+    cache.fetch(["c"], window)
+    assert backend.requested[3:] == [["b"], ["c"]]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fetch_time_availabilities_reuses_cached_availability(monkeypatch):
+    cache = providers.CachedAvailabilityProvider(providers.RandomAvailabilityProvider())
+    monkeypatch.setattr(tools, "availability_provider", cache)
+    first = await tools.fetch_time_availabilities(["1", "2"])
+    assert first["status"] == "success"
+    assert await tools.fetch_time_availabilities(["2", "1"]) == first
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_http_provider_batches_retries_and_reports_partial_failures(calendar_server):
+    server = calendar_server(flaky={"u1": 2}, broken={"u5"}, unknown={"u4"})
+    provider = providers.HttpAvailabilityProvider(
+        server.base_url, max_concurrency=2, batch_size=2, max_retries=2, backoff_seconds=0.01
+    )
+    user_ids = ["u0", "u1", "u2", "u4", "u5"]
+
+    result = await provider.fetch_async(user_ids, providers.default_window())
+
+    assert set(result.availabilities) == {"u0", "u1", "u2"}
+    assert result.errors["u4"] == "Unknown user"
+    assert "503" in result.errors["u5"]
+    # u0/u1 succeeded on their third attempt, u5 gave up after three attempts
+    assert server.requests.count(["u0", "u1"]) == 3
+    assert server.requests.count(["u2", "u4"]) == 1
+    assert server.requests.count(["u5"]) == 3
+    assert server.connections <= 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_http_provider_reuses_its_client_across_calls(calendar_server):
+    server = calendar_server()
+    provider = providers.HttpAvailabilityProvider(server.base_url, max_concurrency=1, max_retries=0)
+    window = providers.default_window()
+
+    await provider.fetch_async(["a"], window)
+    client = provider._client
+    await provider.fetch_async(["b"], window)
+
+    assert provider._client is client and server.connections == 1
+    await provider.aclose()
+    assert client.is_closed and provider._client is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_http_provider_leaves_an_injected_client_open(calendar_server):
+    server = calendar_server()
+    async with httpx.AsyncClient() as client:
+        provider = providers.HttpAvailabilityProvider(server.base_url, client=client, max_retries=0)
+        result = await provider.fetch_async(["a"], providers.default_window())
+        await provider.aclose()
+
+        assert result.availabilities == {"a": [_slot("09:00", "10:00")]}
+        assert not client.is_closed
+
+
+@pytest.mark.unit
+def test_http_provider_sync_fetch_closes_its_client(calendar_server):
+    server = calendar_server()
+    provider = providers.HttpAvailabilityProvider(server.base_url, max_retries=0)
+    window = providers.default_window()
+
+    assert provider.fetch(["a"], window) == {"a": [_slot("09:00", "10:00")]}
+    assert provider.fetch(["b"], window) == {"b": [_slot("09:00", "10:00")]}
+    assert provider._client is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_fetch_time_availabilities_returns_per_user_errors(calendar_server, monkeypatch):
+    server = calendar_server(unknown={"b"})
+    monkeypatch.setattr(tools, "availability_provider", providers.CachedAvailabilityProvider(
+        providers.HttpAvailabilityProvider(server.base_url, max_retries=0)
+    ))
+
+    response = await tools.fetch_time_availabilities(["a", "b"])
+    assert response == {
+        "status": "success",
+        "result": {"a": [_slot("09:00", "10:00")]},
+        "errors": {"b": "Unknown user"},
+    }
+
+    # Only the failed user is requested again
+    await tools.fetch_time_availabilities(["a", "b"])
+    assert server.requests == [["a"], ["b"], ["b"]]
+
+
+@pytest.mark.unit
+def test_generated_availability_follows_working_hours_across_dst():
+    working_hours = providers.WorkingHours(weekdays=(0, 1, 2, 3, 4, 5), timezone="America/New_York")
+    slots = providers._generate_availability(
+        num_slots=16, date=datetime.date(2026, 10, 31), days=3, working_hours=working_hours
+    )
+
+    ranges = [tools.TimeRange.from_slot_dict(slot) for slot in slots]
+    # Saturday is EDT, Sunday is skipped, Monday is EST
+    assert {r.start.date() for r in ranges} == {datetime.date(2026, 10, 31), datetime.date(2026, 11, 2)}
+    assert {r.start.date(): r.start.utcoffset() for r in ranges} == {
+        datetime.date(2026, 10, 31): datetime.timedelta(hours=-4),
+        datetime.date(2026, 11, 2): datetime.timedelta(hours=-5),
+    }
+    for r in ranges:
+        assert datetime.time(9) <= r.start.time() and r.end.time() <= datetime.time(17)
+
+
+@pytest.mark.unit
+def test_random_provider_uses_per_user_timezones():
+    provider = providers.RandomAvailabilityProvider(
+        min_slots=16,
+        max_slots=16,
+        working_hours={"berlin": providers.WorkingHours(timezone="Europe/Berlin")},
+        default_working_hours=providers.WorkingHours(timezone="America/New_York"),
+    )
+    window = providers.default_window(days=2, timezone="UTC")
+    availability = provider.fetch(["berlin", "new_york"], window)
+
+    assert availability["berlin"][0]["start"].endswith(("+01:00", "+02:00"))
+    assert availability["new_york"][0]["start"].endswith(("-04:00", "-05:00"))
+    # 9-17 in Berlin and New York overlap for two or three hours a day, depending on DST
+    blocks = tools.get_meet_times([["berlin", "new_york"]], availability)["result"][0]
+    assert len(blocks) <= 2 * 6
+
+
+@pytest.mark.unit
+def test_clip_to_working_hours_keeps_the_slots_timezone():
+    window = (datetime.datetime(2023, 10, 1), datetime.datetime(2023, 10, 2))
+    late_start = providers.WorkingHours(start=datetime.time(9, 30))
+    assert providers.clip_to_working_hours([_slot("09:00", "10:00")], late_start, window) == [_slot("09:30", "10:00")]
+
+    # 9-17 in Berlin is 7-15 UTC in October; the slots stay in UTC
+    berlin = providers.WorkingHours(timezone="Europe/Berlin")
+    utc_slots = [{"start": "2023-10-01T06:00:00+00:00", "end": "2023-10-01T08:00:00+00:00"}]
+    assert providers.clip_to_working_hours(utc_slots, berlin, window) == [
+        {"start": "2023-10-01T07:00:00+00:00", "end": "2023-10-01T08:00:00+00:00"},
+    ]
+    # Naive slots are local times of the working hours' timezone
+    assert providers.clip_to_working_hours([_slot("08:00", "10:00")], berlin, window) == [_slot("09:00", "10:00")]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_http_provider_clips_to_per_user_working_hours(calendar_server):
+    server = calendar_server()
+    provider = providers.HttpAvailabilityProvider(
+        server.base_url, working_hours={"a": providers.WorkingHours(start=datetime.time(9, 30))}, max_retries=0
+    )
+    window = (datetime.datetime(2023, 10, 1), datetime.datetime(2023, 10, 2))
+
+    result = await provider.fetch_async(["a", "b"], window)
+    assert result.availabilities == {"a": [_slot("09:30", "10:00")], "b": [_slot("09:00", "10:00")]}
+
+
+@pytest.mark.unit
+def test_load_working_hours_fills_in_defaults(tmp_path):
+    path = tmp_path / "working_hours.json"
+    path.write_text(json.dumps({"a": {"start": "08:00", "weekdays": [0, 1, 2, 3, 4]}, "b": {"timezone": "Asia/Tokyo"}}))
+    default = providers.WorkingHours(timezone="Europe/Berlin")
+
+    working_hours = providers.load_working_hours(str(path), default)
+    assert working_hours["a"] == providers.WorkingHours(
+        start=datetime.time(8), weekdays=(0, 1, 2, 3, 4), timezone="Europe/Berlin"
+    )
+    assert working_hours["b"] == default._replace(timezone="Asia/Tokyo")
+    # Users with a timezone next to naive defaults would mix naive and aware slots
+    with pytest.raises(ValueError):
+        providers.load_working_hours(str(path))
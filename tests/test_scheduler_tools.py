@@ -0,0 +1,298 @@
+import json
+import random
+
+import pytest
+
+from coordination_agent.shared_libraries.types import MatcherResponse
+from coordination_agent.sub_agents.scheduler import providers, tools
+from coordination_agent.sub_agents.scheduler import assignment
+from coordination_agent.sub_agents.scheduler.assignment import assign_greedy, assign_meeting_blocks
+from coordination_agent.sub_agents.scheduler.availability import BlockAvailability
+from coordination_agent.sub_agents.scheduler.intervals import (
+    intersect_groups,
+    intersect_intervals,
+    merge_consecutive,
+    merge_intervals,
+    split_intervals,
+)
+
+
+def _slot(start: str, end: str) -> dict[str, str]:
+    return {"start": f"2023-10-01T{start}:00", "end": f"2023-10-01T{end}:00"}
+
+
+@pytest.mark.unit
+def test_merge_intervals_joins_overlapping_and_adjacent():
+    assert merge_intervals([(5, 8), (0, 2), (2, 3), (7, 10), (12, 12)]) == [(0, 3), (5, 10)]
+    assert merge_consecutive([(5, 8), (8, 10), (0, 5)]) == [(5, 10), (0, 5)]
+
+
+@pytest.mark.unit
+def test_intersect_intervals_sweeps_all_lists():
+    lists = [[(0, 10), (20, 30)], [(5, 25)], [(0, 6), (8, 40)]]
+    assert intersect_intervals(lists) == [(5, 6), (8, 10), (20, 25)]
+    assert intersect_intervals([[(0, 5)], [(5, 10)]]) == []
+    assert intersect_intervals([]) == []
+
+
+@pytest.mark.unit
+def test_find_overlapping_times_docstring_example():
+    availability = {
+        "123": [_slot("09:00", "12:00"), _slot("14:00", "17:00")],
+        "456": [_slot("10:00", "11:30"), _slot("15:00", "16:00")],
+    }
+    assert tools._find_overlapping_times(availability) == [
+        _slot("10:00", "11:30"),
+        _slot("15:00", "16:00"),
+    ]
+
+
+@pytest.mark.unit
+def test_find_overlapping_times_shrinks_to_block_grid():
+    availability = {
+        "123": [_slot("09:10", "12:00")],
+        "456": [_slot("09:00", "10:50")],
+    }
+    assert tools._find_overlapping_times(availability) == [_slot("09:30", "10:30")]
+
+
+@pytest.mark.unit
+def test_find_overlapping_times_keeps_timezone():
+    availability = {
+        "123": [{"start": "2023-10-01T09:00:00+02:00", "end": "2023-10-01T11:00:00+02:00"}],
+        "456": [{"start": "2023-10-01T08:00:00+01:00", "end": "2023-10-01T09:30:00+01:00"}],
+    }
+    assert tools._find_overlapping_times(availability) == [
+        {"start": "2023-10-01T09:00:00+02:00", "end": "2023-10-01T10:30:00+02:00"},
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ["sweep", "bitset", "matrix", "cpsat"])
+def test_find_overlapping_times_aligns_to_local_clock(engine):
+    if engine == "cpsat":
+        pytest.importorskip("ortools")
+    availability = {
+        "123": [{"start": "2023-10-01T09:00:00+05:45", "end": "2023-10-01T11:00:00+05:45"}],
+        "456": [{"start": "2023-10-01T08:30:00+05:45", "end": "2023-10-01T12:00:00+05:45"}],
+    }
+    assert tools._find_overlapping_times(availability, engine=engine) == [
+        {"start": "2023-10-01T09:00:00+05:45", "end": "2023-10-01T11:00:00+05:45"},
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ["sweep", "bitset", "matrix"])
+def test_get_meet_times_aligns_to_local_clock(engine, monkeypatch):
+    monkeypatch.setattr(tools, "SCHEDULER_ENGINE", engine)
+    availability = {
+        "123": [{"start": "2023-10-01T09:00:00+05:45", "end": "2023-10-01T10:00:00+05:45"}],
+        "456": [{"start": "2023-10-01T09:00:00+05:45", "end": "2023-10-01T10:15:00+05:45"}],
+    }
+    assert tools.get_meet_times([["123", "456"]], availability) == {
+        "status": "success",
+        "result": [[
+            {"start": "2023-10-01T09:00:00+05:45", "end": "2023-10-01T09:30:00+05:45"},
+            {"start": "2023-10-01T09:30:00+05:45", "end": "2023-10-01T10:00:00+05:45"},
+        ]],
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(20))
+def test_sweep_engine_matches_cpsat_engine(seed):
+    pytest.importorskip("ortools")
+    random.seed(seed)
+    availability = providers._generate_availabilities(
+        user_ids=[str(i) for i in range(random.randint(1, 5))],
+        num_slots_per_user=random.randint(3, 8),
+    )
+    assert tools._find_overlapping_times(availability) == tools._find_overlapping_times(
+        availability, engine="cpsat"
+    )
+
+
+@pytest.mark.unit
+def test_intersect_groups_reuses_shared_members():
+    user_intervals = {
+        "a": [(0, 100)],
+        "b": [(10, 50), (60, 90)],
+        "c": [(40, 70)],
+    }
+    assert intersect_groups([["a", "b"], ["b", "a", "c"], ["c", "d"], []], user_intervals) == [
+        [(10, 50), (60, 90)],
+        [(40, 50), (60, 70)],
+        None,
+        None,
+    ]
+
+
+@pytest.mark.unit
+def test_get_meet_times_matches_per_group_search():
+    random.seed(7)
+    user_ids = [str(i) for i in range(12)]
+    availability = providers._generate_availabilities(user_ids, num_slots_per_user=6)
+    groups = [random.sample(user_ids, random.randint(2, 4)) for _ in range(10)] + [["0", "missing"]]
+
+    tzinfo = tools._availability_tzinfo(availability)
+    expected = []
+    for group in groups:
+        if any(user_id not in availability for user_id in group):
+            expected.append([])
+            continue
+        overlaps = tools._find_overlapping_times({user_id: availability[user_id] for user_id in group})
+        expected.append(tools._intervals_to_slots(split_intervals(tools._slots_to_intervals(overlaps), 30), tzinfo))
+
+    assert tools.get_meet_times(groups, availability) == {"status": "success", "result": expected}
+
+
+@pytest.mark.unit
+def test_block_availability_round_trips_grid_intervals():
+    intervals = [(30, 90), (120, 150), (300, 600)]
+    bitset = BlockAvailability.from_intervals(intervals, origin=0, block_minutes=30)
+    assert bitset.to_intervals() == intervals
+    assert bitset.block_count() == 13
+    assert BlockAvailability.from_intervals([(40, 100)], 0, 30).to_intervals() == [(60, 90)]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("engine", ["bitset", "matrix"])
+@pytest.mark.parametrize("seed", range(10))
+def test_block_engines_match_sweep_engine(engine, seed, monkeypatch):
+    random.seed(seed)
+    user_ids = [str(i) for i in range(10)]
+    availability = providers._generate_availabilities(user_ids, num_slots_per_user=random.randint(3, 8))
+    groups = [random.sample(user_ids, random.randint(1, 4)) for _ in range(8)] + [["0", "missing"], []]
+
+    expected = tools.get_meet_times(groups, availability)
+    monkeypatch.setattr(tools, "SCHEDULER_ENGINE", engine)
+    assert tools.get_meet_times(groups, availability) == expected
+
+
+@pytest.mark.unit
+def test_assign_greedy_avoids_double_booking_and_respects_capacity():
+    groups = [["a", "b"], ["b", "c"], ["d", "e"]]
+    candidates = [[(0, 30), (30, 60)], [(0, 30), (30, 60)], [(0, 30), (30, 60)]]
+    assert assign_greedy(groups, candidates) == [(0, 30), (30, 60), (0, 30)]
+    assert assign_greedy(groups, candidates, max_concurrent_meetings=1) == [(0, 30), (30, 60), None]
+
+
+@pytest.mark.unit
+def test_assign_meeting_blocks_places_more_groups_than_greedy():
+    pytest.importorskip("ortools")
+    # Greedy places the single-candidate group first and then blocks "b" from its only other option
+    groups = [["a", "b"], ["b", "c"], ["c", "d"]]
+    candidates = [[(0, 30), (30, 60)], [(0, 30), (60, 90)], [(60, 90)]]
+    assignment = assign_meeting_blocks(groups, candidates, time_limit_seconds=5, num_workers=1)
+    assert assignment == [(30, 60), (0, 30), (60, 90)]
+
+
+@pytest.mark.unit
+def test_assign_meeting_blocks_keeps_greedy_over_a_worse_solver_result(monkeypatch):
+    groups = [["a", "b"], ["c", "d"]]
+    candidates = [[(0, 30), (30, 60)], [(0, 30)]]
+    monkeypatch.setattr(assignment, "cp_model", object())
+    monkeypatch.setattr(assignment, "assign_cpsat", lambda *args, **kwargs: [(30, 60), None])
+
+    assert assign_meeting_blocks(groups, candidates) == [(0, 30), (0, 30)]
+    assert assignment.assignment_objective([(0, 30), (0, 30)], candidates) > assignment.assignment_objective(
+        [(30, 60), (0, 30)], candidates
+    )
+
+
+@pytest.mark.unit
+def test_assign_cpsat_counts_model_building_in_the_time_limit():
+    pytest.importorskip("ortools")
+    groups = [["a", "b"], ["c", "d"]]
+    candidates = [[(0, 30), (30, 60)], [(0, 30)]]
+    assert assignment.assign_cpsat(groups, candidates, time_limit_seconds=0) is None
+    assert assign_meeting_blocks(groups, candidates, time_limit_seconds=0) == [(0, 30), (0, 30)]
+
+
+@pytest.mark.unit
+def test_assign_meet_times_docstring_example():
+    result = tools.assign_meet_times(
+        user_ids=[["123", "456"], ["456", "789"]],
+        user_availability={
+            "123": [_slot("09:00", "10:00")],
+            "456": [_slot("09:00", "11:00")],
+            "789": [_slot("09:00", "11:00")],
+        },
+    )
+    assert result == {
+        "status": "success",
+        "result": [[_slot("09:00", "09:30")], [_slot("09:30", "10:00")]],
+    }
+
+
+@pytest.mark.unit
+def test_get_meet_times_compact_and_top_k():
+    availability = {
+        "123": [_slot("09:00", "12:00"), _slot("14:00", "17:00")],
+        "456": [_slot("10:00", "11:30"), _slot("15:00", "16:00")],
+    }
+    assert tools.get_meet_times([["123", "456"]], availability, compact=True) == {
+        "status": "success",
+        "result": [[_slot("10:00", "11:30"), _slot("15:00", "16:00")]],
+        "block_minutes": 30,
+    }
+    assert tools.get_meet_times([["123", "456"]], availability, top_k=2)["result"] == [
+        [_slot("10:00", "10:30"), _slot("10:30", "11:00")],
+    ]
+    assert tools.get_meet_times([["123", "456"]], availability, compact=True, top_k=4)["result"] == [
+        [_slot("10:00", "11:30"), _slot("15:00", "15:30")],
+    ]
+
+
+@pytest.mark.unit
+def test_get_meet_times_ranks_top_k_blocks():
+    availability = {
+        "123": [_slot("09:00", "12:00")],
+        "456": [_slot("09:00", "10:30"), _slot("11:00", "12:00")],
+    }
+    ranked = tools.get_meet_times([["123", "456"]], availability, top_k=2, rank_by="fewest_conflicts")
+    # 09:30 has both members free on either side, 10:00 runs into 456's break
+    assert ranked["result"] == [[_slot("09:30", "10:00"), _slot("10:00", "10:30")]]
+
+    preferred = tools.get_meet_times(
+        [["123", "456"]], availability, top_k=2, rank_by="preferred_hours", preferred_hours=[11]
+    )
+    assert preferred["result"] == [[_slot("11:00", "11:30"), _slot("11:30", "12:00")]]
+
+    # Compact ranges keep the rank order of their blocks
+    compact = tools.get_meet_times(
+        [["123", "456"]], availability, compact=True, top_k=4, rank_by="preferred_hours", preferred_hours=[11]
+    )
+    assert compact["result"] == [[_slot("11:00", "12:00"), _slot("09:00", "10:00")]]
+
+    # Naive and timezone-aware slots cannot be compared
+    mixed = availability | {"456": [{"start": "2023-10-01T09:00:00+00:00", "end": "2023-10-01T12:00:00+00:00"}]}
+    assert tools.get_meet_times([["123", "456"]], mixed)["status"] == "error"
+
+    # Groups without common availability, e.g. with a member missing, have no blocks to rank
+    missing = tools.get_meet_times([["123", "789"]], availability, top_k=3, rank_by="fewest_conflicts")
+    assert missing == {"status": "success", "result": [[]]}
+
+    assert tools.get_meet_times([["123", "456"]], availability, rank_by="latest")["status"] == "error"
+
+
+@pytest.mark.unit
+def test_extract_groups_and_users_accepts_raw_json_and_state():
+    raw = json.dumps({
+        "matched_groups": {
+            "group1": {"user_ids": ["user1", "user2"]},
+            "group2": {"user_ids": ["user3", "user1"]},
+        },
+    })
+    expected = {
+        "groups": ["group1", "group2"],
+        "users": ["user1", "user2", "user3"],
+        "user_groups": [["user1", "user2"], ["user3", "user1"]],
+    }
+    response = MatcherResponse.model_validate_json(raw)
+
+    assert tools.extract_groups_and_users(raw.encode())["result"] == expected
+    assert tools.extract_groups_and_users(response)["result"] == expected
+    assert tools.extract_groups_and_users(response.model_dump(exclude_none=True))["result"] == expected
+    assert tools.extract_groups_and_users(None) == {"status": "error", "result": {}}
+    assert tools.extract_groups_and_users('{"matched_groups": {}}')["status"] == "error"
@@ -0,0 +1,148 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from coordination_agent.shared_libraries import callbacks
+from coordination_agent.shared_libraries.tracing import (
+    AGENT,
+    LLM,
+    TOOL,
+    InMemorySpanCollector,
+    JsonlSpanExporter,
+    Tracer,
+    summarize_spans,
+    tracer,
+)
+
+
+@pytest.fixture
+def collector():
+    collector = InMemorySpanCollector()
+    tracer.add_exporter(collector)
+    yield collector
+    tracer.remove_exporter(collector)
+
+
+def _context(invocation_id: str = "inv-1", agent_name: str = "scheduler") -> SimpleNamespace:
+    return SimpleNamespace(
+        agent_name=agent_name,
+        invocation_id=invocation_id,
+        state=SimpleNamespace(to_dict=lambda: {}),
+    )
+
+
+@pytest.mark.unit
+def test_tracer_is_disabled_without_exporters():
+    local = Tracer()
+    assert not local.enabled
+    assert local.start_span("inv", AGENT, "root") is None
+    assert local.end_span("inv", AGENT, "root") is None
+
+
+@pytest.mark.unit
+def test_spans_nest_per_invocation_and_close_unfinished_children():
+    local = Tracer()
+    collector = InMemorySpanCollector()
+    local.add_exporter(collector)
+
+    root = local.start_span("inv", AGENT, "root")
+    other = local.start_span("other", AGENT, "root")
+    llm = local.start_span("inv", LLM, "model")
+    local.end_span("inv", LLM, total_tokens=12)
+    tool = local.start_span("inv", TOOL, "get_meet_times")
+    local.end_span("inv", AGENT, "root")
+
+    assert other.parent_id is None
+    assert llm.parent_id == root.span_id and tool.parent_id == root.span_id
+    assert [span.name for span in collector.trace("inv")] == ["root", "model", "get_meet_times"]
+    assert llm.attributes == {"total_tokens": 12}
+    assert tool.status == "unfinished"
+    assert all(span.duration_ms >= 0 for span in collector.trace("inv"))
+
+
+@pytest.mark.unit
+def test_callbacks_record_agent_tool_and_llm_spans(collector):
+    context = _context()
+    tool = SimpleNamespace(name="get_meet_times")
+    callbacks.before_agent_trace(context)
+    callbacks.before_model_trace(context, LlmRequest(
+        model="openrouter/google/gemini-2.5-flash",
+        contents=[types.Content(role="user", parts=[types.Part.from_text(text="Find times")])],
+    ))
+    callbacks.after_model_trace(context, LlmResponse(
+        content=types.Content(role="model", parts=[types.Part.from_text(text="ok")]),
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=10, candidates_token_count=2, total_token_count=12
+        ),
+    ))
+    callbacks.before_tool_trace(tool, {"user_ids": ["u1", "u2"]}, context)
+    callbacks.after_tool_trace(tool, {}, context, {"status": "error", "result": "No availabilities"})
+    callbacks.after_agent_trace(context)
+
+    agent, llm, tool_span = collector.trace("inv-1")
+    assert (agent.kind, llm.kind, tool_span.kind) == (AGENT, LLM, TOOL)
+    assert llm.parent_id == tool_span.parent_id == agent.span_id
+    assert llm.attributes == {
+        "request_chars": 10, "system_chars": 0, "response_chars": 2,
+        "prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12,
+    }
+    assert tool_span.status == "error"
+    assert tool_span.attributes["args_chars"] == len(json.dumps({"user_ids": ["u1", "u2"]}))
+
+
+@pytest.mark.unit
+def test_otlp_export_and_jsonl_summary(collector, tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JsonlSpanExporter(path)
+    tracer.add_exporter(exporter)
+    try:
+        callbacks.before_agent_trace(_context("inv-2"))
+        callbacks.after_agent_trace(_context("inv-2"))
+    finally:
+        tracer.remove_exporter(exporter)
+
+    (span,) = collector.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(span["traceId"]) == 32 and len(span["spanId"]) == 16
+    assert {"key": "invocation_id", "value": {"stringValue": "inv-2"}} in span["attributes"]
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    summary = summarize_spans(lines)
+    assert summary["inv-2"]["agent scheduler"]["count"] == 1
+
+
+@pytest.mark.unit
+def test_nested_invocations_join_the_trace_of_the_tool_that_started_them():
+    local = Tracer()
+    collector = InMemorySpanCollector()
+    local.add_exporter(collector)
+
+    async def helper(invocation_id: str):
+        local.start_span(invocation_id, AGENT, "matcher")
+        await asyncio.sleep(0)
+        local.start_span(invocation_id, LLM, "model")
+        local.end_span(invocation_id, LLM)
+        local.end_span(invocation_id, AGENT, "matcher")
+
+    async def run():
+        local.start_span("root", AGENT, "coordinator")
+        tool = local.start_span("root", TOOL, "matcher")
+        await asyncio.gather(helper("chunk-1"), helper("chunk-2"))
+        local.end_span("root", TOOL, "matcher")
+        local.end_span("root", AGENT, "coordinator")
+        local.start_span("later", AGENT, "coordinator")
+        local.end_span("later", AGENT, "coordinator")
+        return tool
+
+    tool = asyncio.run(run())
+
+    for invocation_id in ("chunk-1", "chunk-2"):
+        agent, llm = collector.trace(invocation_id)
+        assert agent.parent_id == tool.span_id and llm.parent_id == agent.span_id
+    (later,) = collector.trace("later")
+    assert later.parent_id is None
+    trace_ids = {span["traceId"] for span in collector.to_otlp()["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+    assert len(trace_ids) == 2 and tool.trace_id in trace_ids and later.trace_id in trace_ids